@@ -0,0 +1,220 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow ships with Kit's pip archive; without it atlas mode is unavailable
+    Image = None
+
+# Bump when the layout or file format changes, so older cache entries are not reused
+ATLAS_VERSION = 1
+
+ATLAS_FILE = "atlas.json"
+
+
+def hash_file(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def atlas_key(textures, max_size, workers=None):
+    """
+    Content hash identifying the atlas for a texture sequence.
+
+    Files are hashed in parallel; hashlib releases the GIL on large buffers.
+    """
+    with ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1)) as executor:
+        hashes = list(executor.map(hash_file, textures))
+    key = json.dumps({"version": ATLAS_VERSION, "max_size": max_size, "sources": hashes})
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+def atlas_layout(cell_count, cell_size, max_size):
+    """
+    Choose the grid of an atlas sheet.
+
+    Small sequences get a near-square grid on one sheet; longer ones fill sheets of up to max_size pixels.
+
+    Returns:
+        tuple: (columns, rows) per sheet.
+    """
+    width, height = cell_size
+    if width > max_size or height > max_size:
+        raise ValueError(f"Texture size {width}x{height} exceeds the atlas size limit of {max_size}")
+    max_columns = max_size // width
+    max_rows = max_size // height
+    if cell_count >= max_columns * max_rows:
+        return max_columns, max_rows
+    columns = min(max_columns, math.ceil(math.sqrt(cell_count * height / width)))
+    rows = min(max_rows, math.ceil(cell_count / columns))
+    return columns, rows
+
+
+class Atlas:
+    """
+    A texture sequence packed into a grid of cells on one or more sheets.
+
+    Cell i is on sheet i // (columns * rows), filled left to right, top to bottom.
+    """
+
+    def __init__(self, sheets, columns, rows, cell_count, cell_size):
+        self.sheets = sheets
+        self.columns = columns
+        self.rows = rows
+        self.cell_count = cell_count
+        self.cell_size = tuple(cell_size)
+
+    def __repr__(self):
+        return f"Atlas({self.cell_count} cells, {self.columns}x{self.rows} per sheet, {len(self.sheets)} sheets)"
+
+    @property
+    def uv_scale(self):
+        """
+        UV scale that shows one cell across the 0-1 UV range: texture coordinates are uv * scale + translate,
+        so with the offset from cell() as the translation the surface samples exactly that cell.
+        """
+        return 1.0 / self.columns, 1.0 / self.rows
+
+    def cell(self, index):
+        """
+        Locate a cell, clamping to the last one like TextureBinding.texture_at().
+
+        Returns:
+            tuple: (sheet path, (u, v) offset of the cell's lower left corner in sheet UV space).
+        """
+        index = min(index, self.cell_count - 1)
+        cells_per_sheet = self.columns * self.rows
+        sheet, cell = divmod(index, cells_per_sheet)
+        row, column = divmod(cell, self.columns)
+        # Rows are filled from the top of the image; UV v runs bottom to top
+        return self.sheets[sheet], (column / self.columns, 1.0 - (row + 1) / self.rows)
+
+    def to_dict(self):
+        return {
+            "version": ATLAS_VERSION,
+            "sheets": [os.path.basename(sheet) for sheet in self.sheets],
+            "columns": self.columns,
+            "rows": self.rows,
+            "cell_count": self.cell_count,
+            "cell_size": list(self.cell_size),
+        }
+
+    @staticmethod
+    def load(atlas_dir):
+        """Load a packed atlas, or return None if it is missing, incomplete or from another version."""
+        try:
+            with open(os.path.join(atlas_dir, ATLAS_FILE)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != ATLAS_VERSION:
+            return None
+        sheets = [os.path.join(atlas_dir, name) for name in data["sheets"]]
+        if not all(os.path.isfile(sheet) for sheet in sheets):
+            return None
+        return Atlas(sheets, data["columns"], data["rows"], data["cell_count"], data["cell_size"])
+
+
+def _load_cell(path, cell_size):
+    image = Image.open(path)
+    image.load()
+    if image.mode != "RGBA":
+        image = image.convert("RGBA")
+    if image.size != cell_size:
+        print(f"Warning: Resizing '{path}' from {image.size[0]}x{image.size[1]} to the atlas cell size "
+              f"{cell_size[0]}x{cell_size[1]}")
+        image = image.resize(cell_size, Image.LANCZOS)
+    return image
+
+
+def _pack_sheet(executor, textures, columns, rows, cell_size, sheet_path, window):
+    width, height = cell_size
+    sheet = Image.new("RGBA", (columns * width, rows * height))
+    # Decode a bounded window of cells ahead; PIL releases the GIL while decoding, resizing and encoding
+    for window_start in range(0, len(textures), window):
+        batch = textures[window_start:window_start + window]
+        for offset, image in enumerate(executor.map(_load_cell, batch, [cell_size] * len(batch))):
+            row, column = divmod(window_start + offset, columns)
+            sheet.paste(image, (column * width, row * height))
+    sheet.save(sheet_path, format="PNG", compress_level=1)
+
+
+def build_atlas(textures, cache_dir, max_size=8192, workers=None):
+    """
+    Pack a texture sequence into atlas sheets, or reuse a previous packing of the same contents.
+
+    Sheets are written to cache_dir/<content hash>/ as PNG, together with an atlas.json describing the
+    grid. The directory is assembled under a temporary name and renamed into place, so concurrent builds
+    (e.g. render farm shards) never see a partial atlas.
+
+    Args:
+        textures (list): Texture files in playback order. Every cell has the size of the first texture.
+        cache_dir (str): Directory holding packed atlases.
+        max_size (int): Maximum sheet width and height in pixels.
+        workers (int): Threads decoding and hashing textures, default one per core up to 8.
+
+    Returns:
+        Atlas: The packed atlas.
+
+    Raises:
+        RuntimeError: If Pillow is not available.
+        ValueError: If a texture is larger than max_size.
+        OSError: If a texture cannot be read or the cache cannot be written.
+    """
+    if Image is None:
+        raise RuntimeError("Atlas mode requires the 'Pillow' module.")
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    atlas_dir = os.path.join(cache_dir, atlas_key(textures, max_size, workers))
+    atlas = Atlas.load(atlas_dir)
+    if atlas:
+        print(f"Reusing {atlas} from {atlas_dir}")
+        return atlas
+
+    with Image.open(textures[0]) as first:
+        cell_size = first.size
+    columns, rows = atlas_layout(len(textures), cell_size, max_size)
+    cells_per_sheet = columns * rows
+
+    temp_dir = f"{atlas_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+    try:
+        sheet_names = []
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="proviz_atlas") as executor:
+            for sheet_index, first_cell in enumerate(range(0, len(textures), cells_per_sheet)):
+                # Every sheet has the same grid, so a cell's UV offset does not depend on its sheet
+                name = f"sheet_{sheet_index:03d}.png"
+                _pack_sheet(
+                    executor, textures[first_cell:first_cell + cells_per_sheet], columns, rows, cell_size,
+                    os.path.join(temp_dir, name), workers * 2,
+                )
+                sheet_names.append(name)
+
+        atlas = Atlas(
+            [os.path.join(atlas_dir, name) for name in sheet_names], columns, rows, len(textures), cell_size
+        )
+        with open(os.path.join(temp_dir, ATLAS_FILE), "w") as f:
+            json.dump(atlas.to_dict(), f, indent=2)
+
+        try:
+            os.rename(temp_dir, atlas_dir)
+        except OSError:
+            # Another process finished the same atlas first
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            atlas = Atlas.load(atlas_dir)
+            if atlas is None:
+                raise
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    print(f"Packed {atlas} into {atlas_dir}")
+    return atlas
@@ -0,0 +1,234 @@
+import os
+
+from pxr import Gf, Sdf, UsdShade
+
+from .atlas import build_atlas
+from .texture_scanner import scan_textures
+
+# OmniPBR inputs that place the texture in UV space; atlas mode animates the translation through the cells
+ATLAS_TRANSLATE_INPUT = "texture_translate"
+ATLAS_SCALE_INPUT = "texture_scale"
+
+
+class TextureBinding:
+    """A texture sequence driving one input of one shader."""
+
+    def __init__(self, shader_path, texture_type, animation_folder):
+        self.shader_path = shader_path
+        self.texture_type = texture_type
+        self.animation_folder = animation_folder
+        self.files = []
+        self.attr_path = None
+        # Atlas mode: the packed Atlas and the paths of the UV translate/scale inputs
+        self.atlas = None
+        self.translate_path = None
+        self.scale_path = None
+
+    def __repr__(self):
+        return f"{self.shader_path}.inputs:{self.texture_type} <- {self.animation_folder}"
+
+    def texture_at(self, texture_index):
+        """Texture for a step of the sequence; shorter sequences hold their last texture."""
+        return self.files[min(texture_index, len(self.files) - 1)]
+
+
+def parse_bindings_text(text):
+    """
+    Parse bindings typed into the UI, one per line as "shader_path, input_name, folder".
+
+    Returns:
+        list: Binding dicts with "shader_path", "texture_type" and "animation_folder".
+    """
+    bindings = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = [part.strip() for part in line.split(",", 2)]
+        if len(parts) != 3 or not all(parts):
+            raise ValueError(f"Binding line {line_number} should be 'shader_path, input_name, folder': {line}")
+        bindings.append({"shader_path": parts[0], "texture_type": parts[1], "animation_folder": parts[2]})
+    return bindings
+
+
+def bindings_from_inputs(inputs):
+    """
+    Collect every binding of a run: the main shader/input/folder fields plus the "bindings" list.
+
+    Returns:
+        list: TextureBinding objects, not yet prepared.
+    """
+    bindings = []
+    if inputs.get("shader_path") and inputs.get("animation_folder"):
+        bindings.append(TextureBinding(inputs["shader_path"], inputs["texture_type"], inputs["animation_folder"]))
+    for binding in inputs.get("bindings") or []:
+        bindings.append(TextureBinding(binding["shader_path"], binding["texture_type"], binding["animation_folder"]))
+    return bindings
+
+
+def prepare_bindings(stage, layer, bindings, atlas_mode=False):
+    """
+    Validate bindings, scan their folders and make sure each input has a spec in the layer.
+
+    Args:
+        stage (Usd.Stage): The stage.
+        layer (Sdf.Layer): Layer the per-frame texture edits are written to.
+        bindings (list): TextureBinding objects.
+        atlas_mode (bool): The bindings will be packed into atlases; see check_atlas_shaders().
+
+    Returns:
+        bool: False if any binding is invalid; the error has been printed.
+    """
+    if not bindings:
+        print("Error: No shader bindings specified.")
+        return False
+
+    for binding in bindings:
+        shader_prim = stage.GetPrimAtPath(binding.shader_path)
+        if not shader_prim.IsValid():
+            print(f"Error: Shader not found at path {binding.shader_path}")
+            return False
+
+        texture_input = UsdShade.Shader(shader_prim).GetInput(binding.texture_type)
+        if not texture_input:
+            print(f"Error: Specified texture input '{binding.texture_type}' not found in Shader {binding.shader_path}.")
+            return False
+
+        if not os.path.isdir(binding.animation_folder):
+            print(f"Error: Animation folder '{binding.animation_folder}' does not exist.")
+            return False
+        binding.files = scan_textures(binding.animation_folder)
+        if not binding.files:
+            print(f"Error: No valid texture files found in '{binding.animation_folder}'.")
+            return False
+
+        attr = texture_input.GetAttr()
+        binding.attr_path = attr.GetPath()
+        if not layer.GetAttributeAtPath(binding.attr_path):
+            prim_spec = Sdf.CreatePrimInLayer(layer, binding.attr_path.GetPrimPath())
+            Sdf.AttributeSpec(prim_spec, binding.attr_path.name, attr.GetTypeName())
+
+    return not atlas_mode or check_atlas_shaders(stage, bindings)
+
+
+def check_atlas_shaders(stage, bindings):
+    """
+    Make sure moving the UV translation through atlas cells only moves the animated textures.
+
+    The OmniPBR UV translate and scale apply to every texture of the material, so a shader animated through
+    an atlas must have no other texture authored, and all its atlas bindings must share one grid layout.
+    Bindings whose atlas is not packed yet are only checked for other textures.
+
+    Returns:
+        bool: False if a shader cannot be animated in atlas mode; the error has been printed.
+    """
+    shader_bindings = {}
+    for binding in bindings:
+        shader_bindings.setdefault(binding.shader_path, []).append(binding)
+
+    for shader_path, animated in shader_bindings.items():
+        texture_types = {binding.texture_type for binding in animated}
+        shader = UsdShade.Shader(stage.GetPrimAtPath(shader_path))
+        other_textures = sorted(
+            shader_input.GetBaseName() for shader_input in shader.GetInputs()
+            if shader_input.GetBaseName() not in texture_types
+            and shader_input.GetTypeName() == Sdf.ValueTypeNames.Asset
+            and shader_input.Get() and shader_input.Get().path
+        )
+        if other_textures:
+            print(f"Error: Atlas mode moves the UVs of every texture on {shader_path}, which also has "
+                  f"{', '.join(other_textures)} authored. Render this shader without atlas mode.")
+            return False
+
+        layouts = {
+            (binding.atlas.columns, binding.atlas.rows, binding.atlas.cell_count)
+            for binding in animated if binding.atlas is not None
+        }
+        if len(layouts) > 1:
+            print(f"Error: The atlas bindings of {shader_path} pack into different grids ("
+                  f"{', '.join(f'{columns}x{rows} with {cells} cells' for columns, rows, cells in sorted(layouts))})"
+                  ", but share one UV translate and scale. Use sequences of the same length and texture size.")
+            return False
+    return True
+
+
+def pack_atlases(bindings, cache_dir, max_size=8192, workers=None):
+    """
+    Pack each prepared binding's texture sequence into an atlas (see atlas.build_atlas).
+
+    Only touches files, so it can run on a worker thread while Kit keeps updating.
+    """
+    for binding in bindings:
+        binding.atlas = build_atlas(binding.files, cache_dir, max_size, workers)
+
+
+def preprocess_bindings(bindings, texture_cache):
+    """
+    Swap each prepared binding's textures for their preprocessed copies (see TextureCache.preprocess).
+
+    Only touches files, so it can run on a worker thread while Kit keeps updating.
+    """
+    for binding in bindings:
+        binding.files = texture_cache.preprocess(binding.files)
+
+
+def prepare_atlas_inputs(stage, layer, bindings, translate_input=ATLAS_TRANSLATE_INPUT,
+                         scale_input=ATLAS_SCALE_INPUT):
+    """
+    Author the UV scale that shows one atlas cell and make sure the translate input has a spec in the layer.
+
+    The inputs are created on the shader if they are not authored yet.
+
+    Returns:
+        bool: False if a binding has no atlas or a shader's atlases do not share a layout.
+    """
+    if not check_atlas_shaders(stage, bindings):
+        return False
+    with Sdf.ChangeBlock():
+        for binding in bindings:
+            if binding.atlas is None:
+                print(f"Error: No atlas packed for {binding}")
+                return False
+            prim_spec = Sdf.CreatePrimInLayer(layer, Sdf.Path(binding.shader_path))
+            shader = UsdShade.Shader(stage.GetPrimAtPath(binding.shader_path))
+            paths = []
+            for input_name in (translate_input, scale_input):
+                texture_input = shader.GetInput(input_name)
+                type_name = texture_input.GetTypeName() if texture_input else Sdf.ValueTypeNames.Float2
+                attr_path = Sdf.Path(binding.shader_path).AppendProperty(f"inputs:{input_name}")
+                if not layer.GetAttributeAtPath(attr_path):
+                    Sdf.AttributeSpec(prim_spec, attr_path.name, type_name)
+                paths.append(attr_path)
+            binding.translate_path, binding.scale_path = paths
+            layer.GetAttributeAtPath(binding.scale_path).default = Gf.Vec2f(*binding.atlas.uv_scale)
+    return True
+
+
+def sequence_length(bindings):
+    """Number of steps when all bindings advance in lockstep."""
+    return max(len(binding.files) for binding in bindings)
+
+
+def apply_textures(layer, bindings, texture_index):
+    """
+    Assign every binding's texture for a step in one batched stage edit.
+
+    Bindings packed into an atlas only move their UV translation to the step's cell; the asset path is
+    written only when the cell is on another sheet, so the renderer keeps the resident texture.
+
+    Returns:
+        list: The assigned texture paths, in binding order.
+    """
+    textures = [binding.texture_at(texture_index) for binding in bindings]
+    with Sdf.ChangeBlock():
+        for binding, texture_path in zip(bindings, textures):
+            attr_spec = layer.GetAttributeAtPath(binding.attr_path)
+            if binding.atlas is None:
+                attr_spec.default = Sdf.AssetPath(texture_path)
+                continue
+
+            sheet, offset = binding.atlas.cell(texture_index)
+            if attr_spec.default is None or attr_spec.default.path != sheet:
+                attr_spec.default = Sdf.AssetPath(sheet)
+            layer.GetAttributeAtPath(binding.translate_path).default = Gf.Vec2f(*offset)
+    return textures
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+
+class CombinedCapture:
+    """Waits for several captures of the same frame, e.g. a PNG file and a streamed buffer."""
+
+    def __init__(self, captures):
+        self.captures = captures
+
+    async def wait_for_result(self):
+        results = await asyncio.gather(*(capture.wait_for_result() for capture in self.captures))
+        return results if all(results) else None
+
+
+class CapturePipeline:
+    """
+    Keeps a bounded number of viewport captures in flight.
+
+    A capture is submitted once the frame it is bound to has been delivered, so the caller can move on
+    to the next texture while the previous file is still being encoded and written. When the pipeline is
+    full, submit() waits for the oldest outstanding capture to complete instead of sleeping.
+    """
+
+    def __init__(self, max_in_flight=2, metrics=None):
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.metrics = metrics
+        self.completed = 0
+        self.failed = 0
+        self._pending = set()
+
+    @property
+    def in_flight(self):
+        return len(self._pending)
+
+    async def submit(self, capture, output_path, on_complete=None, on_failure=None):
+        """
+        Track a scheduled capture, waiting for a free slot first if the pipeline is full.
+
+        Args:
+            capture: The object returned by viewport_api.schedule_capture().
+            output_path (str): The file the capture writes, used for reporting.
+            on_complete (callable): Optional blocking callback run in an executor after a successful capture.
+            on_failure (callable): Optional blocking callback run in an executor after a failed capture.
+        """
+        start = time.perf_counter()
+        while len(self._pending) >= self.max_in_flight:
+            await self._wait_for_any()
+        if self.metrics:
+            self.metrics.record("pipeline_full", time.perf_counter() - start, output=output_path)
+
+        task = asyncio.ensure_future(self._finish(capture, output_path, on_complete, on_failure))
+        self._pending.add(task)
+
+    async def drain(self):
+        """Wait for every outstanding capture to complete."""
+        while self._pending:
+            await self._wait_for_any()
+
+    async def _wait_for_any(self):
+        done, self._pending = await asyncio.wait(self._pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            # Surface unexpected errors from the completion callbacks.
+            task.result()
+
+    async def _finish(self, capture, output_path, on_complete, on_failure):
+        start = time.perf_counter()
+        try:
+            captured_aovs = await capture.wait_for_result()
+        except Exception as e:
+            print(f"Error while capturing '{output_path}': {e}")
+            captured_aovs = None
+        if self.metrics:
+            self.metrics.record("capture", time.perf_counter() - start, output=output_path, ok=bool(captured_aovs))
+
+        if not captured_aovs:
+            self.failed += 1
+            print(f'Failed to save the image "{output_path}".')
+            if on_failure:
+                try:
+                    await asyncio.get_event_loop().run_in_executor(None, on_failure)
+                except Exception as e:
+                    print(f"Error while handling the failed capture '{output_path}': {e}")
+            return
+
+        self.completed += 1
+        print(f'Image was successfully saved to "{output_path}"')
+
+        if on_complete:
+            start = time.perf_counter()
+            try:
+                await asyncio.get_event_loop().run_in_executor(None, on_complete)
+                if self.metrics:
+                    self.metrics.record("after_capture", time.perf_counter() - start, output=output_path)
+            except Exception as e:
+                self.failed += 1
+                print(f"Error after capturing '{output_path}': {e}")
@@ -0,0 +1,150 @@
+import asyncio
+import math
+import time
+
+import carb.settings
+
+from .ffmpeg_stream import StreamFrame
+
+try:
+    import numpy as np
+except ImportError:  # numpy ships with Kit; the fallback compares fewer pixels
+    np = None
+
+# "off": capture after the first rendered frame (plus the settle time).
+# "delta": capture once successive viewport buffers differ by less than the threshold.
+# "samples": capture once the path tracer has accumulated its total samples per pixel.
+CONVERGENCE_MODES = ("off", "delta", "samples")
+
+# Pixels compared per buffer; larger buffers are sampled with a stride
+DELTA_SAMPLE_PIXELS = 1 << 18
+
+PATH_TRACING_MODE = "PathTracing"
+
+
+class ConvergenceResult:
+    """How long a frame took to converge, and whether it did before the time cap."""
+
+    def __init__(self, converged, seconds, frames, delta=None):
+        self.converged = converged
+        self.seconds = seconds
+        self.frames = frames
+        self.delta = delta
+
+    def __repr__(self):
+        state = "converged" if self.converged else "hit the time cap"
+        delta = f", delta {self.delta:.5f}" if self.delta is not None else ""
+        return f"{state} in {self.seconds:.2f}s ({self.frames} frames{delta})"
+
+
+def buffer_delta(previous, current):
+    """
+    Mean absolute difference of the RGB channels of two 8-bit RGBA buffers, from 0 (identical) to 1.
+
+    Large buffers are compared on an evenly spaced subset of DELTA_SAMPLE_PIXELS pixels.
+    """
+    if len(previous) != len(current):
+        return 1.0
+    pixel_count = len(current) // 4
+    if not pixel_count:
+        return 0.0
+    stride = max(1, pixel_count // DELTA_SAMPLE_PIXELS)
+
+    if np is not None:
+        a = np.frombuffer(previous, dtype=np.uint8).reshape(-1, 4)[::stride, :3].astype(np.int16)
+        b = np.frombuffer(current, dtype=np.uint8).reshape(-1, 4)[::stride, :3].astype(np.int16)
+        return float(np.abs(a - b).mean()) / 255.0
+
+    # Without numpy compare the red channel of a sparser subset
+    stride = max(stride, pixel_count // (DELTA_SAMPLE_PIXELS // 16))
+    a = previous[::stride * 4]
+    b = current[::stride * 4]
+    return sum(abs(x - y) for x, y in zip(a, b)) / (len(a) * 255.0)
+
+
+def path_tracing_frames():
+    """
+    Frames the RTX path tracer needs to accumulate its total samples per pixel.
+
+    Returns:
+        int: The frame count, or None if the renderer is not path tracing.
+    """
+    settings = carb.settings.get_settings()
+    if settings.get("/rtx/rendermode") != PATH_TRACING_MODE:
+        return None
+    samples_per_frame = settings.get("/rtx/pathtracing/spp") or 1
+    total_samples = settings.get("/rtx/pathtracing/totalSpp") or samples_per_frame
+    return max(1, math.ceil(total_samples / samples_per_frame))
+
+
+async def capture_buffer(viewport_api):
+    """Capture the next rendered frame's RGBA buffer without writing a file."""
+    frame = StreamFrame()
+    await viewport_api.schedule_capture(frame.delegate()).wait_for_result()
+    return frame.data
+
+
+async def wait_for_delta_convergence(viewport_api, threshold, max_time, min_frames=2):
+    """
+    Capture viewport buffers until two successive ones differ by less than threshold.
+
+    Args:
+        viewport_api: The ViewportAPI rendering the frame.
+        threshold (float): Mean absolute RGB difference, 0-1, below which the frame counts as converged.
+        max_time (float): Seconds after which to stop waiting and capture anyway.
+        min_frames (int): Buffers to compare at least, so a frame is not accepted before it starts changing.
+
+    Returns:
+        ConvergenceResult
+    """
+    start = time.perf_counter()
+    previous = await capture_buffer(viewport_api)
+    frames = 1
+    delta = None
+    while True:
+        elapsed = time.perf_counter() - start
+        if elapsed >= max_time:
+            return ConvergenceResult(False, elapsed, frames, delta)
+        current = await capture_buffer(viewport_api)
+        frames += 1
+        if previous is not None and current is not None:
+            delta = buffer_delta(previous, current)
+            if frames >= min_frames and delta < threshold:
+                return ConvergenceResult(True, time.perf_counter() - start, frames, delta)
+        previous = current
+
+
+async def wait_for_sample_convergence(viewport_api, frame_count, max_time):
+    """Wait until the path tracer has rendered frame_count frames since the scene changed, or max_time."""
+    start = time.perf_counter()
+    frames = 0
+    # Wait one frame at a time so a time-out reports the frames that were actually rendered
+    while frames < frame_count:
+        remaining = max_time - (time.perf_counter() - start)
+        if remaining <= 0:
+            break
+        try:
+            await asyncio.wait_for(viewport_api.wait_for_rendered_frames(1), timeout=remaining)
+        except asyncio.TimeoutError:
+            break
+        frames += 1
+    return ConvergenceResult(frames >= frame_count, time.perf_counter() - start, frames)
+
+
+async def wait_for_convergence(viewport_api, mode, threshold=0.002, max_time=10.0, min_frames=2):
+    """
+    Wait until the viewport's frame is converged according to mode (see CONVERGENCE_MODES).
+
+    "samples" falls back to "delta" when the renderer is not path tracing.
+
+    Returns:
+        ConvergenceResult: None if mode is "off".
+    """
+    if mode == "samples":
+        frame_count = path_tracing_frames()
+        if frame_count is not None:
+            return await wait_for_sample_convergence(viewport_api, frame_count, max_time)
+        mode = "delta"
+    if mode == "delta":
+        return await wait_for_delta_convergence(viewport_api, threshold, max_time, min_frames)
+    return None
@@ -0,0 +1,30 @@
+# Kept free of Kit imports: images_to_video.py loads this module outside Kit.
+
+# H.264 settings for review and post-editing, used by the streaming output modes and images_to_video.py, so
+# streamed and re-encoded videos match.
+ENCODER_SETTINGS = {
+    "vcodec": "libx264",  # H.264 codec for compatibility
+    "crf": 18,  # High-quality compression
+    "preset": "slow",  # Balanced encoding speed
+    "pix_fmt": "yuv420p",  # Ensure compatibility
+    "maxrate": "15M",  # Max video bitrate
+    "bufsize": "30M",  # Buffer size for bitrate control
+}
+
+
+def ffmpeg_output_args(framerate, settings=None):
+    """
+    Build ffmpeg command line output options from encoder settings.
+
+    Args:
+        framerate (int): Output frame rate.
+        settings (dict): Encoder settings, defaults to ENCODER_SETTINGS.
+
+    Returns:
+        list: Arguments to place before the output file name.
+    """
+    args = []
+    for key, value in (settings or ENCODER_SETTINGS).items():
+        args.extend([f"-{key}", str(value)])
+    args.extend(["-r", str(framerate), "-an"])
+    return args
@@ -1,20 +1,61 @@
+import carb.settings
 import omni.ext
+import omni.kit.app
 import omni.ui as ui
 import asyncio
 from pxr import Usd, UsdShade, Sdf
 from omni.kit.viewport.utility import get_active_viewport_window
 from omni.kit.widget.viewport.capture import FileCapture
 import os
-from glob import glob
+import time
+from functools import partial
 import omni.timeline
+from .bindings import (
+    ATLAS_SCALE_INPUT, ATLAS_TRANSLATE_INPUT, apply_textures, bindings_from_inputs, check_atlas_shaders, pack_atlases,
+    parse_bindings_text, prepare_atlas_inputs, prepare_bindings, preprocess_bindings, sequence_length
+)
+from .atlas import build_atlas
+from .convergence import CONVERGENCE_MODES, path_tracing_frames, wait_for_convergence
+from .capture_pipeline import CapturePipeline, CombinedCapture
+from .ffmpeg_stream import FFmpegStreamWriter, StreamFrame
+from .image_writer import IMAGE_FORMATS, THREADED_FORMATS, ImageWriter, frame_file_name
+from .frame_hold import LINK_MODES, fill_hold_frames, duration_manifest_path, write_duration_manifest
+from .job_manager import CancellationToken, JobManager
+from .jobs import DEFAULT_INPUTS, load_job_file, write_completion_manifest
+from .metrics import RunMetrics, metrics_path
+from .preflight import read_exr_pixel_types, run_preflight
+from .preview import TexturePreview
+from .render_manifest import RenderManifest, manifest_path, settings_key, texture_signature
+from .render_quality import DEFAULT_DRAFT_SETTINGS, RENDER_QUALITIES, format_frame_ranges, quality_inputs
+from .render_settings import apply_render_settings, restore_render_settings
+from .texture_cache import TextureCache
+from .texture_scanner import scan_textures
+from .time_samples import author_atlas_time_samples, author_texture_time_samples, clear_texture_time_samples
+
+# Path of a JSON/TOML job file to run at startup, e.g. --/exts/proviz.animate.material/batch_file=jobs.toml
+BATCH_FILE_SETTING = "/exts/proviz.animate.material/batch_file"
+
+# PNG sequence, MP4 streamed straight into ffmpeg, or both
+OUTPUT_MODES = ("png", "stream", "png+stream")
 
 class ShaderAnimationUI:
-    def __init__(self, on_run_animation, on_clear_inputs, on_clear_animation, on_terminate_process):
+    def __init__(self, on_run_animation, on_clear_inputs, on_clear_animation, on_terminate_process, on_run_job_file,
+                 on_author_time_samples, on_cancel_job, on_clear_finished_jobs, on_start_preview, on_stop_preview,
+                 on_preflight):
         self.window = ui.Window("Render and Animation Setup", width=400, height=900)
         self.on_run_animation = on_run_animation
+        self.on_author_time_samples = on_author_time_samples
+        self.on_run_job_file = on_run_job_file
         self.on_clear_inputs = on_clear_inputs
         self.on_clear_animation = on_clear_animation
         self.on_terminate_process = on_terminate_process
+        self.on_cancel_job = on_cancel_job
+        self.on_clear_finished_jobs = on_clear_finished_jobs
+        self.on_start_preview = on_start_preview
+        self.on_stop_preview = on_stop_preview
+        self.on_preflight = on_preflight
+        self._jobs = []
+        self._job_rows = {}
         self._build_ui()
 
     def _build_ui(self):
@@ -27,6 +68,15 @@ class ShaderAnimationUI:
                 self.resolution_height = ui.IntField(height=30)
                 self.resolution_height.model.set_value(2160)
 
+                ui.Label("Render Quality (final, draft at reduced resolution, promote approved frames):", height=20)
+                self.render_quality_combo = ui.ComboBox(0, *RENDER_QUALITIES, height=30)
+
+                ui.Label("Draft Resolution Scale and Approved Frames (e.g. 0-47, 96):", height=20)
+                with ui.HStack(spacing=10, height=30):
+                    self.draft_scale_field = ui.FloatField(width=80, height=30)
+                    self.draft_scale_field.model.set_value(0.5)
+                    self.approved_frames_field = ui.StringField(height=30)
+
                 # Animation Setup
                 ui.Label("Shader Path (e.g., /World/Looks/MyShader):", height=20)
                 self.shader_path_field = ui.StringField(height=30)
@@ -42,9 +92,26 @@ class ShaderAnimationUI:
                 self.frame_duration_field = ui.IntField(height=30)
                 self.frame_duration_field.model.set_value(6)
 
-                ui.Label("Wait Time Between Textures (seconds):", height=20)
+                ui.Label("Settle Time After Texture Change (seconds, 0 = none):", height=20)
                 self.wait_time_field = ui.FloatField(height=30)
-                self.wait_time_field.model.set_value(0.5)
+                self.wait_time_field.model.set_value(0.0)
+
+                ui.Label("Convergence (off, buffer delta or path tracing samples):", height=20)
+                self.convergence_mode_combo = ui.ComboBox(0, *CONVERGENCE_MODES, height=30)
+
+                ui.Label("Convergence Delta Threshold (0-1) and Max Time (seconds):", height=20)
+                with ui.HStack(spacing=10, height=30):
+                    self.convergence_threshold_field = ui.FloatField(height=30)
+                    self.convergence_threshold_field.model.set_value(0.002)
+                    self.convergence_max_time_field = ui.FloatField(height=30)
+                    self.convergence_max_time_field.model.set_value(10.0)
+
+                ui.Label("Captures In Flight:", height=20)
+                self.max_in_flight_field = ui.IntField(height=30)
+                self.max_in_flight_field.model.set_value(2)
+
+                ui.Label("Viewport Window (optional, e.g. Viewport 2; empty = active viewport):", height=20)
+                self.viewport_window_field = ui.StringField(height=30)
 
                 ui.Label("Output Directory (for rendered images):", height=20)
                 self.output_dir_field = ui.StringField(height=30)
@@ -54,6 +121,54 @@ class ShaderAnimationUI:
                 self.output_prefix_field = ui.StringField(height=30)
                 self.output_prefix_field.model.set_value("frame")
 
+                # Output
+                ui.Label("Output Mode:", height=20)
+                self.output_mode_combo = ui.ComboBox(0, *OUTPUT_MODES, height=30)
+
+                ui.Label("Video Frame Rate (stream modes):", height=20)
+                self.framerate_field = ui.IntField(height=30)
+                self.framerate_field.model.set_value(24)
+
+                # Image Format
+                ui.Label("Image Format (EXR is half-float from the renderer):", height=20)
+                self.image_format_combo = ui.ComboBox(0, *IMAGE_FORMATS, height=30)
+
+                with ui.HStack(spacing=10, height=30):
+                    ui.Label("PNG Compression (0-9):", width=150)
+                    self.png_compression_field = ui.IntField()
+                    self.png_compression_field.model.set_value(6)
+                    ui.Label("JPEG/WebP Quality:", width=130)
+                    self.image_quality_field = ui.IntField()
+                    self.image_quality_field.model.set_value(90)
+                ui.Label("Compression and quality apply to off-thread writes; FileCapture uses Kit's settings.",
+                         height=20)
+
+                with ui.HStack(spacing=5, height=20):
+                    self.threaded_writes_checkbox = ui.CheckBox(width=20)
+                    ui.Label("Encode and Write Images Off-Thread (PNG/JPEG/WebP)")
+
+                # Hold Mode
+                with ui.HStack(spacing=5, height=20):
+                    self.hold_mode_checkbox = ui.CheckBox(width=20)
+                    ui.Label("Hold Mode (capture each texture once, link the rest)")
+
+                ui.Label("Hold Fill Method:", height=20)
+                self.link_mode_combo = ui.ComboBox(0, *LINK_MODES, height=30)
+
+                with ui.HStack(spacing=5, height=20):
+                    self.duration_manifest_checkbox = ui.CheckBox(width=20)
+                    ui.Label("Write Duration Manifest (for images_to_video.py)")
+
+                # Resume
+                with ui.HStack(spacing=5, height=20):
+                    self.resume_checkbox = ui.CheckBox(width=20)
+                    self.resume_checkbox.model.set_value(True)
+                    ui.Label("Skip Up-To-Date Frames (resume)")
+
+                with ui.HStack(spacing=5, height=20):
+                    self.hash_sources_checkbox = ui.CheckBox(width=20)
+                    ui.Label("Detect Texture Changes by Content Hash (slower than mtime)")
+
                 # Select Texture Type
                 ui.Label("Select Texture Type:", height=20)
                 self.texture_type_collection = ui.RadioCollection()
@@ -72,11 +187,26 @@ class ShaderAnimationUI:
                         height=30
                     )
 
+                with ui.HStack(spacing=5, height=20):
+                    self.preprocess_checkbox = ui.CheckBox(width=20)
+                    ui.Label("Preprocess Textures (resize to render size, mipmapped DDS cache)")
+
+                with ui.HStack(spacing=5, height=20):
+                    self.atlas_mode_checkbox = ui.CheckBox(width=20)
+                    ui.Label("Flipbook Atlas (pack textures, animate texture_translate)")
+
+                # Additional Bindings, animated in lockstep with the main shader input
+                ui.Label("Additional Bindings (one per line: shader_path, input_name, folder):", height=20)
+                self.bindings_field = ui.StringField(multiline=True, height=60)
+
                 # Buttons
                 with ui.HStack(spacing=10):
                     self.run_button = ui.Button("Run Animation", height=30)
                     self.run_button.set_clicked_fn(self.on_run_animation)
 
+                    self.preflight_button = ui.Button("Preflight", height=30)
+                    self.preflight_button.set_clicked_fn(self.on_preflight)
+
                     self.clear_animation_button = ui.Button("Clear Animation", height=30)
                     self.clear_animation_button.set_clicked_fn(self.on_clear_animation)
 
@@ -86,106 +216,412 @@ class ShaderAnimationUI:
                     self.clear_button = ui.Button("Clear Inputs", height=30)
                     self.clear_button.set_clicked_fn(self.on_clear_inputs)
 
+                # Jobs
+                with ui.HStack(spacing=10, height=20):
+                    ui.Label("Jobs:", height=20)
+                    self.clear_finished_button = ui.Button("Clear Finished", width=120, height=20)
+                    self.clear_finished_button.set_clicked_fn(self.on_clear_finished_jobs)
+                self.jobs_frame = ui.Frame(height=120, build_fn=self._build_job_list)
+
+                # Preview
+                ui.Label("Preview Prefetch (textures read ahead of the timeline):", height=20)
+                self.preview_prefetch_field = ui.IntField(height=30)
+                self.preview_prefetch_field.model.set_value(16)
+
+                with ui.HStack(spacing=10, height=30):
+                    self.start_preview_button = ui.Button("Start Preview", height=30)
+                    self.start_preview_button.set_clicked_fn(self.on_start_preview)
+
+                    self.stop_preview_button = ui.Button("Stop Preview", height=30)
+                    self.stop_preview_button.set_clicked_fn(self.on_stop_preview)
+                self.preview_status_label = ui.Label("Preview stopped", height=20)
+
+                # Time Samples
+                ui.Label("Animation Sublayer (optional, for authored time samples):", height=20)
+                self.animation_sublayer_field = ui.StringField(height=30)
+
+                self.author_time_samples_button = ui.Button("Author Time Samples", height=30)
+                self.author_time_samples_button.set_clicked_fn(self.on_author_time_samples)
+
+                # Batch Jobs
+                ui.Label("Job File (JSON/TOML):", height=20)
+                with ui.HStack(spacing=10, height=30):
+                    self.job_file_field = ui.StringField(height=30)
+                    self.run_job_file_button = ui.Button("Run Jobs", width=100, height=30)
+                    self.run_job_file_button.set_clicked_fn(self.on_run_job_file)
+
     def get_inputs(self):
         return {
             "resolution_width": self.resolution_width.model.get_value_as_int(),
             "resolution_height": self.resolution_height.model.get_value_as_int(),
+            "render_quality": RENDER_QUALITIES[self.render_quality_combo.model.get_item_value_model().as_int],
+            "draft_scale": self.draft_scale_field.model.get_value_as_float(),
+            "approved_frames": self.approved_frames_field.model.get_value_as_string().strip() or None,
             "shader_path": self.shader_path_field.model.get_value_as_string().strip(),
             "animation_folder": self.animation_folder_field.model.get_value_as_string().strip(),
             "start_time_code": self.start_time_code_field.model.get_value_as_int(),
             "frame_duration": self.frame_duration_field.model.get_value_as_int(),
             "wait_time": self.wait_time_field.model.get_value_as_float(),
+            "convergence_mode": CONVERGENCE_MODES[self.convergence_mode_combo.model.get_item_value_model().as_int],
+            "convergence_threshold": self.convergence_threshold_field.model.get_value_as_float(),
+            "convergence_max_time": self.convergence_max_time_field.model.get_value_as_float(),
+            "max_in_flight": self.max_in_flight_field.model.get_value_as_int(),
+            "viewport_window": self.viewport_window_field.model.get_value_as_string().strip() or None,
             "output_dir": self.output_dir_field.model.get_value_as_string().strip(),
             "output_prefix": self.output_prefix_field.model.get_value_as_string().strip(),
             "texture_type": "opacity_texture" if self.texture_type_collection.model.as_int == 0 else "diffuse_texture",
+            "hold_mode": self.hold_mode_checkbox.model.get_value_as_bool(),
+            "link_mode": LINK_MODES[self.link_mode_combo.model.get_item_value_model().as_int],
+            "write_duration_manifest": self.duration_manifest_checkbox.model.get_value_as_bool(),
+            "resume": self.resume_checkbox.model.get_value_as_bool(),
+            "output_mode": OUTPUT_MODES[self.output_mode_combo.model.get_item_value_model().as_int],
+            "framerate": self.framerate_field.model.get_value_as_int(),
+            "image_format": IMAGE_FORMATS[self.image_format_combo.model.get_item_value_model().as_int],
+            "png_compression": self.png_compression_field.model.get_value_as_int(),
+            "image_quality": self.image_quality_field.model.get_value_as_int(),
+            "threaded_writes": self.threaded_writes_checkbox.model.get_value_as_bool(),
+            "animation_sublayer": self.animation_sublayer_field.model.get_value_as_string().strip() or None,
+            "hash_sources": self.hash_sources_checkbox.model.get_value_as_bool(),
+            "bindings": parse_bindings_text(self.bindings_field.model.get_value_as_string()),
+            "atlas_mode": self.atlas_mode_checkbox.model.get_value_as_bool(),
+            "preprocess_textures": self.preprocess_checkbox.model.get_value_as_bool(),
+            "preview_prefetch": self.preview_prefetch_field.model.get_value_as_int(),
         }
 
+    def _build_job_list(self):
+        self._job_rows = {}
+        with ui.ScrollingFrame():
+            with ui.VStack(spacing=2):
+                if not self._jobs:
+                    ui.Label("No jobs", height=20)
+                for job in self._jobs:
+                    with ui.HStack(spacing=5, height=20):
+                        ui.Label(f"#{job.id} {job.name}", width=200)
+                        ui.Label(job.state, width=70)
+                        progress_bar = ui.ProgressBar()
+                        progress_bar.model.set_value(job.progress)
+                        ui.Button(
+                            "Cancel", width=60, enabled=not job.done,
+                            clicked_fn=partial(self.on_cancel_job, job.id),
+                        )
+                    progress_label = ui.Label(job.error or job.progress_text, height=20)
+                    self._job_rows[job.id] = (progress_bar, progress_label)
+
+    def set_jobs(self, jobs):
+        """Rebuild the job list, e.g. when a job is queued, starts or finishes."""
+        self._jobs = list(jobs)
+        self.jobs_frame.rebuild()
+
+    def update_job_progress(self, job):
+        """Update one job's progress without rebuilding the list."""
+        row = self._job_rows.get(job.id)
+        if row:
+            progress_bar, progress_label = row
+            progress_bar.model.set_value(job.progress)
+            progress_label.text = job.progress_text
+
+    def set_preview_status(self, text):
+        self.preview_status_label.text = text
+
+    def get_job_file(self):
+        return self.job_file_field.model.get_value_as_string().strip()
+
     def clear_inputs(self):
         self.resolution_width.model.set_value(1920)
         self.resolution_height.model.set_value(1080)
+        self.render_quality_combo.model.get_item_value_model().set_value(0)
+        self.draft_scale_field.model.set_value(0.5)
+        self.approved_frames_field.model.set_value("")
         self.shader_path_field.model.set_value("")
         self.animation_folder_field.model.set_value("")
         self.start_time_code_field.model.set_value(0)
         self.frame_duration_field.model.set_value(6)
-        self.wait_time_field.model.set_value(0.5)
+        self.wait_time_field.model.set_value(0.0)
+        self.convergence_mode_combo.model.get_item_value_model().set_value(0)
+        self.convergence_threshold_field.model.set_value(0.002)
+        self.convergence_max_time_field.model.set_value(10.0)
+        self.max_in_flight_field.model.set_value(2)
+        self.viewport_window_field.model.set_value("")
         self.output_dir_field.model.set_value("/path/to/output")
         self.output_prefix_field.model.set_value("frame")
         self.texture_type_collection.model.set_value(0)
+        self.hold_mode_checkbox.model.set_value(False)
+        self.link_mode_combo.model.get_item_value_model().set_value(0)
+        self.duration_manifest_checkbox.model.set_value(False)
+        self.resume_checkbox.model.set_value(True)
+        self.output_mode_combo.model.get_item_value_model().set_value(0)
+        self.framerate_field.model.set_value(24)
+        self.image_format_combo.model.get_item_value_model().set_value(0)
+        self.png_compression_field.model.set_value(6)
+        self.image_quality_field.model.set_value(90)
+        self.threaded_writes_checkbox.model.set_value(False)
+        self.animation_sublayer_field.model.set_value("")
+        self.hash_sources_checkbox.model.set_value(False)
+        self.bindings_field.model.set_value("")
+        self.atlas_mode_checkbox.model.set_value(False)
+        self.preprocess_checkbox.model.set_value(False)
+        self.preview_prefetch_field.model.set_value(16)
     
     
 
 
 class ShaderAnimationLogic:
-    terminate_flag = False
+    # Runs submitted from the UI or a batch file; one at a time, since every run drives the timeline
+    job_manager = JobManager()
+    # The running TexturePreview, if any
+    preview = None
 
     @staticmethod
-    async def render_frame(output_path, resolution):
+    async def render_frame(output_path, resolution, pipeline=None, on_complete=None, stream=None,
+                           image_writer=None, viewport_name=None):
         """
         Render a single frame using the active ViewportAPI and save to file.
+
+        Without a pipeline this waits until the file has been written. With a pipeline it only waits for
+        the frame the capture is bound to, then hands the capture to the pipeline so the file is written
+        while the caller moves on.
+
+        Args:
+            output_path (str): Destination image path, or None to only stream the frame. The extension
+                selects the format FileCapture writes.
+            resolution (tuple): Render resolution (width, height).
+            pipeline (CapturePipeline): Optional pipeline tracking in-flight captures.
+            on_complete (callable): Optional blocking callback run once the file has been written.
+            stream (tuple): Optional (FFmpegStreamWriter, frame_index, repeat) receiving the raw pixels.
+            image_writer (ImageWriter): Optional writer that encodes the captured buffer off-thread instead
+                of FileCapture; on_complete then runs on a writer thread once the file is complete.
+            viewport_name (str): Viewport window to render through, None for the active one.
         """
-        viewport_window = get_active_viewport_window()
+        viewport_window = get_active_viewport_window(viewport_name)
         if not viewport_window:
             print("Error: No active viewport found.")
+            if stream:
+                writer, frame_index, repeat = stream
+                writer.skip(frame_index, repeat)
             return
 
         viewport_api = viewport_window.viewport_api
-        viewport_api.fill_frame = False  # Disable auto resolution adjustment
-        viewport_api.resolution = resolution
-        print(f"Resolution set to: {viewport_api.resolution}")
+        if tuple(viewport_api.resolution) != tuple(resolution):
+            viewport_api.fill_frame = False  # Disable auto resolution adjustment
+            viewport_api.resolution = resolution
+            print(f"Resolution set to: {viewport_api.resolution}")
 
-        capture = viewport_api.schedule_capture(FileCapture(output_path))
-        captured_aovs = await capture.wait_for_result()
+        captures = []
+        if output_path and image_writer is None:
+            captures.append(viewport_api.schedule_capture(ShaderAnimationLogic._file_capture(output_path)))
 
-        if captured_aovs:
-            print(f'Image was successfully saved to "{output_path}"')
-        else:
-            print("Failed to save the image.")
+        # One buffer capture feeds both the off-thread image writer and the video stream
+        stream_frame = None
+        if stream or (output_path and image_writer):
+            stream_frame = StreamFrame()
+            captures.append(viewport_api.schedule_capture(stream_frame.delegate()))
 
+        on_failure = None
+        label = output_path
+        if output_path and image_writer:
+            on_complete = partial(image_writer.submit, output_path, stream_frame, on_complete)
+        if stream:
+            writer, frame_index, repeat = stream
+            on_complete = partial(
+                ShaderAnimationLogic._write_stream_frame, stream_frame, writer, frame_index, repeat, on_complete
+            )
+            on_failure = partial(writer.skip, frame_index, repeat)
+            label = label or f"{writer.output_video} frame {frame_index}"
 
+        capture = captures[0] if len(captures) == 1 else CombinedCapture(captures)
+
+        if pipeline is None:
+            captured_aovs = await capture.wait_for_result()
+            if captured_aovs:
+                print(f'Image was successfully saved to "{label}"')
+                if on_complete:
+                    on_complete()
+            else:
+                print("Failed to save the image.")
+                if on_failure:
+                    on_failure()
+            return
+
+        # The capture is bound to the next delivered frame; once that frame is out the scene may change.
+        await viewport_api.wait_for_rendered_frames(1)
+        await pipeline.submit(capture, label, on_complete, on_failure)
 
     @staticmethod
-    async def run_animation(inputs):
+    def _file_capture(output_path):
+        """FileCapture for an output path; EXR is captured from the HDR color AOV for compositing."""
+        if output_path.lower().endswith(".exr"):
+            return FileCapture(output_path, aov_name="HdrColor")
+        return FileCapture(output_path)
+
+    @staticmethod
+    def _check_exr_pixel_types(path):
+        """Warn if FileCapture wrote an EXR frame with other channels than the half floats the format promises."""
+        try:
+            pixel_types = read_exr_pixel_types(path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read the channels of '{path}': {e}")
+            return
+        other = {channel: pixel_type for channel, pixel_type in pixel_types.items() if pixel_type != "half"}
+        if other:
+            print(f"Warning: '{path}' is not half-float: {', '.join(f'{c} {t}' for c, t in sorted(other.items()))}")
+
+    @staticmethod
+    def _write_stream_frame(stream_frame, writer, frame_index, repeat, on_complete=None):
+        """Hand a captured buffer to the encoder; blocks while the encoder is behind."""
+        writer.write(frame_index, stream_frame.data, repeat)
+        if on_complete:
+            on_complete()
+
+    @staticmethod
+    async def run_animation(inputs, token=None, on_progress=None):
+        """
+        Render every texture in the animation folder through the active viewport, or through
+        inputs["viewport_window"] if set.
+
+        With inputs["render_quality"] set to "draft" the run renders at a fraction of the resolution with lower
+        sample settings into the draft output tree; "promote" re-renders only the approved frames at full
+        resolution (see render_quality.quality_inputs()).
+
+        All bindings (the main shader input plus inputs["bindings"]) advance in lockstep and are applied in
+        one batched stage edit per texture, so each frame costs one render however many inputs are animated.
+
+        Args:
+            inputs (dict): Render inputs, as returned by ShaderAnimationUI.get_inputs() or jobs.load_job_file().
+            token (CancellationToken): Checked between textures; cancelling stops the run after the current
+                texture and leaves its manifests consistent.
+            on_progress (callable): Optional callback receiving (fraction, text) after each texture.
+
+        Returns:
+            bool: False if the run could not start because of invalid inputs, True otherwise.
+        """
+        try:
+            inputs, approved_frames = quality_inputs(inputs)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return False
+        render_quality = inputs.get("render_quality", "final")
+
         stage = omni.usd.get_context().get_stage()
-        shader_path = inputs["shader_path"]
-        animation_folder = inputs["animation_folder"]
         resolution = (inputs["resolution_width"], inputs["resolution_height"])
         frame_duration = inputs["frame_duration"]
         wait_time = inputs["wait_time"]
+        convergence_mode = inputs.get("convergence_mode", "off")
+        convergence_threshold = inputs.get("convergence_threshold", 0.002)
+        convergence_max_time = inputs.get("convergence_max_time", 10.0)
         output_dir = inputs["output_dir"]
         output_prefix = inputs["output_prefix"]
-        texture_type = inputs["texture_type"]
+        hold_mode = inputs.get("hold_mode", False)
+        link_mode = inputs.get("link_mode", "auto")
+        write_manifest = inputs.get("write_duration_manifest", False)
+        max_in_flight = inputs.get("max_in_flight", 2)
+        texture_start = inputs.get("texture_start") or 0
+        texture_end = inputs.get("texture_end")
+        completion_manifest = inputs.get("completion_manifest")
+        resume = inputs.get("resume", True)
+        hash_sources = inputs.get("hash_sources", False)
+        output_mode = inputs.get("output_mode", "png")
+        framerate = inputs.get("framerate", 24)
+        image_format = inputs.get("image_format", "png")
+        threaded_writes = inputs.get("threaded_writes", False)
+        write_png = output_mode in ("png", "png+stream")
+        stream_video = output_mode in ("stream", "png+stream")
 
-        # Validate shader and input
-        shader_prim = stage.GetPrimAtPath(shader_path)
-        if not shader_prim.IsValid():
-            print(f"Error: Shader not found at path {shader_path}")
-            return
+        if image_format not in IMAGE_FORMATS:
+            print(f"Error: Unsupported image format '{image_format}', expected one of {', '.join(IMAGE_FORMATS)}.")
+            return False
+        if convergence_mode not in CONVERGENCE_MODES:
+            print(f"Error: Unknown convergence mode '{convergence_mode}', "
+                  f"expected one of {', '.join(CONVERGENCE_MODES)}.")
+            return False
+        if convergence_mode == "samples" and path_tracing_frames() is None:
+            print("The renderer is not path tracing, so sample counts are not available: converging on buffer deltas.")
+            convergence_mode = "delta"
+        if approved_frames is not None and stream_video:
+            print("Error: Approved frames render a subset of the sequence, which cannot be streamed to a video. "
+                  "Use the png output mode.")
+            return False
+        if threaded_writes and image_format not in THREADED_FORMATS:
+            print(f"Writing {image_format} frames with FileCapture; off-thread writes support PNG, JPEG and WebP.")
+            threaded_writes = False
+        format_option = {"png": "png_compression", "jpg": "image_quality", "webp": "image_quality"}.get(image_format)
+        if (write_png and not threaded_writes and format_option
+                and inputs.get(format_option, DEFAULT_INPUTS[format_option]) != DEFAULT_INPUTS[format_option]):
+            print(f"Warning: '{format_option}' only applies to off-thread writes (threaded_writes); "
+                  "FileCapture writes with Kit's own settings.")
 
-        shader = UsdShade.Shader(shader_prim)
-        texture_input = shader.GetInput(texture_type)
-        if not texture_input:
-            print(f"Error: Specified texture input '{texture_type}' not found in Shader.")
-            return
+        # Validate shaders, inputs and animation folders, and load valid texture files
+        scan_start = time.perf_counter()
+        edit_layer = stage.GetEditTarget().GetLayer()
+        bindings = bindings_from_inputs(inputs)
+        if not prepare_bindings(stage, edit_layer, bindings, inputs.get("atlas_mode", False)):
+            return False
+        scan_seconds = time.perf_counter() - scan_start
+        texture_count = sequence_length(bindings)
+        if len(bindings) > 1:
+            print(f"Animating {len(bindings)} bindings over {texture_count} steps: {bindings}")
+
+        # A shard renders a contiguous slice of the sequence; frame indices stay global
+        shard_indices, render_indices = ShaderAnimationLogic._render_indices(inputs, texture_count, approved_frames)
+        approved = None if approved_frames is None else set(approved_frames)
+
+        # Resume: skip frames that exist and were rendered from the same texture version and settings
+        render_manifest = None
+        render_settings = settings_key(inputs, {"stage": stage.GetRootLayer().identifier})
+        if resume and stream_video:
+            print("Streaming needs every frame, skipped frames would leave gaps in the video: rendering all frames.")
+        elif resume:
+            render_manifest = RenderManifest.load(manifest_path(output_dir, output_prefix))
 
-        # Validate animation folder and output directory
+        # Check every texture header, the disk space and the tools before spending any render time
+        preflight = None
+        if inputs.get("preflight", True):
+            preflight = await asyncio.get_event_loop().run_in_executor(
+                None, partial(ShaderAnimationLogic._preflight_report, inputs, bindings, render_indices, approved,
+                              render_manifest, render_settings)
+            )
+            print(preflight.format())
+            if not preflight.ok:
+                print("Error: Preflight failed, the run was not started.")
+                return False
+
+        # Optional preflight: render from resized, mipmapped copies kept in a content-addressed cache
+        preprocess_seconds = None
+        if inputs.get("preprocess_textures"):
+            preprocess_start = time.perf_counter()
+            texture_cache = await ShaderAnimationLogic._preprocess_textures(inputs, bindings)
+            if texture_cache is None:
+                return False
+            preprocess_seconds = time.perf_counter() - preprocess_start
+
+        # Atlas mode: pack each sequence off the main thread, then step through cells by UV translation
+        atlas_seconds = None
+        if inputs.get("atlas_mode"):
+            atlas_start = time.perf_counter()
+            cache_dir = inputs.get("atlas_cache_dir") or os.path.join(output_dir, "atlas_cache")
+            pack = partial(pack_atlases, bindings, cache_dir, inputs.get("atlas_max_size") or 8192)
+            try:
+                await asyncio.get_event_loop().run_in_executor(None, pack)
+            except (RuntimeError, ValueError, OSError) as e:
+                print(f"Error: Could not pack the texture atlas: {e}")
+                return False
+            if not prepare_atlas_inputs(stage, edit_layer, bindings):
+                return False
+            atlas_seconds = time.perf_counter() - atlas_start
+
+        # Validate output directory
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
             print(f"Created output directory: {output_dir}")
 
-        # Load valid texture files
-        files = sorted(glob(os.path.join(animation_folder, "*")))
-        valid_files = [f for f in files if os.path.isfile(f) and f.lower().endswith((".jpg", ".png"))]
-        if not valid_files:
-            print("Error: No valid texture files found.")
-            return
-
-        ShaderAnimationLogic.terminate_flag = False
+        token = token or CancellationToken()
 
-        # Get the active viewport
-        viewport_window = get_active_viewport_window()
+        # Get the viewport to render through
+        viewport_name = inputs.get("viewport_window") or None
+        viewport_window = get_active_viewport_window(viewport_name)
         if not viewport_window:
-            print("Error: No active viewport found.")
-            return
+            print(f"Error: Viewport window '{viewport_name}' not found." if viewport_name else
+                  "Error: No active viewport found.")
+            return False
 
         viewport_api = viewport_window.viewport_api
 
@@ -194,62 +630,581 @@ class ShaderAnimationLogic:
 
         # Set start and end times for the timeline
         start_time_code = 0
-        end_time_code = len(valid_files) * frame_duration
+        end_time_code = texture_count * frame_duration
         timeline.set_start_time(start_time_code)
         timeline.set_end_time(end_time_code)
 
-        for texture_index, texture_path in enumerate(valid_files):
-            if ShaderAnimationLogic.terminate_flag:
-                print("Rendering process terminated by user.")
-                break
+        if len(shard_indices) < texture_count:
+            print(f"Rendering textures {shard_indices.start} to {shard_indices.stop - 1} of {texture_count}")
+        if approved_frames is not None:
+            print(f"Rendering approved frames {format_frame_ranges(approved_frames)}: "
+                  f"{len(render_indices)} of {len(shard_indices)} textures")
+        if render_quality == "draft":
+            print(f"Rendering a draft at {resolution[0]}x{resolution[1]} into {output_dir}")
 
-            try:
-                # Step 1: Load the texture
-                texture_input.Set(Sdf.AssetPath(texture_path))
-                print(f"Assigned texture '{texture_path}' to {texture_type}")
+        metrics = RunMetrics(inputs.get("metrics_file") or metrics_path(output_dir, output_prefix), len(render_indices))
+        metrics.event(
+            "start", name=inputs.get("name"), textures=len(render_indices), texture_start=shard_indices.start,
+            frame_duration=frame_duration, resolution=resolution, output_mode=output_mode, hold_mode=hold_mode,
+            render_quality=render_quality,
+        )
+        metrics.record("scan", scan_seconds, bindings=len(bindings), textures=texture_count)
+        if preflight is not None:
+            metrics.record(
+                "preflight", preflight.seconds, files=preflight.file_count, estimated_bytes=preflight.estimated_bytes,
+                estimated_seconds=preflight.estimated_seconds,
+            )
+        if preprocess_seconds is not None:
+            metrics.record(
+                "preprocess", preprocess_seconds, converted=texture_cache.converted, reused=texture_cache.reused
+            )
+        if atlas_seconds is not None:
+            metrics.record("atlas", atlas_seconds, sheets=sum(len(binding.atlas.sheets) for binding in bindings))
+
+        manifest_entries = []
+        pipeline = CapturePipeline(max_in_flight, metrics)
+
+        skipped_textures = 0
+        convergence_results = []
 
-                # Step 2: Set the current time on the timeline
+        writer = None
+        if stream_video:
+            stream_output = inputs.get("stream_output") or os.path.join(output_dir, f"{output_prefix}.mp4")
+            writer = FFmpegStreamWriter(
+                stream_output, resolution, framerate, first_frame=texture_start * frame_duration,
+                max_queued_frames=max(2, max_in_flight * 2), ffmpeg_path=inputs.get("ffmpeg_path", "ffmpeg"),
+                max_pending_frames=max(8, max_in_flight * 4),
+            )
+            if not writer.start():
+                metrics.close()
+                return False
+
+        image_writer = None
+        if write_png and threaded_writes:
+            image_writer = ImageWriter(
+                image_format, inputs.get("png_compression", 6), inputs.get("image_quality", 90),
+                max_workers=inputs.get("writer_threads") or None,
+            )
+
+        def record_frames(source, signature, first_frame, frame_count):
+            file_name = frame_file_name(output_prefix, first_frame, image_format)
+            manifest_entries.append((file_name, first_frame, frame_count))
+            captured_path = os.path.join(output_dir, file_name)
+            metrics.add_frames(frame_count, os.path.getsize(captured_path) if os.path.isfile(captured_path) else 0)
+            if render_manifest:
+                frame_indices = range(first_frame, first_frame + frame_count)
+                render_manifest.record(frame_indices, source, signature, render_settings)
+
+        # Drafts trade samples for speed; the previous renderer settings are restored once the frames are out,
+        # also when the run fails or is cancelled. Runs wait for each other (see submit_animation), so a draft
+        # never changes the samples of another job's frames.
+        previous_settings = {}
+        if render_quality == "draft":
+            previous_settings = apply_render_settings(inputs.get("draft_settings") or DEFAULT_DRAFT_SETTINGS)
+
+        try:
+            for texture_index in render_indices:
+                if token.cancelled:
+                    print("Rendering process terminated by user.")
+                    break
+
+                texture_start_time = time.perf_counter()
+                skipped = False
                 frame_start_time = texture_index * frame_duration
-                timeline.set_current_time(frame_start_time)
-                print(f"Set timeline current time to {frame_start_time} for texture {texture_path}")
+                # Frames handed to the video writer; the rest must be skipped if the texture fails
+                streamed_frames = []
+                try:
+                    output_paths = [
+                        os.path.join(output_dir, frame_file_name(output_prefix, frame_index, image_format))
+                        for frame_index in range(frame_start_time, frame_start_time + frame_duration)
+                    ]
 
-                # Step 3: Wait for Shader and Viewport to update
-                print("Waiting for render settings change...")
-                await viewport_api.wait_for_render_settings_change()
-                print("Render settings updated.")
+                    # A frame's source is its texture, or the list of textures when several inputs are animated
+                    textures = [binding.texture_at(texture_index) for binding in bindings]
+                    texture_path = textures[0] if len(textures) == 1 else textures
 
-                print("Waiting for rendered frame to be completed...")
-                await viewport_api.wait_for_rendered_frames(1)
-                print("Rendered frame completed.")
+                    # A held texture is captured once, so it is rendered whole if any of its frames is approved
+                    wanted_offsets = list(range(frame_duration))
+                    if approved is not None and not hold_mode:
+                        wanted_offsets = [offset for offset in wanted_offsets if frame_start_time + offset in approved]
 
-                # Step 4: Render multiple frames for the current texture
-                for frame_offset in range(frame_duration):
-                    frame_index = frame_start_time + frame_offset
-                    output_path = os.path.join(output_dir, f"{output_prefix}_{frame_index:04d}.png")
-                    print(f"Rendering frame {frame_index} for texture '{texture_path}'")
+                    signature = None
+                    stale_offsets = wanted_offsets
+                    if render_manifest:
+                        with metrics.phase("resume_check", texture=texture_index):
+                            signature = "|".join(texture_signature(texture, hash_sources) for texture in textures)
+                            stale_offsets = [
+                                frame_offset
+                                for frame_offset in wanted_offsets
+                                if not render_manifest.is_current(
+                                    frame_start_time + frame_offset, texture_path, signature, render_settings,
+                                    output_paths[frame_offset],
+                                )
+                            ]
+                        if not stale_offsets:
+                            if len(wanted_offsets) == frame_duration:
+                                manifest_entries.append(
+                                    (os.path.basename(output_paths[0]), frame_start_time, frame_duration)
+                                )
+                            else:
+                                manifest_entries.extend(
+                                    (os.path.basename(output_paths[offset]), frame_start_time + offset, 1)
+                                    for offset in wanted_offsets
+                                )
+                            skipped_textures += 1
+                            skipped = True
+                            continue
 
-                    # Capture the current frame
-                    capture = viewport_api.schedule_capture(FileCapture(output_path))
-                    await capture.wait_for_result()
+                    # Step 1: Load the textures of every binding in one stage edit
+                    with metrics.phase("apply_textures", texture=texture_index):
+                        apply_textures(edit_layer, bindings, texture_index)
+                    for binding, texture in zip(bindings, textures):
+                        print(f"Assigned texture '{texture}' to {binding.shader_path} {binding.texture_type}")
 
-                    # Add a short wait to ensure rendering stability
-                    await asyncio.sleep(wait_time)
+                    # Step 2: Set the current time on the timeline
+                    timeline.set_current_time(frame_start_time)
+                    print(f"Set timeline current time to {frame_start_time} for texture {texture_path}")
 
-            except Exception as e:
-                print(f"Error during texture {texture_index}: {e}")
+                    # Step 3: Wait for Shader and Viewport to update
+                    print("Waiting for render settings change...")
+                    with metrics.phase("wait_settings", texture=texture_index):
+                        await viewport_api.wait_for_render_settings_change()
+                    print("Render settings updated.")
+
+                    print("Waiting for rendered frame to be completed...")
+                    with metrics.phase("wait_frame", texture=texture_index):
+                        await viewport_api.wait_for_rendered_frames(1)
+                    print("Rendered frame completed.")
+
+                    # Optional convergence wait for progressive renderers, capped at the max time
+                    if convergence_mode != "off":
+                        result = await wait_for_convergence(
+                            viewport_api, convergence_mode, convergence_threshold, convergence_max_time,
+                            inputs.get("convergence_min_frames", 2),
+                        )
+                        converge_fields = {"frames": result.frames, "converged": result.converged}
+                        if result.delta is not None:
+                            converge_fields["delta"] = round(result.delta, 6)
+                        metrics.record("converge", result.seconds, texture=texture_index, **converge_fields)
+                        convergence_results.append(result)
+                        print(f"Texture {texture_index} {result}")
+
+                    # Optional settle time for progressive renderers; pacing otherwise comes from frame events
+                    if wait_time > 0:
+                        with metrics.phase("settle", texture=texture_index):
+                            await asyncio.sleep(wait_time)
+
+                    if hold_mode:
+                        # Step 4: The scene does not change during the hold, so capture once and fill the rest
+                        print(
+                            f"Rendering frame {frame_start_time} for texture '{texture_path}' (hold x{frame_duration})"
+                        )
+                        on_complete = partial(record_frames, texture_path, signature, frame_start_time, frame_duration)
+                        if write_png:
+                            on_complete = partial(
+                                ShaderAnimationLogic._fill_hold, output_paths, link_mode, on_complete
+                            )
+                        stream = (writer, frame_start_time, frame_duration) if writer else None
+                        with metrics.phase("submit", frame=frame_start_time):
+                            await ShaderAnimationLogic.render_frame(
+                                output_paths[0] if write_png else None, resolution, pipeline, on_complete, stream,
+                                image_writer, viewport_name,
+                            )
+                        streamed_frames.append(frame_start_time)
+                    else:
+                        # Step 4: Render the frames of the current texture that are missing or out of date
+                        for frame_offset, output_path in enumerate(output_paths):
+                            frame_index = frame_start_time + frame_offset
+                            if frame_offset not in wanted_offsets:
+                                continue
+                            if frame_offset not in stale_offsets:
+                                manifest_entries.append((os.path.basename(output_path), frame_index, 1))
+                                continue
+
+                            print(f"Rendering frame {frame_index} for texture '{texture_path}'")
+                            on_complete = partial(record_frames, texture_path, signature, frame_index, 1)
+                            stream = (writer, frame_index, 1) if writer else None
+                            with metrics.phase("submit", frame=frame_index):
+                                await ShaderAnimationLogic.render_frame(
+                                    output_path if write_png else None, resolution, pipeline, on_complete, stream,
+                                    image_writer, viewport_name,
+                                )
+                            streamed_frames.append(frame_index)
+
+                except Exception as e:
+                    print(f"Error during texture {texture_index}: {e}")
+                    if writer:
+                        # The writer waits for every frame in order, so account for the ones it will never get
+                        if hold_mode:
+                            if not streamed_frames:
+                                writer.skip(frame_start_time, frame_duration)
+                        else:
+                            for frame_index in range(frame_start_time, frame_start_time + frame_duration):
+                                if frame_index not in streamed_frames:
+                                    writer.skip(frame_index)
+                finally:
+                    if not skipped:
+                        metrics.record("texture", time.perf_counter() - texture_start_time, texture=texture_index)
+                    metrics.texture_finished(skipped)
+                    ShaderAnimationLogic._report_progress(inputs, metrics, on_progress)
+
+            # Let the captures that are still being written finish
+            with metrics.phase("drain"):
+                await pipeline.drain()
+        finally:
+            restore_render_settings(previous_settings)
+            # Also when the loop raised: ffmpeg, the writer threads and the metrics file must not stay open
+            if image_writer:
+                with metrics.phase("image_writes"):
+                    await asyncio.get_event_loop().run_in_executor(None, image_writer.close)
+            if writer:
+                with metrics.phase("encode_finish"):
+                    await asyncio.get_event_loop().run_in_executor(None, writer.close)
+                if os.path.isfile(writer.output_video):
+                    metrics.add_bytes(os.path.getsize(writer.output_video))
+            summary = metrics.close()
+        print(f"Captured {pipeline.completed} frames, {pipeline.failed} failed.")
+        if image_writer:
+            print(f"Wrote {image_writer.written} images off-thread, {image_writer.failed} failed.")
+        if skipped_textures:
+            print(f"Skipped {skipped_textures} textures whose frames were already up to date.")
+        if write_png and image_format == "exr" and manifest_entries:
+            ShaderAnimationLogic._check_exr_pixel_types(os.path.join(output_dir, manifest_entries[0][0]))
 
+        # Shards share the manifest with other processes that may still be appending to it
+        if render_manifest and texture_start == 0 and texture_end is None:
+            render_manifest.compact()
+
+        if write_manifest and write_png and manifest_entries:
+            manifest_entries.sort(key=lambda entry: entry[1])
+            write_duration_manifest(duration_manifest_path(output_dir, output_prefix), manifest_entries)
+
+        if completion_manifest:
+            completed_frames = [
+                frame_index
+                for _, first_frame, duration_frames in manifest_entries
+                for frame_index in range(first_frame, first_frame + duration_frames)
+            ]
+            write_completion_manifest(
+                completion_manifest, inputs, texture_count, completed_frames, token.cancelled
+            )
+
+        print(metrics.format_summary(summary))
+        if convergence_results:
+            capped = sum(1 for result in convergence_results if not result.converged)
+            print(f"Convergence: {len(convergence_results) - capped}/{len(convergence_results)} textures converged, "
+                  f"{capped} hit the {convergence_max_time:g}s cap.")
         print("Animation rendering completed.")
+        return True
 
+    @staticmethod
+    def _render_indices(inputs, texture_count, approved_frames=None):
+        """
+        Steps of the sequence a run covers.
+
+        Returns:
+            tuple: (range of the shard's steps, list of the steps to render). Promote passes render only the
+            steps holding approved frames.
+        """
+        frame_duration = inputs["frame_duration"]
+        shard_indices = range(texture_count)[inputs.get("texture_start") or 0:inputs.get("texture_end")]
+        if approved_frames is None:
+            return shard_indices, list(shard_indices)
+        approved = set(approved_frames)
+        render_indices = [
+            texture_index for texture_index in shard_indices
+            if any(frame in approved for frame in range(texture_index * frame_duration,
+                                                         (texture_index + 1) * frame_duration))
+        ]
+        return shard_indices, render_indices
+
+    @staticmethod
+    def _stale_frames(render_manifest, inputs, bindings, texture_indices, settings):
+        """
+        Frames of the given steps that a resumed run renders again: those the render manifest does not mark
+        as current for the bindings' textures and the settings (see RenderManifest.is_current).
+
+        Only touches files, so it can run on a worker thread while Kit keeps updating.
+        """
+        frame_duration = inputs["frame_duration"]
+        stale_frames = set()
+        for texture_index in texture_indices:
+            frames = range(texture_index * frame_duration, (texture_index + 1) * frame_duration)
+            textures = [binding.texture_at(texture_index) for binding in bindings]
+            texture_path = textures[0] if len(textures) == 1 else textures
+            try:
+                signature = "|".join(texture_signature(texture, inputs.get("hash_sources", False))
+                                     for texture in textures)
+            except OSError:
+                # Preflight reports the unreadable texture
+                stale_frames.update(frames)
+                continue
+            stale_frames.update(
+                frame_index for frame_index in frames
+                if not render_manifest.is_current(
+                    frame_index, texture_path, signature, settings,
+                    os.path.join(inputs["output_dir"], frame_file_name(
+                        inputs["output_prefix"], frame_index, inputs.get("image_format", "png"))),
+                )
+            )
+        return stale_frames
+
+    @staticmethod
+    def _preflight_report(inputs, bindings, texture_indices, approved, render_manifest, settings):
+        """
+        Run preflight.run_preflight, leaving out the frames a resumed run skips.
+
+        Args:
+            render_manifest (RenderManifest): Manifest of a resumed run, or None to estimate every frame.
+            settings (str): The run's settings_key().
+        """
+        stale_frames = None
+        # Preprocessed runs record the cached copies in the manifest, which do not exist before preprocessing:
+        # their estimates cover every frame
+        if render_manifest is not None and not inputs.get("preprocess_textures"):
+            stale_frames = ShaderAnimationLogic._stale_frames(render_manifest, inputs, bindings, texture_indices,
+                                                              settings)
+        return run_preflight(inputs, bindings, texture_indices, approved, stale_frames)
+
+    @staticmethod
+    async def preflight(inputs):
+        """
+        Run the checks and estimates run_animation() starts with, without rendering (see preflight.run_preflight).
+
+        Returns:
+            PreflightReport: The report, or None if the inputs are invalid; the error has been printed.
+        """
+        try:
+            inputs, approved_frames = quality_inputs(inputs)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return None
+        stage = omni.usd.get_context().get_stage()
+        bindings = bindings_from_inputs(inputs)
+        if not prepare_bindings(stage, stage.GetEditTarget().GetLayer(), bindings, inputs.get("atlas_mode", False)):
+            return None
+        _, render_indices = ShaderAnimationLogic._render_indices(inputs, sequence_length(bindings), approved_frames)
+        approved = None if approved_frames is None else set(approved_frames)
+        render_manifest = None
+        if inputs.get("resume", True) and inputs.get("output_mode", "png") not in ("stream", "png+stream"):
+            render_manifest = RenderManifest.load(manifest_path(inputs["output_dir"], inputs["output_prefix"]))
+        report = await asyncio.get_event_loop().run_in_executor(
+            None, partial(ShaderAnimationLogic._preflight_report, inputs, bindings, render_indices, approved,
+                          render_manifest, settings_key(inputs, {"stage": stage.GetRootLayer().identifier}))
+        )
+        print(report.format())
+        return report
+
+    @staticmethod
+    async def _preprocess_textures(inputs, bindings):
+        """
+        Swap the bindings' textures for their preprocessed copies, converting them off the main thread.
+
+        Returns:
+            TextureCache: The cache used, or None if preprocessing failed; the error has been printed.
+        """
+        preprocess_start = time.perf_counter()
+        try:
+            texture_cache = TextureCache(
+                inputs.get("texture_cache_dir") or os.path.join(inputs["output_dir"], "texture_cache"),
+                inputs.get("preprocess_max_size") or max(inputs["resolution_width"], inputs["resolution_height"]),
+                inputs.get("preprocess_format", "dds"),
+                int((inputs.get("texture_cache_max_gb") or 20) * (1 << 30)),
+            )
+            await asyncio.get_event_loop().run_in_executor(None, partial(preprocess_bindings, bindings, texture_cache))
+        except (RuntimeError, ValueError, OSError) as e:
+            print(f"Error: Could not preprocess textures: {e}")
+            return None
+        print(f"Preprocessed textures in {time.perf_counter() - preprocess_start:.2f}s: {texture_cache.converted} "
+              f"converted, {texture_cache.reused} reused from {texture_cache.cache_dir}")
+        return texture_cache
+
+    @staticmethod
+    def _report_progress(inputs, metrics, on_progress):
+        if on_progress is None:
+            return
+        fraction, _ = metrics.progress()
+        text = metrics.progress_text()
+        if inputs.get("name"):
+            text = f"{inputs['name']}: {text}"
+        on_progress(fraction, text)
+
+    @staticmethod
+    async def run_job_queue(jobs, stage_path=None, warmup_frames=0, token=None, on_progress=None):
+        """
+        Run render jobs back-to-back in the current Kit session.
+
+        The stage is opened and the renderer warmed up once for the whole queue rather than per job.
+
+        Args:
+            jobs (list): Inputs dicts as returned by jobs.load_job_file().
+            stage_path (str): Optional stage to open before the first job.
+            warmup_frames (int): Frames to render before the first job.
+            token (CancellationToken): Cancels the running job and skips the rest of the queue.
+            on_progress (callable): Optional callback receiving (fraction, text) for the whole queue.
+
+        Returns:
+            list: (job name, status) tuples.
+        """
+        if stage_path:
+            print(f"Opening stage {stage_path}")
+            result, error = await omni.usd.get_context().open_stage_async(stage_path)
+            if not result:
+                print(f"Error: Failed to open stage {stage_path}: {error}")
+                return [(inputs["name"], "skipped") for inputs in jobs]
+
+        if warmup_frames > 0:
+            viewport_window = get_active_viewport_window()
+            if viewport_window:
+                print(f"Warming up renderer for {warmup_frames} frames...")
+                await viewport_window.viewport_api.wait_for_rendered_frames(warmup_frames)
+
+        token = token or CancellationToken()
+        results = []
+        for job_index, inputs in enumerate(jobs):
+            if token.cancelled:
+                print("Job queue terminated by user.")
+                results.extend((remaining["name"], "skipped") for remaining in jobs[job_index:])
+                break
+
+            print(f"Starting job {job_index + 1}/{len(jobs)}: {inputs['name']}")
+            try:
+                job_progress = None
+                if on_progress:
+                    job_progress = partial(ShaderAnimationLogic._queue_progress, on_progress, job_index, len(jobs))
+                if not await ShaderAnimationLogic.run_animation(inputs, token, job_progress):
+                    status = "failed"
+                elif token.cancelled:
+                    status = "terminated"
+                else:
+                    status = "completed"
+            except Exception as e:
+                print(f"Error in job '{inputs['name']}': {e}")
+                status = "failed"
+            results.append((inputs["name"], status))
+
+        print("Job queue finished:")
+        for name, status in results:
+            print(f"  {name}: {status}")
+        return results
+
+    @staticmethod
+    def _queue_progress(on_progress, job_index, job_count, fraction, text):
+        on_progress((job_index + fraction) / job_count, f"Job {job_index + 1}/{job_count} {text}")
+
+    @staticmethod
+    async def run_job_file(path, allow_quit=False, token=None, on_progress=None):
+        """
+        Load a job file and run its queue.
+
+        Args:
+            path (str): JSON or TOML job file.
+            allow_quit (bool): Honour the file's "quit_on_finish" setting (used for headless runs).
+            token (CancellationToken): Cancels the queue.
+            on_progress (callable): Optional callback receiving (fraction, text).
+        """
+        try:
+            settings, jobs = load_job_file(path)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not load job file '{path}': {e}")
+            settings, jobs = {"quit_on_finish": True}, None
+
+        results = []
+        if jobs:
+            results = await ShaderAnimationLogic.run_job_queue(
+                jobs, settings["stage"], settings["warmup_frames"], token, on_progress
+            )
+
+        if allow_quit and settings["quit_on_finish"]:
+            omni.kit.app.get_app().post_quit()
+        return results
+
+    @staticmethod
+    def _fill_hold(output_paths, link_mode, on_filled):
+        """Fill the held frames of a texture from its single capture."""
+        if not os.path.isfile(output_paths[0]):
+            print(f"Error: Captured frame '{output_paths[0]}' was not written, skipping hold fill.")
+            return
+
+        used_mode = fill_hold_frames(output_paths[0], output_paths[1:], link_mode)
+        if used_mode:
+            print(f"Filled {len(output_paths) - 1} held frames using {used_mode}")
+        on_filled()
 
     
     @staticmethod
-    def clear_animation(shader_path, texture_type):
+    def author_time_samples(inputs):
+        """
+        Author the whole texture sequence as time samples on the shader input and any additional bindings.
+
+        The result plays back through the timeline, e.g. with Movie Capture, without a per-frame Python loop.
+
+        Returns:
+            bool: True if the samples were written.
+        """
+        stage = omni.usd.get_context().get_stage()
+        start_time_code = inputs["start_time_code"]
+        frame_duration = inputs["frame_duration"]
+
+        bindings = bindings_from_inputs(inputs)
+        if not bindings:
+            print("Error: No shader bindings specified.")
+            return False
+
+        for binding in bindings:
+            if not os.path.isdir(binding.animation_folder):
+                print(f"Error: Animation folder '{binding.animation_folder}' does not exist.")
+                return False
+            binding.files = scan_textures(binding.animation_folder)
+            if not binding.files:
+                print(f"Error: No valid texture files found in '{binding.animation_folder}'.")
+                return False
+
+            if inputs.get("atlas_mode"):
+                cache_dir = inputs.get("atlas_cache_dir") or os.path.join(inputs["output_dir"], "atlas_cache")
+                try:
+                    binding.atlas = build_atlas(binding.files, cache_dir, inputs.get("atlas_max_size") or 8192)
+                except (RuntimeError, ValueError, OSError) as e:
+                    print(f"Error: Could not pack the texture atlas: {e}")
+                    return False
+        if inputs.get("atlas_mode") and not check_atlas_shaders(stage, bindings):
+            return False
+
+        for binding in bindings:
+            if binding.atlas is not None:
+                layer = author_atlas_time_samples(
+                    stage, binding.shader_path, binding.texture_type, binding.atlas, start_time_code, frame_duration,
+                    ATLAS_TRANSLATE_INPUT, ATLAS_SCALE_INPUT, inputs.get("animation_sublayer"),
+                )
+            else:
+                layer = author_texture_time_samples(
+                    stage, binding.shader_path, binding.texture_type, binding.files, start_time_code, frame_duration,
+                    inputs.get("animation_sublayer"),
+                )
+            if layer is None:
+                return False
+        texture_count = sequence_length(bindings)
+
+        # Make the stage and timeline span the sequence
+        end_time_code = start_time_code + texture_count * frame_duration
+        stage.SetStartTimeCode(start_time_code)
+        stage.SetEndTimeCode(end_time_code)
+        timeline = omni.timeline.get_timeline_interface()
+        time_codes_per_second = timeline.get_time_codes_per_seconds()
+        timeline.set_start_time(start_time_code / time_codes_per_second)
+        timeline.set_end_time(end_time_code / time_codes_per_second)
+        return True
+
+    @staticmethod
+    def clear_animation(shader_path, texture_type, sublayer_path=None, extra_inputs=()):
         """
         Clear the animation applied to the specified Shader.
 
         Args:
             shader_path (str): Path to the Shader in the USD Stage.
             texture_type (str): The type of texture input to clear (e.g., "opacity_texture").
+            sublayer_path (str): Animation sublayer whose authored time samples should be removed as well.
+            extra_inputs (tuple): Other animated inputs to clear, e.g. the atlas UV translate and scale.
         """
         stage = omni.usd.get_context().get_stage()
 
@@ -268,6 +1223,14 @@ class ShaderAnimationLogic:
         try:
             # Clear the texture input
             texture_input.GetAttr().Clear()
+            if sublayer_path:
+                clear_texture_time_samples(stage, shader_path, texture_type, sublayer_path)
+            for input_name in extra_inputs:
+                extra_input = shader.GetInput(input_name)
+                if extra_input:
+                    extra_input.GetAttr().Clear()
+                if sublayer_path:
+                    clear_texture_time_samples(stage, shader_path, input_name, sublayer_path)
 
             # Reset the Timeline to the initial state
             timeline = omni.timeline.get_timeline_interface()
@@ -280,9 +1243,95 @@ class ShaderAnimationLogic:
 
 
 
+    @staticmethod
+    async def start_preview(inputs, on_update=None):
+        """
+        Play the texture sequence along with the timeline, for review without capturing anything.
+
+        The timeline is set to span the sequence, looped and started. Each step is shown for frame_duration
+        time codes, and the textures of the next inputs["preview_prefetch"] steps are read ahead on worker
+        threads. Stop with stop_preview().
+
+        Args:
+            inputs (dict): Render inputs, as returned by ShaderAnimationUI.get_inputs().
+            on_update (callable): Optional callback receiving the TexturePreview whenever the texture changes.
+
+        Returns:
+            TexturePreview: The running preview, or None if it could not start; the error has been printed.
+        """
+        if any(not job.done for job in ShaderAnimationLogic.job_manager.jobs):
+            print("Error: Cannot preview while render jobs are queued or running.")
+            return None
+        ShaderAnimationLogic.stop_preview()
+
+        stage = omni.usd.get_context().get_stage()
+        edit_layer = stage.GetEditTarget().GetLayer()
+        bindings = bindings_from_inputs(inputs)
+        if not prepare_bindings(stage, edit_layer, bindings):
+            return None
+        if inputs.get("preprocess_textures"):
+            if await ShaderAnimationLogic._preprocess_textures(inputs, bindings) is None:
+                return None
+        if inputs.get("atlas_mode"):
+            print("Previewing the texture files; atlas mode only applies to renders and authored time samples.")
+
+        preview = TexturePreview(
+            edit_layer, bindings, inputs["start_time_code"], inputs["frame_duration"],
+            inputs.get("preview_prefetch", 16), on_update,
+        )
+        timeline = omni.timeline.get_timeline_interface()
+        time_codes_per_second = timeline.get_time_codes_per_seconds()
+        timeline.set_start_time(preview.start_time_code / time_codes_per_second)
+        timeline.set_end_time(preview.end_time_code / time_codes_per_second)
+        timeline.set_looping(True)
+        preview.start(timeline)
+        timeline.play()
+        ShaderAnimationLogic.preview = preview
+        print(f"Previewing {preview.texture_count} textures at {time_codes_per_second:g} time codes per second, "
+              f"{preview.frame_duration} per texture")
+        return preview
+
+    @staticmethod
+    def stop_preview():
+        """Stop the running preview and pause the timeline. Returns False if no preview was running."""
+        preview = ShaderAnimationLogic.preview
+        if preview is None:
+            return False
+        ShaderAnimationLogic.preview = None
+        preview.stop()
+        omni.timeline.get_timeline_interface().pause()
+        print(f"Preview stopped: {preview.status_text()}")
+        return True
+
+    @staticmethod
+    def submit_animation(inputs):
+        """Queue a run_animation() job on the job manager. Returns the RenderJob."""
+        ShaderAnimationLogic.stop_preview()
+        manager = ShaderAnimationLogic.job_manager
+
+        async def run(job):
+            return await ShaderAnimationLogic.run_animation(inputs, job.token, partial(manager.report_progress, job))
+
+        name = inputs.get("name") or os.path.basename(os.path.normpath(inputs["animation_folder"] or "animation"))
+        return manager.submit(run, name)
+
+    @staticmethod
+    def submit_job_file(path, allow_quit=False):
+        """Queue a job file as one job on the job manager. Returns the RenderJob."""
+        ShaderAnimationLogic.stop_preview()
+        manager = ShaderAnimationLogic.job_manager
+
+        async def run(job):
+            results = await ShaderAnimationLogic.run_job_file(
+                path, allow_quit, job.token, partial(manager.report_progress, job)
+            )
+            return bool(results) and all(status != "failed" for _, status in results)
+
+        return manager.submit(run, os.path.basename(path))
+
     @staticmethod
     def terminate_process():
-        ShaderAnimationLogic.terminate_flag = True
+        ShaderAnimationLogic.job_manager.cancel_all()
 
 
 class ShaderAnimationExtension(omni.ext.IExt):
@@ -294,24 +1343,104 @@ class ShaderAnimationExtension(omni.ext.IExt):
             on_clear_inputs=self._clear_inputs,
             on_clear_animation=self._clear_animation,
             on_terminate_process=self._terminate_process,
+            on_run_job_file=self._run_job_file,
+            on_author_time_samples=self._author_time_samples,
+            on_cancel_job=self._cancel_job,
+            on_clear_finished_jobs=self._clear_finished_jobs,
+            on_start_preview=self._start_preview,
+            on_stop_preview=self._stop_preview,
+            on_preflight=self._preflight,
         )
+        self.job_manager = ShaderAnimationLogic.job_manager
+        self.job_manager.on_change = self._on_jobs_changed
+        self.job_manager.on_progress = self.ui.update_job_progress
+        self.ui.set_jobs(self.job_manager.jobs)
+
+        batch_file = carb.settings.get_settings().get(BATCH_FILE_SETTING)
+        if batch_file:
+            print(f"Running batch job file {batch_file}")
+            ShaderAnimationLogic.submit_job_file(batch_file, allow_quit=True)
 
     def on_shutdown(self):
         print("Shader Animation Extension Shutdown")
+        self.job_manager.on_change = None
+        self.job_manager.on_progress = None
+        self.job_manager.cancel_all()
+        ShaderAnimationLogic.stop_preview()
         if self.ui.window:
             self.ui.window.destroy()
             self.ui = None
 
+    def _get_inputs(self):
+        try:
+            return self.ui.get_inputs()
+        except ValueError as e:
+            print(f"Error: {e}")
+            return None
+
     def _run_animation(self):
-        inputs = self.ui.get_inputs()
-        asyncio.ensure_future(ShaderAnimationLogic.run_animation(inputs))
+        inputs = self._get_inputs()
+        if inputs:
+            ShaderAnimationLogic.submit_animation(inputs)
+
+    def _run_job_file(self):
+        job_file = self.ui.get_job_file()
+        if not job_file:
+            print("Error: No job file specified.")
+            return
+        ShaderAnimationLogic.submit_job_file(job_file)
+
+    def _on_jobs_changed(self, job):
+        if self.ui:
+            self.ui.set_jobs(self.job_manager.jobs)
+
+    def _cancel_job(self, job_id):
+        self.job_manager.cancel(job_id)
+
+    def _clear_finished_jobs(self):
+        self.job_manager.clear_finished()
+
+    def _preflight(self):
+        inputs = self._get_inputs()
+        if inputs:
+            asyncio.ensure_future(ShaderAnimationLogic.preflight(inputs))
+
+    def _start_preview(self):
+        inputs = self._get_inputs()
+        if inputs:
+            asyncio.ensure_future(self._run_preview(inputs))
+
+    async def _run_preview(self, inputs):
+        self.ui.set_preview_status("Preparing preview...")
+        preview = await ShaderAnimationLogic.start_preview(inputs, self._on_preview_update)
+        if self.ui and preview is None:
+            self.ui.set_preview_status("Preview failed to start, see the console")
+
+    def _on_preview_update(self, preview):
+        if self.ui:
+            self.ui.set_preview_status(preview.status_text())
+
+    def _stop_preview(self):
+        if ShaderAnimationLogic.stop_preview():
+            self.ui.set_preview_status("Preview stopped")
 
     def _clear_inputs(self):
         self.ui.clear_inputs()
 
     def _clear_animation(self):
-        inputs = self.ui.get_inputs()
-        ShaderAnimationLogic.clear_animation(inputs["shader_path"], inputs["texture_type"])
+        inputs = self._get_inputs()
+        if not inputs:
+            return
+        extra_inputs = (ATLAS_TRANSLATE_INPUT, ATLAS_SCALE_INPUT) if inputs.get("atlas_mode") else ()
+        for binding in bindings_from_inputs(inputs):
+            ShaderAnimationLogic.clear_animation(
+                binding.shader_path, binding.texture_type, inputs["animation_sublayer"], extra_inputs
+            )
+
+    def _author_time_samples(self):
+        inputs = self._get_inputs()
+        if inputs:
+            ShaderAnimationLogic.author_time_samples(inputs)
 
     def _terminate_process(self):
         ShaderAnimationLogic.terminate_process()
@@ -0,0 +1,225 @@
+import ctypes
+import collections
+import os
+import subprocess
+import tempfile
+import threading
+
+from omni.kit.widget.viewport.capture import ByteCapture
+
+from .encoding import ffmpeg_output_args
+
+
+def capsule_to_bytes(buffer, buffer_size):
+    """Copy a captured viewport buffer (a PyCapsule) into a bytes object."""
+    ctypes.pythonapi.PyCapsule_GetPointer.restype = ctypes.POINTER(ctypes.c_byte * buffer_size)
+    ctypes.pythonapi.PyCapsule_GetPointer.argtypes = [ctypes.py_object, ctypes.c_char_p]
+    content = ctypes.pythonapi.PyCapsule_GetPointer(buffer, None)
+    return bytes(content.contents)
+
+
+class StreamFrame:
+    """Receives the RGBA pixels of one viewport capture."""
+
+    def __init__(self):
+        self.data = None
+        self.size = None
+
+    def delegate(self):
+        return ByteCapture(self._on_capture_completed)
+
+    def _on_capture_completed(self, buffer, buffer_size, width, height, format):
+        self.data = capsule_to_bytes(buffer, buffer_size)
+        self.size = (width, height)
+
+
+class FFmpegStreamWriter:
+    """
+    Feeds raw RGBA frames to a long-lived ffmpeg process over stdin.
+
+    Frames may arrive out of order from concurrent captures; they are reordered by frame index before
+    being written. At most max_queued_frames frames wait for ffmpeg, after which write() blocks so the
+    render loop cannot outrun the encoder; skip() never blocks, so it is safe on Kit's main thread. At most
+    max_pending_frames frames wait for an earlier frame; beyond that the missing frames are given up on and
+    the previous frame is shown in their place, so a lost capture cannot make later frames pile up in memory.
+    """
+
+    def __init__(self, output_video, resolution, framerate, first_frame=0, max_queued_frames=8, ffmpeg_path="ffmpeg",
+                 max_pending_frames=16):
+        self.output_video = output_video
+        self.resolution = tuple(resolution)
+        self.framerate = framerate
+        self.ffmpeg_path = ffmpeg_path
+        self.max_queued_frames = max(1, max_queued_frames)
+        self.max_pending_frames = max(1, max_pending_frames)
+        self.frames_written = 0
+        self.frames_repeated = 0
+        self.frames_dropped = 0
+        self.error = None
+        self._next_frame = first_frame
+        self._pending = {}
+        # (data, repeat) items in frame order, waiting for the write thread; None ends the stream
+        self._ready = collections.deque()
+        self._condition = threading.Condition()
+        self._process = None
+        self._thread = None
+        self._log = None
+
+    @property
+    def frame_size(self):
+        return self.resolution[0] * self.resolution[1] * 4
+
+    def start(self):
+        """Start ffmpeg. Returns False if it could not be started."""
+        width, height = self.resolution
+        command = [
+            self.ffmpeg_path, "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-framerate", str(self.framerate),
+            "-i", "-",
+        ] + ffmpeg_output_args(self.framerate) + [self.output_video]
+
+        output_dir = os.path.dirname(os.path.abspath(self.output_video))
+        os.makedirs(output_dir, exist_ok=True)
+        self._log = tempfile.TemporaryFile()
+        try:
+            self._process = subprocess.Popen(
+                command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._log
+            )
+        except OSError as e:
+            print(f"Error: Could not start ffmpeg ('{self.ffmpeg_path}'): {e}")
+            return False
+
+        self._thread = threading.Thread(target=self._write_loop, name="ffmpeg-stream", daemon=True)
+        self._thread.start()
+        print(f"Streaming frames to {self.output_video}")
+        return True
+
+    def write(self, frame_index, data, repeat=1, block=True):
+        """
+        Queue a frame, shown for `repeat` frames. Blocks while ffmpeg is behind, unless block is False.
+
+        Frames with the wrong size are replaced by a repeat of the previous frame.
+        """
+        if data is not None and len(data) != self.frame_size:
+            print(f"Error: Frame {frame_index} has {len(data)} bytes, expected {self.frame_size}; repeating previous.")
+            data = None
+
+        with self._condition:
+            if frame_index < self._next_frame or frame_index in self._pending:
+                return
+            self._pending[frame_index] = (data, repeat)
+            self._queue_ready()
+            if len(self._pending) > self.max_pending_frames:
+                self._skip_to(min(self._pending))
+                self._queue_ready()
+            if block:
+                # Waiting releases the lock, so captures completing meanwhile are still reordered
+                self._condition.wait_for(
+                    lambda: len(self._ready) <= self.max_queued_frames or self._thread is None
+                    or not self._thread.is_alive()
+                )
+
+    def skip(self, frame_index, repeat=1):
+        """
+        Account for a frame that failed to capture; the previous frame is shown in its place.
+
+        Never blocks: the gap is a few bytes in the queue, however far behind ffmpeg is.
+        """
+        self.write(frame_index, None, repeat, block=False)
+
+    def _queue_ready(self):
+        while self._next_frame in self._pending:
+            data, repeat = self._pending.pop(self._next_frame)
+            self._ready.append((data, repeat))
+            self._next_frame += repeat
+        self._condition.notify_all()
+
+    def _skip_to(self, frame_index):
+        """Repeat the previous frame for the frames before frame_index that never arrived."""
+        print(f"Warning: Frames {self._next_frame}-{frame_index - 1} were never captured.")
+        self._ready.append((None, frame_index - self._next_frame))
+        self._next_frame = frame_index
+        self._condition.notify_all()
+
+    def close(self):
+        """
+        Flush remaining frames and wait for ffmpeg to finish the file.
+
+        Returns:
+            bool: True if the video was written successfully.
+        """
+        if self._process is None:
+            return False
+
+        with self._condition:
+            for frame_index in sorted(self._pending):
+                if frame_index > self._next_frame:
+                    self._skip_to(frame_index)
+                data, repeat = self._pending.pop(frame_index)
+                self._ready.append((data, repeat))
+                self._next_frame = frame_index + repeat
+            self._ready.append(None)
+            self._condition.notify_all()
+        self._thread.join()
+        returncode = self._process.wait()
+
+        if returncode != 0 or self.error:
+            self._log.seek(0)
+            details = self._log.read().decode("utf-8", errors="replace").strip()
+            print(f"Error: ffmpeg failed with exit code {returncode}: {self.error or ''} {details}")
+            self._log.close()
+            return False
+
+        self._log.close()
+        dropped = f", {self.frames_dropped} missing: no frame was captured" if self.frames_dropped else ""
+        print(
+            f"Video saved to {self.output_video} "
+            f"({self.frames_written} frames, {self.frames_repeated} repeated for failed captures{dropped})"
+        )
+        return True
+
+    def _write_loop(self):
+        previous = None
+        # Frames that failed before the first capture arrived are shown as that first frame
+        leading = 0
+        stdin = self._process.stdin
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._ready)
+                item = self._ready.popleft()
+                self._condition.notify_all()
+            if item is None:
+                break
+            if self.error:
+                # ffmpeg is gone; keep draining so producers never block
+                continue
+
+            data, repeat = item
+            if data is None:
+                if previous is None:
+                    leading += repeat
+                    continue
+                data = previous
+                self.frames_repeated += repeat
+            elif leading:
+                print(f"Warning: The first {leading} frames failed to capture; the first captured frame is shown "
+                      "in their place.")
+                self.frames_repeated += leading
+                repeat += leading
+                leading = 0
+            try:
+                for _ in range(repeat):
+                    stdin.write(data)
+                self.frames_written += repeat
+            except (BrokenPipeError, OSError) as e:
+                self.error = str(e)
+            previous = data
+
+        if leading:
+            print(f"Warning: None of the {leading} frames of the video was captured.")
+            self.frames_dropped += leading
+
+        try:
+            stdin.close()
+        except OSError:
+            pass
@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import sys
+
+# Strategies for filling the remaining frames of a texture hold, tried in order for "auto".
+LINK_MODES = ("auto", "hardlink", "reflink", "copy")
+
+# ioctl request number for FICLONE on Linux (btrfs, xfs, ...).
+_FICLONE = 0x40049409
+
+
+def _remove_existing(path):
+    if os.path.lexists(path):
+        os.remove(path)
+
+
+def _hardlink(source_path, target_path):
+    os.link(source_path, target_path)
+
+
+def _reflink(source_path, target_path):
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        with open(source_path, "rb") as src, open(target_path, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            except OSError:
+                dst.close()
+                os.remove(target_path)
+                raise
+    elif sys.platform == "darwin":
+        import subprocess
+
+        subprocess.run(["cp", "-c", source_path, target_path], check=True, capture_output=True)
+    else:
+        raise OSError(f"Reflinks are not supported on {sys.platform}")
+
+
+def _copy(source_path, target_path):
+    shutil.copyfile(source_path, target_path)
+
+
+_LINKERS = {
+    "hardlink": _hardlink,
+    "reflink": _reflink,
+    "copy": _copy,
+}
+
+
+def fill_hold_frames(source_path, target_paths, link_mode="auto"):
+    """
+    Fill the remaining frames of a texture hold from a single captured frame.
+
+    Args:
+        source_path (str): The frame that was actually rendered.
+        target_paths (list): Output paths that should show the same image.
+        link_mode (str): One of LINK_MODES. "auto" tries hardlink, then reflink, then copy.
+
+    Returns:
+        str: The strategy that was used for the last target, or None if there were no targets.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode '{link_mode}', expected one of {LINK_MODES}")
+
+    strategies = ["hardlink", "reflink", "copy"] if link_mode == "auto" else [link_mode]
+    used = None
+    for target_path in target_paths:
+        _remove_existing(target_path)
+        for index, strategy in enumerate(strategies):
+            try:
+                _LINKERS[strategy](source_path, target_path)
+            except (OSError, NotImplementedError, ImportError) as e:
+                if index == len(strategies) - 1:
+                    raise
+                # Filesystem does not support this strategy; do not retry it for the rest of the hold.
+                print(f"{strategy} failed for '{target_path}' ({e}), falling back.")
+                continue
+            strategies = strategies[index:]
+            used = strategy
+            break
+    return used
+
+
+def duration_manifest_path(output_dir, output_prefix):
+    return os.path.join(output_dir, f"{output_prefix}_durations.json")
+
+
+def write_duration_manifest(manifest_path, entries):
+    """
+    Write a per-frame duration manifest that images_to_video.py can consume with --duration_manifest.
+
+    Args:
+        manifest_path (str): Destination of the JSON manifest.
+        entries (list): (file_name, frame_index, duration_frames) tuples in playback order.
+            file_name is relative to the manifest's directory.
+    """
+    manifest = {
+        "version": 1,
+        "frames": [
+            {"file": file_name, "frame_index": frame_index, "duration_frames": duration_frames}
+            for file_name, frame_index, duration_frames in entries
+        ],
+    }
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    print(f"Duration manifest written to {manifest_path}")
@@ -0,0 +1,118 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow ships with Kit's pip archive; without it only FileCapture can write images
+    Image = None
+
+# Output image formats and the file extension each one is written with
+IMAGE_FORMATS = ("png", "exr", "jpg", "webp")
+
+# Formats the off-thread writer can encode from the 8-bit RGBA capture buffer. EXR keeps the renderer's
+# HDR output and is always written by FileCapture.
+THREADED_FORMATS = ("png", "jpg", "webp")
+
+
+def frame_file_name(output_prefix, frame_index, image_format="png"):
+    return f"{output_prefix}_{frame_index:04d}.{image_format}"
+
+
+def encode_image(output_path, data, size, image_format="png", png_compression=6, quality=90):
+    """
+    Encode an 8-bit RGBA buffer and write it to output_path.
+
+    The image is written to a temporary file first and renamed into place, so a frame that exists on disk
+    is always complete.
+
+    Args:
+        output_path (str): Destination file.
+        data (bytes): RGBA pixels, row by row.
+        size (tuple): (width, height) of the buffer.
+        image_format (str): "png", "jpg" or "webp".
+        png_compression (int): zlib level 0 (fastest) to 9 (smallest) for PNG.
+        quality (int): 1-100 for JPEG and WebP.
+
+    Returns:
+        int: Bytes written.
+    """
+    if Image is None:
+        raise RuntimeError("Writing images off-thread requires the 'Pillow' module.")
+
+    image = Image.frombuffer("RGBA", tuple(size), data, "raw", "RGBA", 0, 1)
+    if image_format == "png":
+        options = {"format": "PNG", "compress_level": png_compression}
+    elif image_format == "jpg":
+        image = image.convert("RGB")
+        options = {"format": "JPEG", "quality": quality}
+    elif image_format == "webp":
+        options = {"format": "WEBP", "quality": quality}
+    else:
+        raise ValueError(f"Unsupported off-thread image format '{image_format}'")
+
+    temp_path = f"{output_path}.tmp"
+    image.save(temp_path, **options)
+    os.replace(temp_path, output_path)
+    return os.path.getsize(output_path)
+
+
+class ImageWriter:
+    """
+    Encodes and writes captured RGBA buffers on a bounded pool of threads.
+
+    submit() returns as soon as the buffer is queued. Once max_queued buffers are waiting it blocks the
+    calling thread, which keeps memory bounded when the disk cannot keep up with the renderer.
+    """
+
+    def __init__(self, image_format="png", png_compression=6, quality=90, max_workers=None, max_queued=None):
+        self.image_format = image_format
+        self.png_compression = png_compression
+        self.quality = quality
+        self.written = 0
+        self.failed = 0
+        self.bytes_written = 0
+        max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self._slots = threading.BoundedSemaphore(max_queued or max_workers * 2)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="proviz_image_writer")
+
+    def submit(self, output_path, frame, on_written=None):
+        """
+        Queue a captured frame for writing.
+
+        Args:
+            output_path (str): Destination file.
+            frame (StreamFrame): The capture holding the RGBA buffer and its size.
+            on_written (callable): Optional callback run on the writer thread once the file is complete.
+        """
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._write, output_path, frame.data, frame.size, on_written)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _write(self, output_path, data, size, on_written):
+        try:
+            byte_count = encode_image(output_path, data, size, self.image_format, self.png_compression, self.quality)
+            with self._lock:
+                self.written += 1
+                self.bytes_written += byte_count
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            print(f"Error writing image '{output_path}': {e}")
+            return
+        finally:
+            self._slots.release()
+
+        if on_written:
+            try:
+                on_written()
+            except Exception as e:
+                print(f"Error after writing image '{output_path}': {e}")
+
+    def close(self):
+        """Wait for every queued image to be written."""
+        self._executor.shutdown(wait=True)
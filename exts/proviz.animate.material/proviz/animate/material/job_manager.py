@@ -0,0 +1,157 @@
+import asyncio
+import itertools
+import time
+
+# Job states, in the order a job moves through them
+JOB_STATES = ("queued", "running", "completed", "failed", "cancelled")
+
+
+class CancellationToken:
+    """Cooperative cancellation; a run checks it between textures so its manifests stay consistent."""
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class RenderJob:
+    """A run submitted to the JobManager, with its state, progress and result."""
+
+    def __init__(self, job_id, name):
+        self.id = job_id
+        self.name = name
+        self.token = CancellationToken()
+        self.state = "queued"
+        self.progress = 0.0
+        self.progress_text = ""
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.task = None
+
+    @property
+    def done(self):
+        return self.state in ("completed", "failed", "cancelled")
+
+    def __repr__(self):
+        return f"#{self.id} {self.name} [{self.state}]"
+
+
+class JobManager:
+    """
+    Runs render jobs as asyncio tasks, one at a time in submission order.
+
+    Every run drives the one timeline and the global render settings, whichever viewport it renders through,
+    so the manager is a queue rather than a way to render in parallel. Every job has its own cancellation token.
+    """
+
+    def __init__(self, max_finished=20):
+        self.max_finished = max_finished
+        self.on_change = None
+        self.on_progress = None
+        self._jobs = {}
+        self._lock = asyncio.Lock()
+        self._ids = itertools.count(1)
+
+    @property
+    def jobs(self):
+        return list(self._jobs.values())
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def submit(self, run_fn, name):
+        """
+        Queue a job.
+
+        Args:
+            run_fn (callable): Coroutine function called with the RenderJob once the jobs before it have
+                finished. It should check job.token between units of work and call report_progress(). Its
+                return value is the job's result; False or an exception marks the job as failed.
+            name (str): Display name.
+
+        Returns:
+            RenderJob: The queued job.
+        """
+        job = RenderJob(next(self._ids), name)
+        self._jobs[job.id] = job
+        job.task = asyncio.ensure_future(self._run(job, run_fn))
+        self._prune()
+        self._changed(job)
+        return job
+
+    async def _run(self, job, run_fn):
+        # asyncio.Lock wakes its waiters in the order they started waiting, i.e. submission order
+        async with self._lock:
+            if job.token.cancelled:
+                self._finish(job, "cancelled")
+                return job
+
+            job.state = "running"
+            job.started = time.time()
+            self._changed(job)
+            try:
+                job.result = await run_fn(job)
+            except Exception as e:
+                print(f"Error in job {job}: {e}")
+                job.error = str(e)
+                self._finish(job, "failed")
+                return job
+
+            if job.token.cancelled:
+                self._finish(job, "cancelled")
+            elif job.result is False:
+                self._finish(job, "failed")
+            else:
+                job.progress = 1.0
+                self._finish(job, "completed")
+        return job
+
+    def _finish(self, job, state):
+        job.state = state
+        job.finished = time.time()
+        self._changed(job)
+
+    def report_progress(self, job, fraction, text):
+        job.progress = fraction
+        job.progress_text = text
+        if self.on_progress:
+            self.on_progress(job)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job. Returns False if there is no such unfinished job."""
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job.token.cancel()
+        print(f"Cancelling job {job}")
+        if job.state == "queued":
+            self._changed(job)
+        return True
+
+    def cancel_all(self):
+        for job in self.jobs:
+            self.cancel(job.id)
+
+    def clear_finished(self):
+        for job in self.jobs:
+            if job.done:
+                del self._jobs[job.id]
+        self._changed(None)
+
+    async def wait(self, job):
+        """Wait for a job to finish and return it."""
+        return await job.task
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.done]
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.id]
+
+    def _changed(self, job):
+        if self.on_change:
+            self.on_change(job)
@@ -0,0 +1,215 @@
+import json
+import os
+
+try:
+    import tomllib as _toml_reader
+except ImportError:  # Python < 3.11, Kit ships the "toml" package instead
+    try:
+        import toml as _toml_reader
+    except ImportError:
+        _toml_reader = None
+
+# Same fields and defaults as ShaderAnimationUI.get_inputs().
+DEFAULT_INPUTS = {
+    "resolution_width": 3840,
+    "resolution_height": 2160,
+    # "final", "draft" (draft_scale of the resolution with draft_settings, into draft_output_dir or
+    # output_dir/draft) or "promote" (full resolution, only approved_frames or the draft's approvals file).
+    "render_quality": "final",
+    "draft_scale": 0.5,
+    "draft_settings": None,
+    "draft_output_dir": None,
+    "approved_frames": None,
+    # Check texture headers, disk space and ffmpeg before rendering, and refuse to start runs that would fail.
+    "preflight": True,
+    "shader_path": "",
+    "animation_folder": "",
+    "start_time_code": 0,
+    "frame_duration": 6,
+    "wait_time": 0.0,
+    # Wait for progressive renders to converge after each texture change: "off", "delta" or "samples".
+    "convergence_mode": "off",
+    "convergence_threshold": 0.002,
+    "convergence_max_time": 10.0,
+    "convergence_min_frames": 2,
+    "max_in_flight": 2,
+    "viewport_window": None,
+    "output_dir": "/path/to/output",
+    "output_prefix": "frame",
+    "texture_type": "opacity_texture",
+    "hold_mode": False,
+    "link_mode": "auto",
+    "write_duration_manifest": False,
+    "resume": True,
+    "hash_sources": False,
+    "output_mode": "png",
+    "framerate": 24,
+    "image_format": "png",
+    # Compression and quality apply to off-thread writes only; FileCapture writes with Kit's own settings.
+    "png_compression": 6,
+    "image_quality": 90,
+    "threaded_writes": False,
+    "writer_threads": None,
+    "stream_output": None,
+    "ffmpeg_path": "ffmpeg",
+    "animation_sublayer": None,
+    # Additional {"shader_path", "texture_type", "animation_folder"} tables animated in lockstep.
+    "bindings": [],
+    # Pack each sequence into atlas sheets and animate the UV translation instead of swapping textures.
+    "atlas_mode": False,
+    "atlas_max_size": 8192,
+    "atlas_cache_dir": None,
+    # Render from resized, mipmapped copies of the textures kept in a content-addressed cache.
+    "preprocess_textures": False,
+    "preprocess_max_size": None,
+    "preprocess_format": "dds",
+    "texture_cache_dir": None,
+    "texture_cache_max_gb": 20,
+    # Interactive preview: textures of the upcoming steps read ahead of the timeline.
+    "preview_prefetch": 16,
+    # Sharded renders: only textures [texture_start, texture_end) are rendered, frame indices stay global.
+    "texture_start": 0,
+    "texture_end": None,
+    "completion_manifest": None,
+    # Phase timing events; defaults to {output_prefix}_metrics.jsonl in the output directory.
+    "metrics_file": None,
+}
+
+REQUIRED_FIELDS = ("shader_path", "animation_folder")
+BINDING_FIELDS = ("shader_path", "texture_type", "animation_folder")
+
+# Batch-level keys, everything else at the top level of a job file is rejected.
+BATCH_FIELDS = ("stage", "quit_on_finish", "warmup_frames", "defaults", "jobs")
+
+
+class JobSpecError(ValueError):
+    pass
+
+
+def _read_spec(path):
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if path.lower().endswith(".toml"):
+        if _toml_reader is None:
+            raise JobSpecError("Reading TOML job files requires the 'tomllib' or 'toml' module.")
+        text = data.decode("utf-8")
+        return _toml_reader.loads(text)
+
+    return json.loads(data.decode("utf-8"))
+
+
+def _resolve_path(base_dir, path):
+    if "://" in path:
+        return path
+    return os.path.join(base_dir, os.path.expanduser(path))
+
+
+def make_job_inputs(job, defaults=None):
+    """
+    Build a run_animation() inputs dict from a job entry.
+
+    Args:
+        job (dict): Fields of a single job; any field of ShaderAnimationUI.get_inputs() plus an optional "name".
+        defaults (dict): Batch-level defaults applied before the job's own fields.
+
+    Returns:
+        dict: The complete inputs, including "name".
+    """
+    inputs = dict(DEFAULT_INPUTS)
+    inputs["name"] = None
+
+    for source in (defaults or {}, job):
+        for key, value in source.items():
+            if key not in inputs:
+                raise JobSpecError(f"Unknown job field '{key}'")
+            inputs[key] = value
+
+    inputs["bindings"] = [dict(binding) for binding in inputs["bindings"] or []]
+    for binding in inputs["bindings"]:
+        missing = [key for key in BINDING_FIELDS if not binding.get(key)]
+        if missing or len(binding) != len(BINDING_FIELDS):
+            raise JobSpecError(
+                f"Job '{inputs['name'] or '?'}' has a binding without exactly {', '.join(BINDING_FIELDS)}"
+            )
+
+    # A job may animate only its "bindings" and leave the main shader fields empty
+    if not inputs["bindings"] or inputs["shader_path"] or inputs["animation_folder"]:
+        for key in REQUIRED_FIELDS:
+            if not inputs[key]:
+                raise JobSpecError(f"Job '{inputs['name'] or '?'}' is missing '{key}'")
+
+    if not inputs["name"]:
+        first = inputs if inputs["animation_folder"] else inputs["bindings"][0]
+        inputs["name"] = f"{os.path.basename(os.path.normpath(first['animation_folder']))}:{first['texture_type']}"
+
+    return inputs
+
+
+def load_job_file(path):
+    """
+    Load a batch of render jobs from a JSON or TOML file.
+
+    The file has optional batch settings ("stage", "quit_on_finish", "warmup_frames"), an optional
+    "defaults" table and a "jobs" list. Relative folders are resolved against the job file's directory.
+
+    Returns:
+        tuple: (batch settings dict, list of inputs dicts)
+    """
+    spec = _read_spec(path)
+    unknown = [key for key in spec if key not in BATCH_FIELDS]
+    if unknown:
+        raise JobSpecError(f"Unknown batch field(s): {', '.join(unknown)}")
+
+    jobs = spec.get("jobs") or []
+    if not jobs:
+        raise JobSpecError(f"No jobs found in '{path}'")
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    defaults = spec.get("defaults") or {}
+    job_inputs = []
+    for job in jobs:
+        inputs = make_job_inputs(job, defaults)
+        for key in ("animation_folder", "output_dir", "completion_manifest", "stream_output",
+                    "animation_sublayer", "metrics_file", "atlas_cache_dir",
+                    "texture_cache_dir", "draft_output_dir"):
+            if inputs[key]:
+                inputs[key] = _resolve_path(base_dir, inputs[key])
+        for binding in inputs["bindings"]:
+            binding["animation_folder"] = _resolve_path(base_dir, binding["animation_folder"])
+        job_inputs.append(inputs)
+
+    settings = {
+        "stage": _resolve_path(base_dir, spec["stage"]) if spec.get("stage") else None,
+        "quit_on_finish": bool(spec.get("quit_on_finish", False)),
+        "warmup_frames": int(spec.get("warmup_frames", 0)),
+    }
+    return settings, job_inputs
+
+
+def write_completion_manifest(path, inputs, texture_count, completed_frames, terminated=False):
+    """
+    Record which output frames a (possibly sharded) run produced, for the render farm coordinator.
+
+    Args:
+        path (str): Destination of the JSON manifest.
+        inputs (dict): The run's inputs.
+        texture_count (int): Number of textures in the whole sequence.
+        completed_frames (iterable): Frame indices that were written successfully.
+        terminated (bool): Whether the run was stopped before the end of its range.
+    """
+    texture_end = inputs.get("texture_end")
+    manifest = {
+        "name": inputs.get("name"),
+        "texture_start": inputs.get("texture_start", 0),
+        "texture_end": texture_count if texture_end is None else min(texture_end, texture_count),
+        "texture_count": texture_count,
+        "frame_duration": inputs["frame_duration"],
+        "completed_frames": sorted(set(completed_frames)),
+        "terminated": terminated,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,166 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+def metrics_path(output_dir, output_prefix):
+    return os.path.join(output_dir, f"{output_prefix}_metrics.jsonl")
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers, or None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(fraction * len(ordered))))
+    return ordered[rank - 1]
+
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class RunMetrics:
+    """
+    Times the phases of a render run and writes every measurement as a JSON lines event.
+
+    Phases are timed per texture (e.g. "wait_settings", "wait_frame") or per frame (e.g. "capture"). Events
+    can be recorded from executor threads, e.g. by capture completion callbacks. The last line of the file
+    is a "summary" event with p50/p95 latency per phase, frames per second and bytes written.
+    """
+
+    def __init__(self, path=None, texture_count=0):
+        self.path = path
+        self.texture_count = texture_count
+        self.textures_done = 0
+        self.textures_skipped = 0
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.phases = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = open(path, "w")
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._start
+
+    def event(self, event, **fields):
+        """Append one event to the metrics file."""
+        line = json.dumps({"event": event, "time": round(self.elapsed, 6), **fields})
+        with self._lock:
+            if self._file:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+    def record(self, phase, seconds, **fields):
+        """Record one measurement of a phase, e.g. record("capture", 0.2, frame=12)."""
+        with self._lock:
+            self.phases.setdefault(phase, []).append(seconds)
+        self.event("phase", phase=phase, seconds=round(seconds, 6), **fields)
+
+    @contextmanager
+    def phase(self, phase, **fields):
+        """Time the body of a with-block, awaits included."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start, **fields)
+
+    def add_frames(self, frame_count, byte_count=0):
+        with self._lock:
+            self.frames_written += frame_count
+            self.bytes_written += byte_count
+
+    def add_bytes(self, byte_count):
+        with self._lock:
+            self.bytes_written += byte_count
+
+    def texture_finished(self, skipped=False):
+        with self._lock:
+            self.textures_done += 1
+            if skipped:
+                self.textures_skipped += 1
+
+    def progress(self):
+        """
+        Report how far the run is.
+
+        Returns:
+            tuple: (fraction done, estimated seconds remaining or None). Skipped textures do not count
+            towards the rendering rate, so a resumed run does not promise an ETA it cannot keep.
+        """
+        if not self.texture_count:
+            return 0.0, None
+        fraction = self.textures_done / self.texture_count
+        rendered = self.textures_done - self.textures_skipped
+        if not rendered:
+            return fraction, None
+        remaining = self.texture_count - self.textures_done
+        return fraction, self.elapsed / rendered * remaining
+
+    def progress_text(self):
+        fraction, eta = self.progress()
+        text = f"{self.textures_done}/{self.texture_count} textures ({fraction:.0%})"
+        if eta is not None:
+            text += f", ETA {format_duration(eta)}"
+        return text
+
+    def summary(self):
+        elapsed = self.elapsed
+        with self._lock:
+            phases = {
+                phase: {
+                    "count": len(values),
+                    "total": round(sum(values), 6),
+                    "p50": round(percentile(values, 0.5), 6),
+                    "p95": round(percentile(values, 0.95), 6),
+                }
+                for phase, values in self.phases.items()
+            }
+            return {
+                "elapsed": round(elapsed, 6),
+                "textures": self.textures_done,
+                "textures_skipped": self.textures_skipped,
+                "frames_written": self.frames_written,
+                "frames_per_second": round(self.frames_written / elapsed, 3) if elapsed > 0 else None,
+                "bytes_written": self.bytes_written,
+                "phases": phases,
+            }
+
+    def format_summary(self, summary=None):
+        summary = summary or self.summary()
+        megabytes = summary["bytes_written"] / (1 << 20)
+        lines = [
+            f"Rendered {summary['frames_written']} frames from {summary['textures']} textures "
+            f"({summary['textures_skipped']} skipped) in {format_duration(summary['elapsed'])}: "
+            f"{summary['frames_per_second'] or 0:.2f} frames/s, {megabytes:.1f} MiB written",
+            f"{'phase':<16}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'total s':>10}",
+        ]
+        for phase, stats in summary["phases"].items():
+            lines.append(
+                f"{phase:<16}{stats['count']:>8}{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}"
+                f"{stats['total']:>10.2f}"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        """Write the summary event and close the metrics file. Returns the summary."""
+        summary = self.summary()
+        self.event("summary", **summary)
+        if self._file:
+            with self._lock:
+                self._file.close()
+                self._file = None
+        return summary
+
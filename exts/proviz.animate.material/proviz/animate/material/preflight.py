@@ -0,0 +1,404 @@
+import json
+import os
+import shutil
+import struct
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import format_duration
+
+# Refuse to start when the estimated output would leave less than this share of it free
+DISK_HEADROOM = 1.1
+
+# Rough output size per pixel of a captured frame when there are no earlier metrics to go by
+BYTES_PER_PIXEL = {"png": 1.5, "exr": 4.0, "jpg": 0.25, "webp": 0.2}
+# H.264 at the stream writer's settings, per pixel per frame
+STREAM_BYTES_PER_PIXEL = 0.02
+
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_TGA_IMAGE_TYPES = {1, 2, 3, 9, 10, 11}
+_EXR_MAGIC = b"\x76\x2f\x31\x01"
+# EXR headers are small; a dataWindow beyond this many bytes means a corrupt header
+_EXR_HEADER_LIMIT = 1 << 16
+EXR_PIXEL_TYPES = {0: "uint", 1: "half", 2: "float"}
+
+
+def _png_size(f):
+    header = f.read(24)
+    if len(header) < 24 or header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        raise ValueError("not a PNG file")
+    return struct.unpack(">II", header[16:24])
+
+
+def _jpeg_size(f):
+    if f.read(2) != b"\xff\xd8":
+        raise ValueError("not a JPEG file")
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise ValueError("no frame header before the end of the file")
+        if byte != b"\xff":
+            continue
+        marker = f.read(1)
+        while marker == b"\xff":
+            marker = f.read(1)
+        if not marker:
+            raise ValueError("no frame header before the end of the file")
+        marker = marker[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            raise ValueError("truncated segment")
+        length = struct.unpack(">H", length_bytes)[0]
+        if marker in _JPEG_SOF_MARKERS:
+            segment = f.read(5)
+            if len(segment) < 5:
+                raise ValueError("truncated frame header")
+            height, width = struct.unpack(">HH", segment[1:5])
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _tga_size(f):
+    header = f.read(18)
+    if len(header) < 18 or header[2] not in _TGA_IMAGE_TYPES:
+        raise ValueError("not a TGA file")
+    return struct.unpack("<HH", header[12:16])
+
+
+def _dds_size(f):
+    header = f.read(20)
+    if len(header) < 20 or header[:4] != b"DDS ":
+        raise ValueError("not a DDS file")
+    height, width = struct.unpack("<II", header[12:20])
+    return width, height
+
+
+def _webp_size(f):
+    header = f.read(30)
+    if len(header) < 30 or header[:4] != b"RIFF" or header[8:12] != b"WEBP":
+        raise ValueError("not a WebP file")
+    chunk = header[12:16]
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(header[24:27], "little") + 1, int.from_bytes(header[27:30], "little") + 1
+    raise ValueError("unknown WebP chunk")
+
+
+def _exr_attributes(header):
+    """Yield the (name, value) of each attribute of an OpenEXR header."""
+    if header[:4] != _EXR_MAGIC:
+        raise ValueError("not an OpenEXR file")
+    # Attributes follow the version: name\0 type\0 int32 size, value; an empty name ends the header
+    offset = 8
+    while offset < len(header):
+        name_end = header.index(b"\0", offset)
+        name = header[offset:name_end]
+        if not name:
+            return
+        type_end = header.index(b"\0", name_end + 1)
+        size = struct.unpack("<i", header[type_end + 1:type_end + 5])[0]
+        value_start = type_end + 5
+        yield name, header[value_start:value_start + size]
+        offset = value_start + size
+
+
+def _exr_size(f):
+    for name, value in _exr_attributes(f.read(_EXR_HEADER_LIMIT)):
+        if name == b"dataWindow":
+            x_min, y_min, x_max, y_max = struct.unpack("<iiii", value[:16])
+            return x_max - x_min + 1, y_max - y_min + 1
+    raise ValueError("no dataWindow in the header")
+
+
+_HEADER_READERS = {
+    ".png": _png_size,
+    ".jpg": _jpeg_size,
+    ".jpeg": _jpeg_size,
+    ".tga": _tga_size,
+    ".dds": _dds_size,
+    ".webp": _webp_size,
+    ".exr": _exr_size,
+}
+
+
+def read_image_size(path):
+    """
+    Read an image's (width, height) from its header alone, without decoding any pixels.
+
+    Raises:
+        ValueError: If the header is missing, truncated or not the format the extension says.
+        OSError: If the file cannot be read.
+    """
+    reader = _HEADER_READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ValueError("unsupported format")
+    with open(path, "rb") as f:
+        try:
+            width, height = reader(f)
+        except (struct.error, IndexError):
+            raise ValueError("truncated header")
+    if width <= 0 or height <= 0:
+        raise ValueError(f"invalid size {width}x{height}")
+    return width, height
+
+
+def read_exr_pixel_types(path):
+    """
+    Read the pixel type of each channel of an OpenEXR file from its header.
+
+    Returns:
+        dict: {channel name: "half", "float" or "uint"}.
+
+    Raises:
+        ValueError: If the header is missing, truncated or has no channel list.
+        OSError: If the file cannot be read.
+    """
+    with open(path, "rb") as f:
+        header = f.read(_EXR_HEADER_LIMIT)
+    try:
+        for name, value in _exr_attributes(header):
+            if name != b"channels":
+                continue
+            # Each channel: name\0, int32 pixel type, uint8 pLinear, 3 reserved bytes, int32 x and y sampling
+            channels = {}
+            offset = 0
+            while value[offset:offset + 1] not in (b"", b"\0"):
+                name_end = value.index(b"\0", offset)
+                pixel_type = struct.unpack("<i", value[name_end + 1:name_end + 5])[0]
+                channels[value[offset:name_end].decode("utf-8")] = EXR_PIXEL_TYPES.get(pixel_type, str(pixel_type))
+                offset = name_end + 17
+            return channels
+    except (struct.error, IndexError):
+        raise ValueError("truncated header")
+    raise ValueError("no channel list in the header")
+
+
+def _checked_size(path):
+    try:
+        return read_image_size(path), None
+    except (OSError, ValueError) as e:
+        return None, f"'{path}': {e}"
+
+
+def scan_headers(paths, workers=None):
+    """
+    Read the sizes of many images on a thread pool; the work is mostly waiting on the file system.
+
+    Returns:
+        tuple: ({path: (width, height)} for readable images, list of error messages).
+    """
+    sizes, errors = {}, []
+    with ThreadPoolExecutor(max_workers=workers or min(16, (os.cpu_count() or 1) * 2)) as executor:
+        for path, (size, error) in zip(paths, executor.map(_checked_size, paths, chunksize=64)):
+            if error:
+                errors.append(error)
+            else:
+                sizes[path] = size
+    return sizes, errors
+
+
+def previous_run_rates(metrics_file, resolution, output_mode, hold_mode):
+    """
+    Seconds per rendered texture and bytes per written frame of the previous run, from its metrics file.
+
+    Only a run with the same resolution, output mode and hold mode is comparable.
+
+    Returns:
+        tuple: (seconds per texture, bytes per frame), or (None, None).
+    """
+    start = summary = None
+    try:
+        with open(metrics_file) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("event") == "start":
+                    start = entry
+                elif entry.get("event") == "summary":
+                    summary = entry
+    except OSError:
+        return None, None
+    if not start or not summary:
+        return None, None
+    if (list(start.get("resolution") or []) != list(resolution) or start.get("output_mode") != output_mode
+            or start.get("hold_mode") != hold_mode):
+        return None, None
+
+    rendered = summary["textures"] - summary["textures_skipped"]
+    seconds_per_texture = summary["elapsed"] / rendered if rendered > 0 else None
+    frames = summary["frames_written"]
+    bytes_per_frame = summary["bytes_written"] / frames if frames > 0 else None
+    return seconds_per_texture, bytes_per_frame
+
+
+def free_space(path):
+    """Free bytes on the file system a path is (or would be created) on, and the existing directory checked."""
+    directory = os.path.abspath(path)
+    while not os.path.isdir(directory):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    return shutil.disk_usage(directory).free, directory
+
+
+class PreflightReport:
+    """What a run is about to do and whether it can succeed."""
+
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+        self.texture_count = 0
+        self.file_count = 0
+        self.frame_count = 0
+        self.capture_count = 0
+        self.current_count = 0
+        self.estimated_bytes = 0
+        self.free_bytes = None
+        self.estimated_seconds = None
+        self.seconds = 0.0
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def format(self):
+        runtime = "unknown, no comparable earlier run" if self.estimated_seconds is None else \
+            format_duration(self.estimated_seconds)
+        free = "unknown" if self.free_bytes is None else f"{format_bytes(self.free_bytes)} free"
+        lines = [
+            f"Preflight checked {self.file_count} texture files in {self.seconds:.2f}s: "
+            f"{self.texture_count} textures, {self.frame_count} frames ({self.capture_count} captures)"
+            + (f", {self.current_count} frames up to date" if self.current_count else ""),
+            f"Estimated output {format_bytes(self.estimated_bytes)} ({free}), runtime {runtime}",
+        ]
+        lines += [f"Warning: {warning}" for warning in self.warnings]
+        lines += [f"Error: {error}" for error in self.errors]
+        return "\n".join(lines)
+
+
+def format_bytes(byte_count):
+    if byte_count >= 1 << 30:
+        return f"{byte_count / (1 << 30):.2f} GiB"
+    return f"{byte_count / (1 << 20):.1f} MiB"
+
+
+def _summarize(problems, limit=5):
+    shown = "; ".join(problems[:limit])
+    more = f" and {len(problems) - limit} more" if len(problems) > limit else ""
+    return f"{shown}{more}"
+
+
+def run_preflight(inputs, bindings, texture_indices, approved_frames=None, stale_frames=None):
+    """
+    Check a run before it starts and estimate its cost.
+
+    Every texture's header is read to catch unreadable files and, per binding, sizes that differ from the
+    rest of the sequence. The number of frames and captures, the output size (from the previous run's
+    metrics, or a per-format estimate) and the runtime (from the previous run's metrics only) are estimated,
+    and the output size is compared with the free space in the output directory. Frames a resumed run skips
+    are left out of the estimates.
+
+    Args:
+        inputs (dict): run_animation() inputs, already resolved for the render quality.
+        bindings (list): Prepared TextureBinding objects.
+        texture_indices (list): Steps of the sequence the run renders.
+        approved_frames (set): Frames a promote pass renders, or None for all of them.
+        stale_frames (set): Frames the render manifest does not mark as up to date, or None for all of them.
+
+    Returns:
+        PreflightReport: Unreadable textures, a missing ffmpeg, an unwritable output directory or too
+            little free space are errors; mismatched sizes are warnings.
+    """
+    start = time.perf_counter()
+    report = PreflightReport()
+    frame_duration = inputs["frame_duration"]
+    resolution = (inputs["resolution_width"], inputs["resolution_height"])
+    output_mode = inputs.get("output_mode", "png")
+    hold_mode = inputs.get("hold_mode", False)
+    image_format = inputs.get("image_format", "png")
+
+    # Textures: every file of every binding that the rendered steps use
+    paths = sorted({binding.texture_at(index) for binding in bindings for index in texture_indices})
+    report.texture_count = len(texture_indices)
+    report.file_count = len(paths)
+    sizes, errors = scan_headers(paths)
+    if errors:
+        report.errors.append(f"{len(errors)} textures cannot be read: {_summarize(errors)}")
+    for binding in bindings:
+        binding_sizes = {path: sizes[path] for path in set(binding.files) & set(sizes)}
+        if not binding_sizes:
+            continue
+        (width, height), _ = Counter(binding_sizes.values()).most_common(1)[0]
+        mismatched = sorted(
+            f"'{path}' is {size[0]}x{size[1]}" for path, size in binding_sizes.items() if size != (width, height)
+        )
+        if mismatched:
+            report.warnings.append(
+                f"{len(mismatched)} textures of {binding} differ from its {width}x{height}: {_summarize(mismatched)}"
+            )
+
+    # Frames: a held texture is captured once and its other frames are linked, so it is rendered whole if any
+    # of its frames is stale
+    rendered_textures = 0
+    for texture_index in texture_indices:
+        frames = range(texture_index * frame_duration, (texture_index + 1) * frame_duration)
+        if approved_frames is not None and not hold_mode:
+            frames = [frame for frame in frames if frame in approved_frames]
+        if stale_frames is not None:
+            current = [frame for frame in frames if frame not in stale_frames]
+            if not hold_mode or len(current) == len(frames):
+                report.current_count += len(current)
+                frames = [frame for frame in frames if frame in stale_frames]
+        if not frames:
+            continue
+        rendered_textures += 1
+        report.frame_count += len(frames)
+        report.capture_count += 1 if hold_mode else len(frames)
+
+    # Output size and runtime
+    output_dir = inputs["output_dir"]
+    seconds_per_texture, bytes_per_frame = previous_run_rates(
+        inputs.get("metrics_file") or os.path.join(output_dir, f"{inputs['output_prefix']}_metrics.jsonl"),
+        resolution, output_mode, hold_mode,
+    )
+    if bytes_per_frame is not None:
+        report.estimated_bytes = int(bytes_per_frame * report.frame_count)
+    else:
+        pixels = resolution[0] * resolution[1]
+        if output_mode in ("png", "png+stream"):
+            # Linked hold frames take no space; copied ones do
+            written = report.frame_count if inputs.get("link_mode") == "copy" else report.capture_count
+            report.estimated_bytes += int(BYTES_PER_PIXEL.get(image_format, 4.0) * pixels * written)
+        if output_mode in ("stream", "png+stream"):
+            report.estimated_bytes += int(STREAM_BYTES_PER_PIXEL * pixels * report.frame_count)
+    if seconds_per_texture is not None:
+        report.estimated_seconds = seconds_per_texture * rendered_textures
+
+    # Output directory
+    report.free_bytes, existing_dir = free_space(output_dir)
+    if not os.access(existing_dir, os.W_OK):
+        report.errors.append(f"Output directory '{output_dir}' is not writable")
+    elif report.estimated_bytes * DISK_HEADROOM > report.free_bytes:
+        report.errors.append(
+            f"Not enough free space in '{existing_dir}': the run needs about {format_bytes(report.estimated_bytes)}, "
+            f"{format_bytes(report.free_bytes)} are free"
+        )
+
+    if output_mode in ("stream", "png+stream"):
+        ffmpeg_path = inputs.get("ffmpeg_path", "ffmpeg")
+        if shutil.which(ffmpeg_path) is None:
+            report.errors.append(f"ffmpeg not found at '{ffmpeg_path}', needed by the {output_mode} output mode")
+
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,162 @@
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import omni.timeline
+
+from .bindings import apply_textures, sequence_length
+
+READ_CHUNK = 1 << 20
+
+
+def texture_index_at(time_code, start_time_code, frame_duration, texture_count):
+    """Step of the sequence on screen at a time code, clamped to the first and last texture."""
+    texture_index = int((time_code - start_time_code) // frame_duration)
+    return min(max(texture_index, 0), texture_count - 1)
+
+
+def read_file(path):
+    """Read a file once so the renderer's load is served from the OS file cache. Returns the bytes read."""
+    size = 0
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                return size
+            size += len(chunk)
+
+
+class TexturePrefetcher:
+    """
+    Reads the textures of a sliding window of upcoming steps on a thread pool.
+
+    The window wraps around the end of the sequence, since the preview loops.
+    """
+
+    def __init__(self, bindings, window=16, workers=None):
+        self.bindings = bindings
+        self.window = max(0, window)
+        self.texture_count = sequence_length(bindings)
+        self._futures = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or min(4, os.cpu_count() or 1), thread_name_prefix="proviz_preview"
+        )
+
+    def _read_step(self, texture_index):
+        files = {binding.texture_at(texture_index) for binding in self.bindings}
+        return sum(read_file(path) for path in files)
+
+    def advance(self, texture_index):
+        """Move the window to start at texture_index, dropping reads of steps that fell out of it."""
+        wanted = {(texture_index + offset) % self.texture_count for offset in range(self.window)}
+        for index in list(self._futures):
+            if index not in wanted:
+                self._futures.pop(index).cancel()
+        for offset in range(self.window):
+            index = (texture_index + offset) % self.texture_count
+            if index not in self._futures:
+                self._futures[index] = self._executor.submit(self._read_step, index)
+
+    def is_ready(self, texture_index):
+        future = self._futures.get(texture_index)
+        return future is not None and future.done() and not future.cancelled() and future.exception() is None
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._futures.clear()
+
+
+class TexturePreview:
+    """
+    Plays a texture sequence along with the timeline, without capturing anything.
+
+    Every timeline tick maps the current time code to a step of the sequence; when the step changes, the
+    textures of all bindings are assigned in one batched stage edit, like a render run does. Playback never
+    waits for a texture: the timeline keeps its frame rate and the preview counts what it could not keep up
+    with instead.
+
+    Attributes:
+        shown (int): Steps assigned.
+        dropped_frames (int): Timeline frames passed over between two ticks during playback.
+        skipped_textures (int): Steps never shown because playback jumped past them.
+        late_textures (int): Steps shown before their files had been read ahead.
+    """
+
+    def __init__(self, layer, bindings, start_time_code, frame_duration, prefetch=16, on_update=None):
+        self.layer = layer
+        self.bindings = bindings
+        self.start_time_code = start_time_code
+        self.frame_duration = max(1, frame_duration)
+        self.texture_count = sequence_length(bindings)
+        self.on_update = on_update
+        self.prefetcher = TexturePrefetcher(bindings, prefetch)
+        self.texture_index = None
+        self.shown = 0
+        self.dropped_frames = 0
+        self.skipped_textures = 0
+        self.late_textures = 0
+        self._frame = None
+        self._timeline = None
+        self._subscription = None
+
+    @property
+    def end_time_code(self):
+        return self.start_time_code + self.texture_count * self.frame_duration
+
+    def status_text(self):
+        current = "-" if self.texture_index is None else self.texture_index + 1
+        return (f"Texture {current}/{self.texture_count}, {self.dropped_frames} dropped frames, "
+                f"{self.skipped_textures} skipped and {self.late_textures} late textures")
+
+    def start(self, timeline):
+        """Show the texture at the current time and follow the timeline's time changes."""
+        self._timeline = timeline
+        self._subscription = timeline.get_timeline_event_stream().create_subscription_to_pop(
+            self._on_timeline_event, name="proviz.animate.material preview"
+        )
+        self.update(self._current_time_code(), playing=False)
+
+    def stop(self):
+        self._subscription = None
+        self._timeline = None
+        self.prefetcher.close()
+
+    def _current_time_code(self):
+        return self._timeline.get_current_time() * self._timeline.get_time_codes_per_seconds()
+
+    def _on_timeline_event(self, event):
+        if event.type in (
+            int(omni.timeline.TimelineEventType.CURRENT_TIME_TICKED),
+            int(omni.timeline.TimelineEventType.CURRENT_TIME_CHANGED),
+        ):
+            self.update(self._current_time_code(), self._timeline.is_playing())
+
+    def update(self, time_code, playing=True):
+        """
+        Show the step for a time code.
+
+        Args:
+            time_code (float): Current timeline time code.
+            playing (bool): True for playback ticks, which count dropped, skipped and late textures. Scrubbing
+                and looping back to the start are not counted.
+        """
+        frame = math.floor(time_code + 1e-6)
+        if playing and self._frame is not None and frame > self._frame + 1:
+            self.dropped_frames += frame - self._frame - 1
+        self._frame = frame
+
+        texture_index = texture_index_at(time_code, self.start_time_code, self.frame_duration, self.texture_count)
+        if texture_index == self.texture_index:
+            return
+        if playing and self.texture_index is not None:
+            if texture_index > self.texture_index + 1:
+                self.skipped_textures += texture_index - self.texture_index - 1
+            if self.prefetcher.window and not self.prefetcher.is_ready(texture_index):
+                self.late_textures += 1
+
+        apply_textures(self.layer, self.bindings, texture_index)
+        self.texture_index = texture_index
+        self.shown += 1
+        self.prefetcher.advance((texture_index + 1) % self.texture_count)
+        if self.on_update:
+            self.on_update(self)
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import threading
+
+# Inputs that change what a rendered frame looks like. A frame rendered with different values is stale.
+# Waiting and convergence decide how many samples a frame accumulates, draft settings how it is sampled.
+RENDER_SETTING_KEYS = (
+    "resolution_width", "resolution_height", "shader_path", "texture_type", "bindings", "image_format", "image_quality",
+    "atlas_mode", "wait_time", "convergence_mode", "convergence_threshold", "convergence_max_time",
+    "convergence_min_frames", "draft_settings",
+)
+
+
+def manifest_path(output_dir, output_prefix):
+    return os.path.join(output_dir, f"{output_prefix}_render_manifest.jsonl")
+
+
+def settings_key(inputs, extra=None):
+    """
+    Hash the render settings that affect output pixels.
+
+    Args:
+        inputs (dict): run_animation() inputs.
+        extra (dict): Additional values to include, e.g. the stage identifier.
+    """
+    settings = {key: inputs.get(key) for key in RENDER_SETTING_KEYS}
+    settings.update(extra or {})
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def texture_signature(texture_path, hash_contents=False):
+    """
+    Identify the current version of a source texture.
+
+    Args:
+        texture_path (str): Source texture.
+        hash_contents (bool): Hash the file contents instead of trusting size and mtime.
+    """
+    stat = os.stat(texture_path)
+    if not hash_contents:
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    digest = hashlib.sha1()
+    with open(texture_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return f"{stat.st_size}:sha1:{digest.hexdigest()}"
+
+
+class RenderManifest:
+    """
+    Records, per output frame, which texture version and render settings produced it.
+
+    Completed frames are appended to a JSON lines file as they are written, so a crashed or terminated run
+    keeps everything it finished. Later lines override earlier ones for the same frame.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.frames = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load(path):
+        manifest = RenderManifest(path)
+        if not os.path.isfile(path):
+            return manifest
+
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    manifest.frames[int(entry["frame"])] = entry
+                except (ValueError, KeyError, TypeError):
+                    # A crash can leave a truncated last line behind
+                    continue
+        return manifest
+
+    def is_current(self, frame_index, texture_path, signature, settings, output_path):
+        """Check whether a frame exists on disk and was rendered from this texture version and settings."""
+        entry = self.frames.get(frame_index)
+        return (
+            entry is not None
+            and entry["source"] == texture_path
+            and entry["signature"] == signature
+            and entry["settings"] == settings
+            and os.path.isfile(output_path)
+        )
+
+    def record(self, frame_indices, texture_path, signature, settings):
+        """Append completed frames; safe to call from capture completion threads."""
+        entries = [
+            {"frame": frame_index, "source": texture_path, "signature": signature, "settings": settings}
+            for frame_index in frame_indices
+        ]
+        lines = "".join(json.dumps(entry) + "\n" for entry in entries)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(lines)
+            for entry in entries:
+                self.frames[entry["frame"]] = entry
+
+    def compact(self):
+        """Rewrite the manifest with one line per frame."""
+        with self._lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                for frame_index in sorted(self.frames):
+                    f.write(json.dumps(self.frames[frame_index]) + "\n")
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,129 @@
+# Kept free of Kit imports: render_farm.py and the stub render worker load this module outside Kit.
+import os
+
+# "final": every frame at full resolution into output_dir.
+# "draft": a fraction of the resolution with lower sample settings, into a separate output tree for review.
+# "promote": full resolution into output_dir, only the frames approved after reviewing the draft.
+RENDER_QUALITIES = ("final", "draft", "promote")
+
+DRAFT_DIR = "draft"
+
+# Renderer settings applied while rendering a draft and restored afterwards (see render_settings.py)
+DEFAULT_DRAFT_SETTINGS = {
+    "/rtx/pathtracing/spp": 1,
+    "/rtx/pathtracing/totalSpp": 16,
+}
+
+
+def draft_output_dir(inputs):
+    return inputs.get("draft_output_dir") or os.path.join(inputs["output_dir"], DRAFT_DIR)
+
+
+def approvals_path(draft_dir, output_prefix):
+    """File listing the approved frames of a draft, one range per line or comma separated."""
+    return os.path.join(draft_dir, f"{output_prefix}_approved.txt")
+
+
+def parse_frame_ranges(spec):
+    """
+    Parse a frame selection such as "0-47, 96, 120-143" (ranges are inclusive).
+
+    Args:
+        spec: A string, or a list of frame numbers, "first-last" strings and [first, last] pairs.
+
+    Returns:
+        list: Sorted, unique frame indices.
+
+    Raises:
+        ValueError: If an entry is not a frame number or range.
+    """
+    items = spec.replace("\n", ",").split(",") if isinstance(spec, str) else list(spec)
+    frames = set()
+    for item in items:
+        if isinstance(item, str):
+            item = item.strip()
+            if not item or item.startswith("#"):
+                continue
+            first, _, last = item.partition("-")
+            bounds = (first, last or first)
+        elif isinstance(item, (list, tuple)) and len(item) == 2:
+            bounds = item
+        else:
+            bounds = (item, item)
+        try:
+            first, last = (int(bound) for bound in bounds)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid frame range '{item}'")
+        if first < 0 or last < first:
+            raise ValueError(f"Invalid frame range '{item}'")
+        frames.update(range(first, last + 1))
+    return sorted(frames)
+
+
+def format_frame_ranges(frames):
+    """Format frame indices as compact inclusive ranges, e.g. "0-47,96"."""
+    ranges = []
+    for frame in sorted(set(frames)):
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1][1] = frame
+        else:
+            ranges.append([frame, frame])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def load_approved_frames(path):
+    """Read an approvals file; lines starting with # are comments."""
+    with open(path) as f:
+        lines = [line.split("#", 1)[0] for line in f]
+    return parse_frame_ranges(",".join(lines))
+
+
+def draft_resolution(width, height, scale):
+    """Scale a resolution for a draft, rounded to even sizes so the frames can be encoded to H.264."""
+    return max(2, round(width * scale / 2) * 2), max(2, round(height * scale / 2) * 2)
+
+
+def quality_inputs(inputs):
+    """
+    Resolve a run's render quality into the inputs it renders with.
+
+    A draft renders the same job at inputs["draft_scale"] of the resolution into the draft output tree, so it
+    never overwrites final frames. A promote pass renders the job unchanged but only the approved frames:
+    inputs["approved_frames"], or else the draft's approvals file.
+
+    Returns:
+        tuple: (inputs dict, approved frame list or None when every frame is rendered).
+
+    Raises:
+        ValueError: If the quality is unknown, or a promote pass has no approved frames.
+        OSError: If the approvals file cannot be read.
+    """
+    quality = inputs.get("render_quality", "final")
+    if quality not in RENDER_QUALITIES:
+        raise ValueError(f"Unknown render quality '{quality}', expected one of {', '.join(RENDER_QUALITIES)}")
+
+    approved = inputs.get("approved_frames")
+    approved_frames = parse_frame_ranges(approved) if approved not in (None, "", []) else None
+    draft_dir = draft_output_dir(inputs)
+
+    if quality == "promote" and approved_frames is None:
+        path = approvals_path(draft_dir, inputs["output_prefix"])
+        if not os.path.isfile(path):
+            raise ValueError(f"Promoting needs approved frames: set 'approved_frames' or write them to {path}")
+        approved_frames = load_approved_frames(path)
+    if quality == "promote" and not approved_frames:
+        raise ValueError("Promoting needs at least one approved frame")
+
+    if quality != "draft":
+        return inputs, approved_frames
+
+    inputs = dict(inputs)
+    inputs["resolution_width"], inputs["resolution_height"] = draft_resolution(
+        inputs["resolution_width"], inputs["resolution_height"], inputs.get("draft_scale") or 0.5
+    )
+    inputs["output_dir"] = draft_dir
+    # Explicit output files move into the draft tree as well
+    for key in ("stream_output", "metrics_file"):
+        if inputs.get(key):
+            inputs[key] = os.path.join(draft_dir, os.path.basename(inputs[key]))
+    return inputs, approved_frames
@@ -0,0 +1,25 @@
+import carb.settings
+
+
+def apply_render_settings(overrides):
+    """
+    Set carb settings for the duration of a run.
+
+    Returns:
+        dict: The previous values, for restore_render_settings(). None marks a setting that was not set.
+    """
+    settings = carb.settings.get_settings()
+    previous = {}
+    for path, value in overrides.items():
+        previous[path] = settings.get(path)
+        settings.set(path, value)
+    return previous
+
+
+def restore_render_settings(previous):
+    settings = carb.settings.get_settings()
+    for path, value in previous.items():
+        if value is None:
+            settings.destroy_item(path)
+        else:
+            settings.set(path, value)
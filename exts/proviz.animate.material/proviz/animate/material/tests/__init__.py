@@ -1 +1,19 @@
-from .test_hello_world import *
\ No newline at end of file
+from .test_atlas import *
+from .test_capture_pipeline import *
+from .test_convergence import *
+from .test_ffmpeg_stream import *
+from .test_frame_hold import *
+from .test_hello_world import *
+from .test_image_writer import *
+from .test_images_to_video import *
+from .test_job_manager import *
+from .test_jobs import *
+from .test_metrics import *
+from .test_preflight import *
+from .test_preview import *
+from .test_render_farm import *
+from .test_render_manifest import *
+from .test_render_quality import *
+from .test_texture_cache import *
+from .test_texture_scanner import *
+from .test_time_samples import *
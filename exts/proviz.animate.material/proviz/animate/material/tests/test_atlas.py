@@ -0,0 +1,92 @@
+import os
+import tempfile
+
+import omni.kit.test
+from PIL import Image
+from pxr import Sdf, Usd, UsdShade
+
+from proviz.animate.material.atlas import Atlas, atlas_layout, build_atlas
+from proviz.animate.material.bindings import (
+    TextureBinding, apply_textures, check_atlas_shaders, prepare_atlas_inputs
+)
+
+
+class TestAtlas(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._textures = []
+        for index in range(5):
+            path = os.path.join(self._tmp_dir.name, f"tex_{index}.png")
+            Image.new("RGBA", (32, 16), (index * 50, 0, 0, 255)).save(path)
+            self._textures.append(path)
+        self._cache_dir = os.path.join(self._tmp_dir.name, "cache")
+
+    async def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    async def test_layout(self):
+        self.assertEqual(atlas_layout(4, (64, 64), 1024), (2, 2))
+        self.assertEqual(atlas_layout(1000, (256, 256), 1024), (4, 4))
+        with self.assertRaises(ValueError):
+            atlas_layout(2, (2048, 64), 1024)
+
+    async def test_cells(self):
+        atlas = Atlas(["a.png", "b.png"], 2, 2, 6, (8, 8))
+        self.assertEqual(atlas.cell(0), ("a.png", (0.0, 0.5)))
+        self.assertEqual(atlas.cell(3), ("a.png", (0.5, 0.0)))
+        self.assertEqual(atlas.cell(4), ("b.png", (0.0, 0.5)))
+        self.assertEqual(atlas.cell(9), atlas.cell(5))
+
+    async def test_authored_uv_transform_shows_one_cell(self):
+        stage = Usd.Stage.CreateInMemory()
+        shader = UsdShade.Shader.Define(stage, "/World/Looks/Material/Shader")
+        shader.CreateInput("diffuse_texture", Sdf.ValueTypeNames.Asset)
+        layer = stage.GetRootLayer()
+        binding = TextureBinding("/World/Looks/Material/Shader", "diffuse_texture", self._tmp_dir.name)
+        binding.files = self._textures
+        binding.attr_path = shader.GetInput("diffuse_texture").GetAttr().GetPath()
+        binding.atlas = Atlas(["a.png"], 4, 2, 8, (8, 8))
+        self.assertTrue(prepare_atlas_inputs(stage, layer, [binding]))
+
+        for cell_index, (column, row) in ((0, (0, 0)), (6, (2, 1))):
+            apply_textures(layer, [binding], cell_index)
+            scale = layer.GetAttributeAtPath(binding.scale_path).default
+            translate = layer.GetAttributeAtPath(binding.translate_path).default
+            # OmniPBR samples uv * texture_scale + texture_translate; rows are counted from the top of the sheet
+            corners = [(u * scale[0] + translate[0], v * scale[1] + translate[1]) for u, v in ((0, 0), (1, 1))]
+            expected = [(column / 4, 1 - (row + 1) / 2), ((column + 1) / 4, 1 - row / 2)]
+            for corner, expected_corner in zip(corners, expected):
+                self.assertAlmostEqual(corner[0], expected_corner[0], places=6)
+                self.assertAlmostEqual(corner[1], expected_corner[1], places=6)
+
+    async def test_atlas_shaders_animate_only_their_textures(self):
+        stage = Usd.Stage.CreateInMemory()
+        shader = UsdShade.Shader.Define(stage, "/World/Looks/Material/Shader")
+        for name in ("diffuse_texture", "opacity_texture", "normalmap_texture"):
+            shader.CreateInput(name, Sdf.ValueTypeNames.Asset)
+        diffuse = TextureBinding("/World/Looks/Material/Shader", "diffuse_texture", self._tmp_dir.name)
+        opacity = TextureBinding("/World/Looks/Material/Shader", "opacity_texture", self._tmp_dir.name)
+        diffuse.atlas = Atlas(["a.png"], 2, 2, 4, (8, 8))
+        opacity.atlas = Atlas(["b.png"], 2, 2, 4, (8, 8))
+        self.assertTrue(check_atlas_shaders(stage, [diffuse, opacity]))
+
+        opacity.atlas = Atlas(["b.png"], 3, 2, 6, (8, 8))
+        self.assertFalse(check_atlas_shaders(stage, [diffuse, opacity]))
+
+        # A static texture on the same shader would be scaled down to one cell as well
+        shader.GetInput("normalmap_texture").Set(Sdf.AssetPath("normal.png"))
+        self.assertFalse(check_atlas_shaders(stage, [diffuse]))
+
+    async def test_build_and_reuse(self):
+        atlas = build_atlas(self._textures, self._cache_dir, max_size=64)
+        self.assertEqual((atlas.columns, atlas.rows, len(atlas.sheets)), (2, 3, 1))
+        with Image.open(atlas.sheets[0]) as sheet:
+            self.assertEqual(sheet.size, (64, 48))
+            self.assertEqual(sheet.getpixel((32 + 5, 5))[0], 50)
+
+        self.assertEqual(build_atlas(self._textures, self._cache_dir, max_size=64).sheets, atlas.sheets)
+
+        Image.new("RGBA", (32, 16), (255, 255, 255, 255)).save(self._textures[2])
+        rebuilt = build_atlas(self._textures, self._cache_dir, max_size=64)
+        self.assertNotEqual(rebuilt.sheets, atlas.sheets)
+        self.assertEqual(len(os.listdir(self._cache_dir)), 2)
@@ -0,0 +1,77 @@
+import asyncio
+
+import omni.kit.test
+
+from proviz.animate.material.capture_pipeline import CapturePipeline
+
+
+class _Capture:
+    def __init__(self, result=True, error=None):
+        self.result = result
+        self.error = error
+        self.done = asyncio.Event()
+
+    async def wait_for_result(self):
+        await self.done.wait()
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class TestCapturePipeline(omni.kit.test.AsyncTestCase):
+    async def test_in_flight_is_bounded(self):
+        pipeline = CapturePipeline(max_in_flight=2)
+        captures = [_Capture() for _ in range(3)]
+        await pipeline.submit(captures[0], "frame_0000.png")
+        await pipeline.submit(captures[1], "frame_0001.png")
+        self.assertEqual(pipeline.in_flight, 2)
+
+        third = asyncio.ensure_future(pipeline.submit(captures[2], "frame_0002.png"))
+        await asyncio.sleep(0.01)
+        self.assertFalse(third.done())
+
+        captures[0].done.set()
+        await asyncio.wait_for(third, timeout=1.0)
+        self.assertEqual(pipeline.in_flight, 2)
+        self.assertEqual(pipeline.completed, 1)
+
+        for capture in captures[1:]:
+            capture.done.set()
+        await pipeline.drain()
+        self.assertEqual(pipeline.in_flight, 0)
+        self.assertEqual(pipeline.completed, 3)
+
+    async def test_drain_runs_completion_callbacks(self):
+        pipeline = CapturePipeline(max_in_flight=4)
+        completed = []
+        for index in range(3):
+            capture = _Capture()
+            capture.done.set()
+            path = f"frame_{index:04d}.png"
+            await pipeline.submit(capture, path, on_complete=lambda index=index: completed.append(index))
+        await pipeline.drain()
+        self.assertEqual(sorted(completed), [0, 1, 2])
+        self.assertEqual(pipeline.completed, 3)
+        self.assertEqual(pipeline.failed, 0)
+
+    async def test_failures_are_counted(self):
+        pipeline = CapturePipeline(max_in_flight=4)
+        failed = []
+
+        def raise_error():
+            raise RuntimeError("callback failed")
+
+        captures = [_Capture(result=None), _Capture(error=RuntimeError("capture failed")), _Capture(), _Capture(None)]
+        await pipeline.submit(captures[0], "frame_0000.png", on_failure=lambda: failed.append(0))
+        await pipeline.submit(captures[1], "frame_0001.png", on_failure=lambda: failed.append(1))
+        await pipeline.submit(captures[2], "frame_0002.png", on_complete=raise_error)
+        # A failing on_failure callback must not take the pipeline down
+        await pipeline.submit(captures[3], "frame_0003.png", on_failure=raise_error)
+        for capture in captures:
+            capture.done.set()
+        await pipeline.drain()
+
+        self.assertEqual(sorted(failed), [0, 1])
+        self.assertEqual(pipeline.completed, 1)
+        self.assertEqual(pipeline.failed, 4)
+        self.assertEqual(pipeline.in_flight, 0)
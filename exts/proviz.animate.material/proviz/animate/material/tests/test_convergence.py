@@ -0,0 +1,36 @@
+import asyncio
+
+import omni.kit.test
+
+from proviz.animate.material.convergence import buffer_delta, wait_for_sample_convergence
+
+
+class _SlowViewport:
+    def __init__(self, frame_time):
+        self.frame_time = frame_time
+
+    async def wait_for_rendered_frames(self, additional_frames=1):
+        await asyncio.sleep(self.frame_time * additional_frames)
+        return True
+
+
+class TestConvergence(omni.kit.test.AsyncTestCase):
+    async def test_buffer_delta(self):
+        black = bytes(4 * 16)
+        white = bytes([255, 255, 255, 0]) * 16
+        self.assertEqual(buffer_delta(black, black), 0.0)
+        self.assertAlmostEqual(buffer_delta(black, white), 1.0)
+        # Alpha is ignored
+        self.assertEqual(buffer_delta(black, bytes([0, 0, 0, 255]) * 16), 0.0)
+        self.assertEqual(buffer_delta(black, bytes(8)), 1.0)
+
+    async def test_sample_convergence_is_capped(self):
+        result = await wait_for_sample_convergence(_SlowViewport(0.001), 4, max_time=1.0)
+        self.assertTrue(result.converged)
+        self.assertEqual(result.frames, 4)
+
+        result = await wait_for_sample_convergence(_SlowViewport(0.05), 100, max_time=0.05)
+        self.assertFalse(result.converged)
+        self.assertLess(result.seconds, 1.0)
+        # Only the frames rendered before the time-out are reported
+        self.assertLess(result.frames, 2)
@@ -0,0 +1,73 @@
+import tempfile
+import threading
+import types
+
+import omni.kit.test
+
+from proviz.animate.material.ffmpeg_stream import FFmpegStreamWriter
+
+
+class _Stdin:
+    def __init__(self):
+        self.frames = []
+
+    def write(self, data):
+        self.frames.append(data)
+
+    def close(self):
+        pass
+
+
+class TestFFmpegStreamWriter(omni.kit.test.AsyncTestCase):
+    def _queued(self, writer):
+        items = []
+        while writer._ready:
+            data, repeat = writer._ready.popleft()
+            items.append((data and data[0], repeat))
+        return items
+
+    async def test_frames_are_reordered(self):
+        writer = FFmpegStreamWriter("unused.mp4", (1, 1), 24, max_queued_frames=100)
+        writer.write(1, b"\x01" * 4)
+        writer.skip(2, 3)
+        self.assertEqual(self._queued(writer), [])
+        writer.write(0, b"\x00" * 4)
+        writer.write(1, b"\x09" * 4)
+        self.assertEqual(self._queued(writer), [(0, 1), (1, 1), (None, 3)])
+
+    async def test_lost_frame_does_not_hold_back_later_frames(self):
+        writer = FFmpegStreamWriter("unused.mp4", (1, 1), 24, max_queued_frames=100, max_pending_frames=3)
+        for frame_index in (2, 3, 4):
+            writer.write(frame_index, bytes([frame_index]) * 4)
+        self.assertEqual(self._queued(writer), [])
+
+        # Frames 0 and 1 never arrive: one more frame gives up on them instead of buffering it
+        writer.write(5, b"\x05" * 4)
+        self.assertEqual(self._queued(writer), [(None, 2), (2, 1), (3, 1), (4, 1), (5, 1)])
+        writer.write(0, b"\x00" * 4)
+        self.assertEqual(self._queued(writer), [])
+
+    async def test_skip_does_not_wait_for_ffmpeg_and_leading_gap_is_filled(self):
+        writer = FFmpegStreamWriter("unused.mp4", (1, 1), 24, max_queued_frames=1)
+        stdin = _Stdin()
+        writer._process = types.SimpleNamespace(stdin=stdin, wait=lambda: 0)
+        writer._log = tempfile.TemporaryFile()
+
+        # An encoder that is not reading: failed captures are still accounted for at once
+        stalled = threading.Event()
+        writer._thread = threading.Thread(target=stalled.wait, daemon=True)
+        writer._thread.start()
+        writer.skip(0, 2)
+        writer.skip(2)
+        writer.skip(3)
+        self.assertEqual(len(writer._ready), 3)
+        stalled.set()
+        writer._thread.join()
+
+        writer._thread = threading.Thread(target=writer._write_loop, daemon=True)
+        writer._thread.start()
+        writer.write(4, b"\x04" * 4)
+        self.assertTrue(writer.close())
+        # The first captured frame stands in for the four failed ones, so the video keeps its length
+        self.assertEqual(stdin.frames, [b"\x04" * 4] * 5)
+        self.assertEqual((writer.frames_written, writer.frames_repeated, writer.frames_dropped), (5, 4, 0))
@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+import omni.kit.test
+
+from proviz.animate.material import frame_hold
+from proviz.animate.material.frame_hold import duration_manifest_path, fill_hold_frames, write_duration_manifest
+
+
+class TestFrameHold(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._source = os.path.join(self._tmp_dir.name, "frame_0000.png")
+        with open(self._source, "wb") as f:
+            f.write(b"frame")
+        self._targets = [os.path.join(self._tmp_dir.name, f"frame_{index:04d}.png") for index in range(1, 4)]
+
+    async def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _unsupported(self, calls, strategy):
+        def linker(source_path, target_path):
+            calls.append(strategy)
+            raise OSError(f"{strategy} is not supported")
+
+        return linker
+
+    async def test_auto_falls_back_to_copy(self):
+        calls = []
+        linkers = {"hardlink": self._unsupported(calls, "hardlink"), "reflink": self._unsupported(calls, "reflink")}
+        with mock.patch.dict(frame_hold._LINKERS, linkers):
+            self.assertEqual(fill_hold_frames(self._source, self._targets), "copy")
+        # Strategies that failed once are not retried for the rest of the hold
+        self.assertEqual(calls, ["hardlink", "reflink"])
+        for target_path in self._targets:
+            with open(target_path, "rb") as f:
+                self.assertEqual(f.read(), b"frame")
+
+    async def test_auto_uses_reflink_without_hardlinks(self):
+        calls = []
+        reflinked = []
+        linkers = {
+            "hardlink": self._unsupported(calls, "hardlink"),
+            "reflink": lambda source_path, target_path: reflinked.append(target_path),
+        }
+        with mock.patch.dict(frame_hold._LINKERS, linkers):
+            self.assertEqual(fill_hold_frames(self._source, self._targets), "reflink")
+        self.assertEqual(calls, ["hardlink"])
+        self.assertEqual(reflinked, self._targets)
+
+    async def test_hardlink_replaces_existing_targets(self):
+        with open(self._targets[0], "wb") as f:
+            f.write(b"stale")
+        try:
+            self.assertEqual(fill_hold_frames(self._source, self._targets, "hardlink"), "hardlink")
+        except OSError:
+            self.skipTest("Hardlinks are not supported in the temporary directory")
+        for target_path in self._targets:
+            self.assertTrue(os.path.samefile(self._source, target_path))
+
+    async def test_explicit_mode_does_not_fall_back(self):
+        calls = []
+        with mock.patch.dict(frame_hold._LINKERS, {"reflink": self._unsupported(calls, "reflink")}):
+            with self.assertRaises(OSError):
+                fill_hold_frames(self._source, self._targets, "reflink")
+        self.assertEqual(calls, ["reflink"])
+        with self.assertRaises(ValueError):
+            fill_hold_frames(self._source, self._targets, "symlink")
+        self.assertIsNone(fill_hold_frames(self._source, []))
+
+    async def test_write_duration_manifest(self):
+        manifest_path = duration_manifest_path(self._tmp_dir.name, "frame")
+        self.assertEqual(manifest_path, os.path.join(self._tmp_dir.name, "frame_durations.json"))
+        write_duration_manifest(manifest_path, [("frame_0000.png", 0, 3), ("frame_0003.png", 3, 1)])
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["version"], 1)
+        self.assertEqual(
+            manifest["frames"],
+            [
+                {"file": "frame_0000.png", "frame_index": 0, "duration_frames": 3},
+                {"file": "frame_0003.png", "frame_index": 3, "duration_frames": 1},
+            ],
+        )
+        self.assertFalse(os.path.exists(manifest_path + ".tmp"))
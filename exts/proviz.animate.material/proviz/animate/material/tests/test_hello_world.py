@@ -21,26 +21,19 @@ class Test(omni.kit.test.AsyncTestCase):
         pass
 
     # Actual test, notice it is "async" function, so "await" can be used if needed
-    async def test_hello_public_function(self):
-        result = proviz.animate.material.some_public_function(4)
-        self.assertEqual(result, 256)
+    async def test_public_logic(self):
+        self.assertTrue(hasattr(proviz.animate.material, "ShaderAnimationLogic"))
+        self.assertIn("png", proviz.animate.material.OUTPUT_MODES)
 
+    async def test_clear_inputs_button(self):
 
-    async def test_window_button(self):
+        # Find the resolution width field and the Clear Inputs button in our window
+        width_field = ui_test.find("Render and Animation Setup//Frame/**/IntField[*]")
+        clear_button = ui_test.find("Render and Animation Setup//Frame/**/Button[*].text=='Clear Inputs'")
 
-        # Find a label in our window
-        label = ui_test.find("My Window//Frame/**/Label[*]")
+        width_field.model.set_value(640)
+        self.assertEqual(width_field.model.get_value_as_int(), 640)
 
-        # Find buttons in our window
-        add_button = ui_test.find("My Window//Frame/**/Button[*].text=='Add'")
-        reset_button = ui_test.find("My Window//Frame/**/Button[*].text=='Reset'")
-
-        # Click reset button
-        await reset_button.click()
-        self.assertEqual(label.widget.text, "empty")
-
-        await add_button.click()
-        self.assertEqual(label.widget.text, "count: 1")
-
-        await add_button.click()
-        self.assertEqual(label.widget.text, "count: 2")
+        # Clearing restores the defaults
+        await clear_button.click()
+        self.assertEqual(width_field.model.get_value_as_int(), 1920)
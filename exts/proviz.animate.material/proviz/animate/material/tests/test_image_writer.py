@@ -0,0 +1,38 @@
+import os
+import tempfile
+import types
+
+import omni.kit.test
+
+from proviz.animate.material.image_writer import ImageWriter, encode_image, frame_file_name
+
+
+class TestImageWriter(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._frame = types.SimpleNamespace(data=bytes([255, 0, 0, 255]) * 8 * 4, size=(8, 4))
+
+    async def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    async def test_frame_file_name(self):
+        self.assertEqual(frame_file_name("frame", 12, "exr"), "frame_0012.exr")
+
+    async def test_encode_formats(self):
+        for image_format, signature in (("png", b"\x89PNG"), ("jpg", b"\xff\xd8"), ("webp", b"RIFF")):
+            path = os.path.join(self._tmp_dir.name, frame_file_name("frame", 0, image_format))
+            self.assertGreater(encode_image(path, self._frame.data, self._frame.size, image_format), 0)
+            with open(path, "rb") as f:
+                self.assertTrue(f.read().startswith(signature))
+            self.assertFalse(os.path.exists(path + ".tmp"))
+
+    async def test_writer_runs_callbacks(self):
+        written = []
+        writer = ImageWriter("png", png_compression=1, max_workers=2, max_queued=1)
+        for index in range(5):
+            path = os.path.join(self._tmp_dir.name, frame_file_name("frame", index))
+            writer.submit(path, self._frame, lambda path=path: written.append(path))
+        writer.close()
+        self.assertEqual(writer.written, 5)
+        self.assertEqual(len(written), 5)
+        self.assertTrue(all(os.path.isfile(path) for path in written))
@@ -0,0 +1,110 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import omni.kit.test
+
+# images_to_video.py lives at the root of the repository, outside the extension. None of these tests run ffmpeg,
+# but the script imports the ffmpeg-python bindings at module level.
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), *[".."] * 6))
+IMAGES_TO_VIDEO = os.path.join(REPO_ROOT, "images_to_video.py")
+
+
+def _load_images_to_video():
+    spec = importlib.util.spec_from_file_location("images_to_video", IMAGES_TO_VIDEO)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@unittest.skipUnless(os.path.isfile(IMAGES_TO_VIDEO), "images_to_video.py is not next to the extension")
+@unittest.skipUnless(importlib.util.find_spec("ffmpeg"), "ffmpeg-python is not installed")
+class TestImagesToVideo(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self.images_to_video = _load_images_to_video()
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self._temp_dir.name
+
+    async def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _write(self, name, data=b"frame"):
+        path = os.path.join(self.folder, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    async def test_plan_segments(self):
+        plan_segments = self.images_to_video.plan_segments
+        self.assertEqual(plan_segments(100, 4, 10), [(0, 30), (30, 30), (60, 30), (90, 10)])
+        self.assertEqual(plan_segments(25, 2, 10), [(0, 20), (20, 5)])
+        # Never more segments than GOPs, and every frame is covered exactly once
+        self.assertEqual(plan_segments(15, 8, 10), [(0, 10), (10, 5)])
+        self.assertEqual(plan_segments(7, 0, 10), [(0, 7)])
+        self.assertEqual(plan_segments(0, 4, 10), [])
+
+    async def test_collapse_duplicate_frames(self):
+        paths = [
+            self._write("frame_0000.png", b"a"),
+            self._write("frame_0001.png", b"a"),
+            self._write("frame_0002.png", b"b"),
+            self._write("frame_0003.png", b"long frame"),
+            self._write("frame_0004.png", b"a"),
+        ]
+        held_path = os.path.join(self.folder, "frame_0005.png")
+        try:
+            os.link(paths[-1], held_path)
+        except OSError:
+            self._write("frame_0005.png", b"a")
+        paths.append(held_path)
+
+        self.assertEqual(
+            self.images_to_video.collapse_duplicate_frames(paths, workers=2),
+            [(paths[0], 2), (paths[2], 1), (paths[3], 1), (paths[4], 2)],
+        )
+        self.assertEqual(self.images_to_video.collapse_duplicate_frames([]), [])
+
+    async def test_discover_sequences_finds_gaps(self):
+        for frame in (10, 11, 14, 15, 18):
+            self._write(os.path.join("shot", f"beauty_{frame:04d}.png"))
+        self._write(os.path.join("shot", "beauty_0000.exr"))
+        self._write(os.path.join("shot", "notes.txt"))
+        self._write(os.path.join("shot", "beauty_12.png"))
+
+        sequences = self.images_to_video.discover_sequences(self.folder)
+        self.assertEqual(
+            [(sequence["file_prefix"], sequence["image_ext"]) for sequence in sequences],
+            [("beauty", "exr"), ("beauty", "png")],
+        )
+        sequence = sequences[1]
+        self.assertEqual(sequence["frames"], [10, 11, 14, 15, 18])
+        self.assertEqual((sequence["first"], sequence["last"], sequence["digits"]), (10, 18, 4))
+        self.assertEqual(sequence["gaps"], [[12, 13], [16, 17]])
+        # Missing frames hold the previous frame so the video keeps its length
+        self.assertEqual(
+            [duration for _, duration in self.images_to_video.sequence_entries(sequence)], [1, 3, 1, 3, 1]
+        )
+
+    async def test_write_concat_list(self):
+        quoted_dir = os.path.join(self.folder, "it's")
+        entries = [(os.path.join(quoted_dir, "frame_0000.png"), 2), (os.path.join(quoted_dir, "frame_0002.png"), 3)]
+        concat_path = os.path.join(self.folder, "concat.txt")
+        self.assertEqual(self.images_to_video.write_concat_list(concat_path, entries, 24), 5)
+
+        escaped_dir = quoted_dir.replace("'", "'\\''")
+        with open(concat_path) as f:
+            self.assertEqual(
+                f.read().splitlines(),
+                [
+                    "ffconcat version 1.0",
+                    f"file '{escaped_dir}/frame_0000.png'",
+                    "duration 0.083333",
+                    # The last held image is listed again, because the concat demuxer ignores the last duration
+                    f"file '{escaped_dir}/frame_0002.png'",
+                    "duration 0.083333",
+                    f"file '{escaped_dir}/frame_0002.png'",
+                    "duration 0.041667",
+                ],
+            )
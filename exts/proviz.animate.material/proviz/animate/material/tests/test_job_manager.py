@@ -0,0 +1,57 @@
+import asyncio
+
+import omni.kit.test
+
+from proviz.animate.material.job_manager import JobManager
+
+
+class TestJobManager(omni.kit.test.AsyncTestCase):
+    async def test_jobs_run_one_at_a_time_in_order(self):
+        manager = JobManager()
+        events = []
+
+        def make_run(name):
+            async def run(job):
+                events.append(f"{name} start")
+                await asyncio.sleep(0.01)
+                events.append(f"{name} end")
+                return True
+            return run
+
+        jobs = [manager.submit(make_run(name), name) for name in ("a", "b", "c")]
+        self.assertEqual([job.state for job in jobs], ["queued"] * 3)
+        await manager.wait(jobs[-1])
+        self.assertEqual(events, ["a start", "a end", "b start", "b end", "c start", "c end"])
+        self.assertEqual([job.state for job in jobs], ["completed"] * 3)
+
+    async def test_cancel_and_failure(self):
+        manager = JobManager()
+        changes = []
+        manager.on_change = changes.append
+
+        async def cancellable(job):
+            while not job.token.cancelled:
+                manager.report_progress(job, 0.5, "half")
+                await asyncio.sleep(0.005)
+            return True
+
+        async def fails(job):
+            return False
+
+        running = manager.submit(cancellable, "running")
+        queued = manager.submit(fails, "queued")
+        await asyncio.sleep(0.02)
+        self.assertEqual(running.state, "running")
+        self.assertTrue(manager.cancel(queued.id))
+        self.assertTrue(manager.cancel(running.id))
+        await manager.wait(queued)
+        self.assertEqual((running.state, running.progress_text), ("cancelled", "half"))
+        self.assertEqual(queued.state, "cancelled")
+        self.assertFalse(manager.cancel(running.id))
+        self.assertIn(running, changes)
+
+        failed = manager.submit(fails, "fails")
+        await manager.wait(failed)
+        self.assertEqual(failed.state, "failed")
+        manager.clear_finished()
+        self.assertEqual(manager.jobs, [])
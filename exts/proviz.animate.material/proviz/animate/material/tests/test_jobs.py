@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+
+import omni.kit.test
+
+from proviz.animate.material.jobs import DEFAULT_INPUTS, JobSpecError, load_job_file, make_job_inputs
+
+
+class TestJobs(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+
+    async def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _write(self, name, content):
+        path = os.path.join(self._tmp_dir.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    async def test_defaults_and_overrides(self):
+        inputs = make_job_inputs(
+            {"shader_path": "/World/Looks/A", "animation_folder": "/tex/a", "frame_duration": 3},
+            defaults={"hold_mode": True},
+        )
+        self.assertEqual(inputs["frame_duration"], 3)
+        self.assertTrue(inputs["hold_mode"])
+        self.assertEqual(inputs["resolution_width"], DEFAULT_INPUTS["resolution_width"])
+        self.assertEqual(inputs["name"], "a:opacity_texture")
+
+    async def test_rejects_unknown_and_missing_fields(self):
+        with self.assertRaises(JobSpecError):
+            make_job_inputs({"shader_path": "/World/Looks/A", "animation_folder": "/tex/a", "colour": 1})
+        with self.assertRaises(JobSpecError):
+            make_job_inputs({"shader_path": "/World/Looks/A"})
+
+    async def test_load_json_resolves_relative_paths(self):
+        path = self._write("jobs.json", json.dumps({
+            "stage": "scene.usd",
+            "quit_on_finish": True,
+            "defaults": {"output_dir": "out"},
+            "jobs": [
+                {"shader_path": "/World/Looks/A", "animation_folder": "a"},
+                {"shader_path": "/World/Looks/B", "animation_folder": "b", "texture_type": "diffuse_texture"},
+            ],
+        }))
+        settings, jobs = load_job_file(path)
+        self.assertTrue(settings["quit_on_finish"])
+        self.assertEqual(settings["stage"], os.path.join(self._tmp_dir.name, "scene.usd"))
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(jobs[0]["animation_folder"], os.path.join(self._tmp_dir.name, "a"))
+        self.assertEqual(jobs[1]["output_dir"], os.path.join(self._tmp_dir.name, "out"))
+        self.assertEqual(jobs[1]["texture_type"], "diffuse_texture")
+
+    async def test_load_toml(self):
+        path = self._write("jobs.toml", "\n".join([
+            "[[jobs]]",
+            'shader_path = "/World/Looks/A"',
+            'animation_folder = "/tex/a"',
+            "frame_duration = 2",
+        ]))
+        settings, jobs = load_job_file(path)
+        self.assertIsNone(settings["stage"])
+        self.assertEqual(jobs[0]["frame_duration"], 2)
+
+    async def test_bindings(self):
+        path = self._write("jobs.json", json.dumps({"jobs": [{
+            "bindings": [
+                {"shader_path": "/World/Looks/A", "texture_type": "diffuse_texture", "animation_folder": "a"},
+                {"shader_path": "/World/Looks/B", "texture_type": "opacity_texture", "animation_folder": "b"},
+            ],
+        }]}))
+        settings, jobs = load_job_file(path)
+        self.assertEqual(jobs[0]["name"], "a:diffuse_texture")
+        self.assertEqual(jobs[0]["bindings"][1]["animation_folder"], os.path.join(self._tmp_dir.name, "b"))
+        with self.assertRaises(JobSpecError):
+            make_job_inputs({"bindings": [{"shader_path": "/World/Looks/A", "animation_folder": "a"}]})
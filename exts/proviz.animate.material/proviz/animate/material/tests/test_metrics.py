@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+
+import omni.kit.test
+
+from proviz.animate.material.metrics import RunMetrics, percentile
+
+
+class TestMetrics(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._tmp_dir.name, "frame_metrics.jsonl")
+
+    async def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    async def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile([3.0], 0.95), 3.0)
+        self.assertIsNone(percentile([], 0.5))
+
+    async def test_events_and_summary(self):
+        metrics = RunMetrics(self._path, texture_count=4)
+        for seconds in (0.1, 0.2, 0.3):
+            metrics.record("capture", seconds)
+        with metrics.phase("wait_frame", texture=0):
+            pass
+        metrics.add_frames(6, 1000)
+        metrics.texture_finished(skipped=True)
+        self.assertIsNone(metrics.progress()[1])
+        metrics.texture_finished()
+        fraction, eta = metrics.progress()
+        self.assertEqual(fraction, 0.5)
+        self.assertIsNotNone(eta)
+
+        summary = metrics.close()
+        self.assertEqual(summary["phases"]["capture"]["count"], 3)
+        self.assertEqual(summary["phases"]["capture"]["p50"], 0.2)
+        self.assertEqual(summary["frames_written"], 6)
+        self.assertEqual(summary["bytes_written"], 1000)
+
+        with open(self._path) as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual(len(events), 5)
+        self.assertEqual(events[3]["texture"], 0)
+        self.assertEqual(events[-1]["event"], "summary")
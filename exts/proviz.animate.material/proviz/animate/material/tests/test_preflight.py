@@ -0,0 +1,134 @@
+import json
+import os
+import struct
+import tempfile
+
+import omni.kit.test
+
+from proviz.animate.material.bindings import TextureBinding
+from proviz.animate.material.preflight import (
+    previous_run_rates, read_exr_pixel_types, read_image_size, run_preflight
+)
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def _write_exr_header(path, width, height, channels=((b"R", 1),)):
+    """Minimal OpenEXR header: magic, version and a few attributes ending with an empty name."""
+    chlist = b"".join(
+        name + b"\0" + struct.pack("<iBBBBii", pixel_type, 0, 0, 0, 0, 1, 1) for name, pixel_type in channels
+    )
+    attributes = [
+        (b"channels", b"chlist", chlist + b"\0"),
+        (b"compression", b"compression", b"\0"),
+        (b"dataWindow", b"box2i", struct.pack("<iiii", 10, 20, 10 + width - 1, 20 + height - 1)),
+    ]
+    with open(path, "wb") as f:
+        f.write(b"\x76\x2f\x31\x01" + struct.pack("<I", 2))
+        for name, type_name, value in attributes:
+            f.write(name + b"\0" + type_name + b"\0" + struct.pack("<i", len(value)) + value)
+        f.write(b"\0")
+
+
+class TestPreflight(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self._temp_dir.name
+
+    async def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.folder, name)
+
+    async def test_read_image_size_from_headers(self):
+        _write_exr_header(self._path("a.exr"), 640, 360)
+        self.assertEqual(read_image_size(self._path("a.exr")), (640, 360))
+
+        with open(self._path("broken.png"), "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+        with self.assertRaises(ValueError):
+            read_image_size(self._path("broken.png"))
+
+        if Image is None:
+            return
+        for name, size in (("a.png", (33, 17)), ("a.jpg", (40, 30)), ("a.tga", (8, 9)), ("a.webp", (70, 20))):
+            Image.new("RGB", size, (200, 10, 10)).save(self._path(name))
+            self.assertEqual(read_image_size(self._path(name)), size, name)
+        Image.new("RGBA", (12, 5)).save(self._path("lossless.webp"), lossless=True)
+        self.assertEqual(read_image_size(self._path("lossless.webp")), (12, 5))
+
+    async def test_read_exr_pixel_types(self):
+        _write_exr_header(self._path("half.exr"), 8, 8, ((b"A", 1), (b"B", 1), (b"G", 1), (b"R", 1)))
+        self.assertEqual(set(read_exr_pixel_types(self._path("half.exr")).items()),
+                         {("A", "half"), ("B", "half"), ("G", "half"), ("R", "half")})
+        _write_exr_header(self._path("float.exr"), 8, 8, ((b"G", 1), (b"R", 2), (b"id", 0)))
+        self.assertEqual(read_exr_pixel_types(self._path("float.exr")), {"G": "half", "R": "float", "id": "uint"})
+        with open(self._path("broken.exr"), "wb") as f:
+            f.write(b"\x76\x2f\x31\x01")
+        with self.assertRaises(ValueError):
+            read_exr_pixel_types(self._path("broken.exr"))
+
+    async def test_preflight_reports_problems_and_estimates(self):
+        binding = TextureBinding("/World/Shader", "diffuse_texture", self.folder)
+        for index in range(4):
+            _write_exr_header(self._path(f"tex_{index}.exr"), 64 if index < 3 else 32, 64)
+            binding.files.append(self._path(f"tex_{index}.exr"))
+        inputs = {
+            "frame_duration": 3, "resolution_width": 100, "resolution_height": 100, "output_dir": self.folder,
+            "output_prefix": "frame", "image_format": "png", "hold_mode": True,
+        }
+
+        report = run_preflight(inputs, [binding], [0, 1, 2, 3])
+        self.assertTrue(report.ok, report.format())
+        self.assertEqual((report.frame_count, report.capture_count), (12, 4))
+        self.assertEqual(report.estimated_bytes, 4 * 15000)
+        self.assertIsNone(report.estimated_seconds)
+        self.assertEqual(len(report.warnings), 1)
+        self.assertIn("tex_3.exr", report.warnings[0])
+
+        # Earlier metrics of a comparable run replace the per-format estimate
+        with open(self._path("frame_metrics.jsonl"), "w") as f:
+            f.write(json.dumps({"event": "start", "resolution": [100, 100], "output_mode": "png",
+                                "hold_mode": True}) + "\n")
+            f.write(json.dumps({"event": "summary", "elapsed": 10.0, "textures": 6, "textures_skipped": 1,
+                                "frames_written": 15, "bytes_written": 3000}) + "\n")
+        self.assertEqual(previous_run_rates(self._path("frame_metrics.jsonl"), (100, 100), "png", True), (2.0, 200.0))
+        report = run_preflight(inputs, [binding], [2, 3], approved_frames={7})
+        self.assertEqual((report.frame_count, report.estimated_bytes, report.estimated_seconds), (6, 1200, 4.0))
+
+        with open(self._path("tex_1.exr"), "wb") as f:
+            f.write(b"not an exr")
+        report = run_preflight(dict(inputs, output_mode="stream", ffmpeg_path="no-such-ffmpeg"), [binding], [0, 1])
+        self.assertFalse(report.ok)
+        self.assertEqual(len(report.errors), 2)
+        self.assertIn("tex_1.exr", report.errors[0])
+
+    async def test_resumed_runs_estimate_stale_frames_only(self):
+        binding = TextureBinding("/World/Shader", "diffuse_texture", self.folder)
+        for index in range(4):
+            _write_exr_header(self._path(f"tex_{index}.exr"), 64, 64)
+            binding.files.append(self._path(f"tex_{index}.exr"))
+        inputs = {
+            "frame_duration": 3, "resolution_width": 100, "resolution_height": 100, "output_dir": self.folder,
+            "output_prefix": "frame", "image_format": "png", "link_mode": "copy",
+        }
+        full = run_preflight(inputs, [binding], [0, 1, 2, 3])
+
+        report = run_preflight(inputs, [binding], [0, 1, 2, 3], stale_frames={1, 5, 6})
+        self.assertEqual((report.frame_count, report.capture_count, report.current_count), (3, 3, 9))
+        self.assertEqual(report.estimated_bytes, full.estimated_bytes // 4)
+        self.assertIn("9 frames up to date", report.format())
+
+        # A held texture with one stale frame is captured again whole; runtime counts the rendered textures only
+        with open(self._path("frame_metrics.jsonl"), "w") as f:
+            f.write(json.dumps({"event": "start", "resolution": [100, 100], "output_mode": "png",
+                                "hold_mode": True}) + "\n")
+            f.write(json.dumps({"event": "summary", "elapsed": 10.0, "textures": 5, "textures_skipped": 0,
+                                "frames_written": 15, "bytes_written": 3000}) + "\n")
+        report = run_preflight(dict(inputs, hold_mode=True), [binding], [0, 1, 2, 3], stale_frames={5})
+        self.assertEqual((report.frame_count, report.capture_count, report.current_count), (3, 1, 9))
+        self.assertEqual((report.estimated_bytes, report.estimated_seconds), (600, 2.0))
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import time
+
+import omni.kit.test
+from pxr import Sdf
+
+from proviz.animate.material.bindings import TextureBinding
+from proviz.animate.material.preview import TexturePreview, texture_index_at
+
+SHADER_PATH = "/World/Looks/Material/Shader"
+
+
+class TestPreview(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.binding = TextureBinding(SHADER_PATH, "diffuse_texture", self._temp_dir.name)
+        for index in range(10):
+            path = os.path.join(self._temp_dir.name, f"tex_{index:02d}.png")
+            with open(path, "wb") as f:
+                f.write(bytes(1024))
+            self.binding.files.append(path)
+
+        self.layer = Sdf.Layer.CreateAnonymous()
+        self.binding.attr_path = Sdf.Path(SHADER_PATH).AppendProperty("inputs:diffuse_texture")
+        prim_spec = Sdf.CreatePrimInLayer(self.layer, self.binding.attr_path.GetPrimPath())
+        Sdf.AttributeSpec(prim_spec, self.binding.attr_path.name, Sdf.ValueTypeNames.Asset)
+
+    async def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _shown(self):
+        return self.layer.GetAttributeAtPath(self.binding.attr_path).default.path
+
+    async def test_texture_index_at(self):
+        self.assertEqual(texture_index_at(0, 0, 6, 10), 0)
+        self.assertEqual(texture_index_at(11.9, 0, 6, 10), 1)
+        self.assertEqual(texture_index_at(12, 0, 6, 10), 2)
+        self.assertEqual(texture_index_at(-5, 0, 6, 10), 0)
+        self.assertEqual(texture_index_at(1000, 0, 6, 10), 9)
+        self.assertEqual(texture_index_at(20, 10, 5, 10), 2)
+
+    async def test_playback_counts_what_it_cannot_keep_up_with(self):
+        preview = TexturePreview(self.layer, [self.binding], 0, 2, prefetch=4)
+        try:
+            preview.update(0, playing=False)
+            self.assertEqual(self._shown(), self.binding.files[0])
+
+            # Let the read-ahead finish, then play frame by frame
+            deadline = time.time() + 5
+            while not preview.prefetcher.is_ready(4) and time.time() < deadline:
+                time.sleep(0.01)
+            for time_code in (0.5, 1, 1.5, 2, 3, 4):
+                preview.update(time_code)
+            self.assertEqual(self._shown(), self.binding.files[2])
+            self.assertEqual((preview.dropped_frames, preview.skipped_textures, preview.late_textures), (0, 0, 0))
+
+            # A slow tick jumps from frame 4 to frame 17, past textures 3 to 7 and beyond the read-ahead window
+            preview.update(17)
+            self.assertEqual(self._shown(), self.binding.files[8])
+            self.assertEqual(preview.dropped_frames, 12)
+            self.assertEqual(preview.skipped_textures, 5)
+            self.assertEqual(preview.late_textures, 1)
+
+            # Looping back to the start and scrubbing are not counted
+            preview.update(0)
+            preview.update(13, playing=False)
+            self.assertEqual(self._shown(), self.binding.files[6])
+            self.assertEqual(preview.dropped_frames, 12)
+            self.assertEqual(preview.skipped_textures, 5)
+            self.assertEqual(preview.shown, 6)
+        finally:
+            preview.stop()
@@ -0,0 +1,98 @@
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import omni.kit.test
+
+# render_farm.py and the stub worker live at the root of the repository, outside the extension
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), *[".."] * 6))
+RENDER_FARM = os.path.join(REPO_ROOT, "render_farm.py")
+STUB_WORKER = os.path.join(REPO_ROOT, "tools", "scripts", "stub_render_worker.py")
+
+
+def _load_render_farm():
+    spec = importlib.util.spec_from_file_location("render_farm", RENDER_FARM)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@unittest.skipUnless(os.path.isfile(RENDER_FARM), "render_farm.py is not next to the extension")
+class TestRenderFarm(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self.render_farm = _load_render_farm()
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.folder = self._temp_dir.name
+        os.makedirs(os.path.join(self.folder, "textures"))
+        for index in range(10):
+            open(os.path.join(self.folder, "textures", f"tex_{index}.png"), "w").close()
+
+    async def tearDown(self):
+        self._temp_dir.cleanup()
+
+    def _run_farm(self, job, **kwargs):
+        job_file = os.path.join(self.folder, "jobs.json")
+        with open(job_file, "w") as f:
+            json.dump({"jobs": [dict(job, shader_path="/World/Looks/Material/Shader")]}, f)
+        worker_cmd = f'"{sys.executable}" "{STUB_WORKER}" {{job_file}} --fail_once'
+        return self.render_farm.run_farm(job_file, worker_cmd=worker_cmd, **kwargs)
+
+    async def test_plan_shards(self):
+        plan_shards = self.render_farm.plan_shards
+        self.assertEqual(plan_shards(10, 3), [(0, 4), (4, 7), (7, 10)])
+        self.assertEqual(plan_shards(2, 5), [(0, 1), (1, 2)])
+        self.assertEqual(plan_shards(4, 0), [(0, 4)])
+
+    async def test_missing_frames(self):
+        manifest = os.path.join(self.folder, "manifest.json")
+        self.assertEqual(self.render_farm.missing_frames(manifest, 1, 3, 2), [2, 3, 4, 5])
+        with open(manifest, "w") as f:
+            json.dump({"completed_frames": [2, 3, 5]}, f)
+        self.assertEqual(self.render_farm.missing_frames(manifest, 1, 3, 2), [4])
+        self.assertEqual(self.render_farm.missing_frames(manifest, 1, 3, 2, approved_frames={3, 4}), [4])
+
+    async def test_failed_shards_are_retried_and_merged(self):
+        job = {"name": "shot", "animation_folder": "textures", "output_dir": "out", "frame_duration": 2}
+        (report,) = self._run_farm(job, shard_count=3, workers=2, retries=1)
+
+        self.assertEqual(report["missing_frames"], [])
+        self.assertEqual(
+            [(shard["texture_start"], shard["texture_end"]) for shard in report["shards"]], [(0, 4), (4, 7), (7, 10)]
+        )
+        # Every worker fails its first attempt and completes the retry
+        self.assertEqual([shard["attempts"] for shard in report["shards"]], [2, 2, 2])
+        self.assertEqual({shard["status"] for shard in report["shards"]}, {"completed"})
+
+        output_dir = os.path.join(self.folder, "out")
+        frames = sorted(name for name in os.listdir(output_dir) if name.endswith(".png"))
+        self.assertEqual(frames, [f"frame_{index:04d}.png" for index in range(20)])
+        with open(os.path.join(output_dir, "frame_farm_manifest.json")) as f:
+            self.assertEqual(json.load(f)["frame_count"], 20)
+
+    async def test_shard_jobs_are_loaded_like_batch_jobs(self):
+        job = {"name": "shot", "animation_folder": "textures", "output_dir": "out", "animation_sublayer": "anim.usda"}
+        (report,) = self._run_farm(job, shard_count=1, workers=1, retries=1)
+        self.assertEqual(report["frame_duration"], 6)
+        with open(os.path.join(self.folder, "shards", "shot_shard000.json")) as f:
+            shard_job = json.load(f)["jobs"][0]
+        # Paths are resolved against the job file, not the shard directory the worker reads
+        self.assertEqual(shard_job["animation_sublayer"], os.path.join(self.folder, "anim.usda"))
+        self.assertEqual(shard_job["animation_folder"], os.path.join(self.folder, "textures"))
+
+        with self.assertRaises(ValueError):
+            self._run_farm(dict(job, frame_durtion=2), shard_count=1, workers=1)
+
+    async def test_shards_out_of_retries_report_missing_frames(self):
+        job = {"name": "shot", "animation_folder": "textures", "output_dir": "out", "frame_duration": 2,
+               "approved_frames": "3-5, 18"}
+        (report,) = self._run_farm(job, shard_count=2, workers=2, retries=0)
+
+        # Promote shards cover only the textures holding approved frames
+        self.assertEqual(
+            [(shard["texture_start"], shard["texture_end"]) for shard in report["shards"]], [(1, 3), (9, 10)]
+        )
+        self.assertEqual({shard["status"] for shard in report["shards"]}, {"failed"})
+        self.assertEqual(report["missing_frames"], [3, 4, 5, 18])
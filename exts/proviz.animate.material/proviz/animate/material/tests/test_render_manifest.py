@@ -0,0 +1,62 @@
+import os
+import tempfile
+
+import omni.kit.test
+
+from proviz.animate.material.render_manifest import RenderManifest, settings_key, texture_signature
+
+
+class TestRenderManifest(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._texture = os.path.join(self._tmp_dir.name, "tex_0.png")
+        self._frame = os.path.join(self._tmp_dir.name, "frame_0000.png")
+        for path in (self._texture, self._frame):
+            with open(path, "w") as f:
+                f.write("data")
+        self._path = os.path.join(self._tmp_dir.name, "frame_render_manifest.jsonl")
+
+    async def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    async def test_record_and_reload(self):
+        settings = settings_key({"resolution_width": 1920, "resolution_height": 1080})
+        signature = texture_signature(self._texture)
+        RenderManifest.load(self._path).record([0], self._texture, signature, settings)
+
+        manifest = RenderManifest.load(self._path)
+        self.assertTrue(manifest.is_current(0, self._texture, signature, settings, self._frame))
+        self.assertFalse(manifest.is_current(1, self._texture, signature, settings, self._frame))
+
+        other_settings = settings_key({"resolution_width": 3840, "resolution_height": 2160})
+        self.assertFalse(manifest.is_current(0, self._texture, signature, other_settings, self._frame))
+        # Frames sampled differently are stale too
+        for changed in ({"convergence_mode": "samples"}, {"convergence_threshold": 0.01}, {"wait_time": 1.0},
+                        {"draft_settings": {"/rtx/pathtracing/spp": 4}}):
+            changed_settings = settings_key(dict({"resolution_width": 1920, "resolution_height": 1080}, **changed))
+            self.assertFalse(manifest.is_current(0, self._texture, signature, changed_settings, self._frame), changed)
+
+        os.remove(self._frame)
+        self.assertFalse(manifest.is_current(0, self._texture, signature, settings, self._frame))
+
+    async def test_changed_texture_is_stale(self):
+        settings = settings_key({})
+        manifest = RenderManifest.load(self._path)
+        manifest.record([0], self._texture, texture_signature(self._texture, hash_contents=True), settings)
+
+        with open(self._texture, "w") as f:
+            f.write("edited")
+        signature = texture_signature(self._texture, hash_contents=True)
+        self.assertFalse(manifest.is_current(0, self._texture, signature, settings, self._frame))
+
+    async def test_truncated_line_is_ignored(self):
+        manifest = RenderManifest.load(self._path)
+        manifest.record([0, 1], self._texture, "sig", "settings")
+        with open(self._path, "a") as f:
+            f.write('{"frame": 2, "sou')
+
+        manifest = RenderManifest.load(self._path)
+        self.assertEqual(sorted(manifest.frames), [0, 1])
+        manifest.compact()
+        with open(self._path) as f:
+            self.assertEqual(len(f.readlines()), 2)
@@ -0,0 +1,66 @@
+import os
+import tempfile
+
+import omni.kit.test
+
+from proviz.animate.material.render_quality import (
+    approvals_path, draft_resolution, format_frame_ranges, parse_frame_ranges, quality_inputs
+)
+
+
+class TestRenderQuality(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.inputs = {
+            "resolution_width": 3840,
+            "resolution_height": 2160,
+            "output_dir": self._temp_dir.name,
+            "output_prefix": "frame",
+            "stream_output": "/renders/shot.mp4",
+            "draft_scale": 0.5,
+        }
+
+    async def tearDown(self):
+        self._temp_dir.cleanup()
+
+    async def test_frame_ranges(self):
+        self.assertEqual(parse_frame_ranges("0-3, 7,5-5\n9"), [0, 1, 2, 3, 5, 7, 9])
+        self.assertEqual(parse_frame_ranges([2, "4-5", [10, 11]]), [2, 4, 5, 10, 11])
+        self.assertEqual(format_frame_ranges([0, 1, 2, 3, 5, 7, 8]), "0-3,5,7-8")
+        for spec in ("5-2", "a-b", "-3"):
+            with self.assertRaises(ValueError):
+                parse_frame_ranges(spec)
+
+    async def test_draft_renders_a_fraction_into_its_own_tree(self):
+        self.assertEqual(draft_resolution(1920, 1080, 0.3), (576, 324))
+        self.assertEqual(draft_resolution(101, 3, 0.1), (10, 2))
+
+        inputs, approved_frames = quality_inputs(dict(self.inputs, render_quality="draft"))
+        self.assertIsNone(approved_frames)
+        self.assertEqual((inputs["resolution_width"], inputs["resolution_height"]), (1920, 1080))
+        draft_dir = os.path.join(self._temp_dir.name, "draft")
+        self.assertEqual(inputs["output_dir"], draft_dir)
+        self.assertEqual(inputs["stream_output"], os.path.join(draft_dir, "shot.mp4"))
+        self.assertEqual(self.inputs["resolution_width"], 3840)
+
+        inputs, approved_frames = quality_inputs(self.inputs)
+        self.assertIs(inputs, self.inputs)
+        self.assertIsNone(approved_frames)
+
+    async def test_promote_reads_the_draft_approvals(self):
+        promote = dict(self.inputs, render_quality="promote")
+        with self.assertRaises(ValueError):
+            quality_inputs(promote)
+
+        path = approvals_path(os.path.join(self._temp_dir.name, "draft"), "frame")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write("# shot approved by review\n0-5\n12  # hero frame\n")
+        inputs, approved_frames = quality_inputs(promote)
+        self.assertEqual(approved_frames, [0, 1, 2, 3, 4, 5, 12])
+        self.assertEqual(inputs["resolution_width"], 3840)
+        self.assertEqual(inputs["output_dir"], self._temp_dir.name)
+
+        # Frames in the inputs take precedence over the file
+        _, approved_frames = quality_inputs(dict(promote, approved_frames="20-21"))
+        self.assertEqual(approved_frames, [20, 21])
@@ -0,0 +1,78 @@
+import os
+import tempfile
+
+import omni.kit.test
+from PIL import Image
+
+from proviz.animate.material.texture_cache import BC_COMPRESSION, TextureCache, fit_size, write_dds
+
+
+class TestTextureCache(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._textures = []
+        for index in range(3):
+            path = os.path.join(self._tmp_dir.name, f"tex_{index}.jpg")
+            Image.new("RGB", (256, 128), (index * 100, 50, 0)).save(path)
+            self._textures.append(path)
+        self._cache_dir = os.path.join(self._tmp_dir.name, "cache")
+
+    async def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    async def test_fit_size(self):
+        self.assertEqual(fit_size((4096, 2048), 1024), (1024, 512))
+        self.assertEqual(fit_size((512, 512), 1024), (512, 512))
+        self.assertEqual(fit_size((512, 512), None), (512, 512))
+
+    async def test_preprocess_and_reuse(self):
+        cache = TextureCache(self._cache_dir, max_size=64)
+        outputs = cache.preprocess(self._textures)
+        self.assertEqual(cache.converted, 3)
+        with Image.open(outputs[1]) as image:
+            self.assertEqual((image.format, image.size), ("DDS", (64, 32)))
+            # Block compression keeps 5 bits of red
+            self.assertAlmostEqual(image.convert("RGB").getpixel((4, 4))[0], 100, delta=4)
+        if BC_COMPRESSION:
+            # 64x32 BC1 with seven mip levels down to 1x1, 8 bytes per 4x4 block
+            self.assertEqual(os.path.getsize(outputs[1]), 128 + 8 * (16 * 8 + 8 * 4 + 4 * 2 + 2 * 1 + 1 + 1 + 1))
+        else:
+            self.assertEqual(os.path.getsize(outputs[1]),
+                             128 + 4 * (64 * 32 + 32 * 16 + 16 * 8 + 8 * 4 + 4 * 2 + 2 * 1 + 1 * 1))
+
+        cache = TextureCache(self._cache_dir, max_size=64)
+        self.assertEqual(cache.preprocess(self._textures), outputs)
+        self.assertEqual((cache.converted, cache.reused), (0, 3))
+
+    async def test_write_dds(self):
+        path = os.path.join(self._tmp_dir.name, "rgba.dds")
+        write_dds(path, Image.new("RGBA", (16, 8), (10, 20, 30, 255)), compress=False)
+        self.assertEqual(os.path.getsize(path), 128 + 4 * (16 * 8 + 8 * 4 + 4 * 2 + 2 * 1 + 1 * 1))
+        if not BC_COMPRESSION:
+            return
+
+        # Transparent textures keep their alpha in BC3
+        write_dds(path, Image.new("RGBA", (16, 8), (200, 20, 30, 128)))
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(88)[84:], b"DXT5")
+        self.assertEqual(os.path.getsize(path), 128 + 16 * (4 * 2 + 2 * 1 + 1 + 1 + 1))
+        with Image.open(path) as image:
+            red, _, _, alpha = image.convert("RGBA").getpixel((3, 3))
+            self.assertAlmostEqual(red, 200, delta=8)
+            self.assertAlmostEqual(alpha, 128, delta=8)
+
+    async def test_invalid_texture_and_eviction(self):
+        with open(self._textures[2], "wb") as f:
+            f.write(b"not a jpeg")
+        with self.assertRaises(ValueError):
+            TextureCache(self._cache_dir, max_size=64).preprocess(self._textures)
+
+        cache = TextureCache(self._cache_dir, max_size=64, max_bytes=0)
+        outputs = cache.preprocess(self._textures[:2])
+        self.assertTrue(all(os.path.isfile(output) for output in outputs))
+        # Another process is still writing this entry
+        in_flight = f"{outputs[1]}.tmp-1-1"
+        open(in_flight, "wb").close()
+        self.assertGreater(cache.evict(keep=outputs[:1]), 0)
+        self.assertEqual([os.path.isfile(output) for output in outputs], [True, False])
+        self.assertTrue(os.path.isfile(in_flight))
@@ -0,0 +1,40 @@
+import os
+import tempfile
+
+import omni.kit.test
+
+from proviz.animate.material.texture_scanner import natural_sort_key, scan_textures
+
+
+class TestTextureScanner(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+
+    async def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _touch(self, name):
+        with open(os.path.join(self._tmp_dir.name, name), "w"):
+            pass
+
+    async def test_natural_order(self):
+        names = ["tex_10.png", "tex_2.png", "Tex_1.png", "tex_2b.png"]
+        self.assertEqual(sorted(names, key=natural_sort_key), ["Tex_1.png", "tex_2.png", "tex_2b.png", "tex_10.png"])
+
+    async def test_filters_formats_and_folders(self):
+        for name in ("a_1.PNG", "a_2.exr", "a_3.dds", "a_4.tga", "a_5.webp", "notes.txt"):
+            self._touch(name)
+        os.mkdir(os.path.join(self._tmp_dir.name, "sub.png"))
+
+        files = [os.path.basename(path) for path in scan_textures(self._tmp_dir.name, use_cache=False)]
+        self.assertEqual(files, ["a_1.PNG", "a_2.exr", "a_3.dds", "a_4.tga", "a_5.webp"])
+
+    async def test_listing_refreshes_when_folder_changes(self):
+        self._touch("tex_1.png")
+        self.assertEqual(len(scan_textures(self._tmp_dir.name)), 1)
+
+        self._touch("tex_2.png")
+        # Make sure the directory mtime moves even on filesystems with coarse timestamps
+        stat = os.stat(self._tmp_dir.name)
+        os.utime(self._tmp_dir.name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(len(scan_textures(self._tmp_dir.name)), 2)
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+import omni.kit.test
+from pxr import Sdf, Usd, UsdShade
+
+from proviz.animate.material.time_samples import author_texture_time_samples, stronger_opinions
+
+SHADER_PATH = "/World/Looks/Material/Shader"
+
+
+class TestTimeSamples(omni.kit.test.AsyncTestCase):
+    async def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.sublayer_path = os.path.join(self._temp_dir.name, "animation.usda")
+        self.stage = Usd.Stage.CreateInMemory()
+        shader = UsdShade.Shader.Define(self.stage, SHADER_PATH)
+        self.texture_input = shader.CreateInput("diffuse_texture", Sdf.ValueTypeNames.Asset)
+
+    async def tearDown(self):
+        self._temp_dir.cleanup()
+
+    async def test_samples_in_sublayer_drive_the_input(self):
+        layer = author_texture_time_samples(
+            self.stage, SHADER_PATH, "diffuse_texture", ["a.png", "b.png"], 0, 4, self.sublayer_path
+        )
+        self.assertEqual(layer.identifier, Sdf.Layer.Find(self.sublayer_path).identifier)
+        self.assertEqual(self.texture_input.Get(5).path, "b.png")
+        self.assertEqual(stronger_opinions(self.stage, [self.texture_input.GetAttr()], self.sublayer_path), [])
+
+    async def test_root_layer_default_hides_sublayer(self):
+        self.texture_input.Set(Sdf.AssetPath("static.png"))
+        self.assertEqual(
+            len(stronger_opinions(self.stage, [self.texture_input.GetAttr()], self.sublayer_path)), 1
+        )
+        self.assertIsNone(author_texture_time_samples(
+            self.stage, SHADER_PATH, "diffuse_texture", ["a.png", "b.png"], 0, 4, self.sublayer_path
+        ))
+        self.assertFalse(os.path.exists(self.sublayer_path))
+
+        # Without a sublayer the samples go to the edit target, next to the default
+        self.assertIsNotNone(author_texture_time_samples(
+            self.stage, SHADER_PATH, "diffuse_texture", ["a.png", "b.png"], 0, 4
+        ))
+        self.assertEqual(self.texture_input.Get(5).path, "b.png")
@@ -0,0 +1,323 @@
+import hashlib
+import io
+import json
+import math
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow ships with Kit's pip archive; without it textures cannot be preprocessed
+    Image = None
+
+# Bump when the conversion changes, so older cache entries are not reused
+CACHE_VERSION = 2
+
+PREPROCESS_FORMATS = ("dds", "png")
+
+# Sources Pillow can decode; other formats (EXR, DDS) are passed to the renderer unchanged
+PREPROCESS_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tga", ".webp")
+
+INDEX_DIR = "index"
+
+# DDS header: magic, 7 header fields, 11 reserved, pixel format (8 fields), caps (4) and 1 reserved
+_DDS_HEADER = struct.Struct("<4s7I11I8I5I")
+_DDSD_CAPS, _DDSD_HEIGHT, _DDSD_WIDTH, _DDSD_PITCH = 0x1, 0x2, 0x4, 0x8
+_DDSD_PIXELFORMAT, _DDSD_MIPMAPCOUNT, _DDSD_LINEARSIZE = 0x1000, 0x20000, 0x80000
+_DDPF_ALPHAPIXELS, _DDPF_FOURCC, _DDPF_RGB = 0x1, 0x4, 0x40
+_DDSCAPS_COMPLEX, _DDSCAPS_TEXTURE, _DDSCAPS_MIPMAP = 0x8, 0x1000, 0x400000
+
+# Block compression by transparency: BC1 stores a 4x4 block of opaque pixels in 8 bytes, BC3 with alpha in 16
+_BC_FORMATS = {False: ("DXT1", 8), True: ("DXT5", 16)}
+
+
+def _can_write_bc():
+    """Pillow encodes BC1 and BC3 from 11.2 on; older versions ignore the pixel format and write RGBA."""
+    if Image is None:
+        return False
+    buffer = io.BytesIO()
+    try:
+        Image.new("RGBA", (4, 4)).save(buffer, format="DDS", pixel_format="DXT5")
+    except (OSError, ValueError, KeyError):
+        return False
+    return buffer.getvalue()[84:88] == b"DXT5"
+
+
+BC_COMPRESSION = _can_write_bc()
+
+
+def write_dds(path, image, compress=None):
+    """
+    Write an image as a DDS with a full mip chain.
+
+    The levels are block compressed (BC1, or BC3 if the image has transparency) when Pillow can encode them,
+    a quarter to an eighth of uncompressed RGBA and usually smaller than the source PNG; otherwise they are
+    written as RGBA. Either way the renderer uploads the levels as they are, with no decoding or mip
+    generation at load time.
+
+    Args:
+        compress (bool): Block compress the levels; defaults to BC_COMPRESSION.
+    """
+    image = image.convert("RGBA")
+    width, height = image.size
+    mip_count = int(math.log2(max(width, height))) + 1
+    levels = [image]
+    for _ in range(mip_count - 1):
+        levels.append(levels[-1].resize((max(1, levels[-1].size[0] // 2), max(1, levels[-1].size[1] // 2)),
+                                        Image.BOX))
+
+    if compress is None:
+        compress = BC_COMPRESSION
+    if compress:
+        alpha = image.getchannel("A").getextrema() != (255, 255)
+        pixel_format, block_size = _BC_FORMATS[alpha]
+        data = []
+        for level in levels:
+            # Pillow writes a single level; keep the blocks and drop its header
+            buffer = io.BytesIO()
+            (level if alpha else level.convert("RGB")).save(buffer, format="DDS", pixel_format=pixel_format)
+            level_size = max(1, (level.size[0] + 3) // 4) * max(1, (level.size[1] + 3) // 4) * block_size
+            data.append(buffer.getvalue()[-level_size:])
+        flags = _DDSD_LINEARSIZE
+        pixel_format_fields = (32, _DDPF_FOURCC, struct.unpack("<I", pixel_format.encode("ascii"))[0], 0, 0, 0, 0, 0)
+        pitch = len(data[0])
+    else:
+        data = [level.tobytes() for level in levels]
+        flags = _DDSD_PITCH
+        pixel_format_fields = (32, _DDPF_RGB | _DDPF_ALPHAPIXELS, 0, 32, 0x000000FF, 0x0000FF00, 0x00FF0000,
+                               0xFF000000)
+        pitch = width * 4
+
+    header = _DDS_HEADER.pack(
+        b"DDS ", 124,
+        _DDSD_CAPS | _DDSD_HEIGHT | _DDSD_WIDTH | _DDSD_PIXELFORMAT | _DDSD_MIPMAPCOUNT | flags,
+        height, width, pitch, 0, mip_count,
+        *([0] * 11),
+        *pixel_format_fields,
+        _DDSCAPS_COMPLEX | _DDSCAPS_TEXTURE | _DDSCAPS_MIPMAP, 0, 0, 0, 0,
+    )
+    with open(path, "wb") as f:
+        f.write(header)
+        for level_data in data:
+            f.write(level_data)
+
+
+def hash_file(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fit_size(size, max_size):
+    """Scale (width, height) down to fit within max_size, keeping the aspect ratio."""
+    width, height = size
+    if not max_size or max(width, height) <= max_size:
+        return size
+    scale = max_size / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+class TextureCache:
+    """
+    Content-addressed cache of resized, mipmapped copies of source textures.
+
+    An entry is named after the hash of the source contents and the conversion options, so the same texture
+    in another folder or under another name reuses it. Entries are touched when used and the least recently
+    used ones are evicted once the cache grows beyond max_bytes. A per-folder index of source sizes and
+    modification times lets a repeat render of an unchanged folder skip hashing altogether.
+    """
+
+    def __init__(self, cache_dir, max_size=None, image_format="dds", max_bytes=20 << 30, workers=None):
+        if image_format not in PREPROCESS_FORMATS:
+            raise ValueError(f"Unsupported preprocess format '{image_format}', expected one of "
+                             f"{', '.join(PREPROCESS_FORMATS)}")
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size
+        self.image_format = image_format
+        self.max_bytes = max_bytes
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.converted = 0
+        self.reused = 0
+        if image_format == "dds" and Image is not None and not BC_COMPRESSION:
+            print("Pillow cannot block compress DDS before version 11.2: preprocessed textures are written as "
+                  "uncompressed RGBA, several times the size of their sources.")
+
+    @property
+    def options(self):
+        compression = "bc" if self.image_format == "dds" and BC_COMPRESSION else None
+        return {"version": CACHE_VERSION, "max_size": self.max_size, "format": self.image_format,
+                "compression": compression}
+
+    def entry_path(self, content_hash):
+        options = json.dumps(self.options, sort_keys=True)
+        key = hashlib.sha1(f"{content_hash}:{options}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{self.image_format}")
+
+    def _index_path(self, textures):
+        folders = sorted({os.path.dirname(os.path.abspath(texture)) for texture in textures})
+        key = json.dumps({"folders": folders, **self.options}, sort_keys=True)
+        return os.path.join(self.cache_dir, INDEX_DIR, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def _from_index(self, textures):
+        """Cached copies of every texture if the folder is unchanged since the last run, else None."""
+        try:
+            with open(self._index_path(textures)) as f:
+                index = json.load(f)
+            outputs = []
+            for texture in textures:
+                entry = index[os.path.abspath(texture)]
+                if entry["signature"] != self._signature(texture) or not os.path.isfile(entry["output"]):
+                    return None
+                outputs.append(entry["output"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return outputs
+
+    def _write_index(self, textures, outputs):
+        index_path = self._index_path(textures)
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        index = {
+            os.path.abspath(texture): {"signature": self._signature(texture), "output": output}
+            for texture, output in zip(textures, outputs)
+        }
+        temp_path = f"{index_path}.tmp-{os.getpid()}"
+        with open(temp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(temp_path, index_path)
+
+    def _convert(self, texture):
+        """Worker: return the cached copy of one texture, converting it if needed."""
+        if not texture.lower().endswith(PREPROCESS_EXTENSIONS):
+            return texture, False
+
+        output = self.entry_path(hash_file(texture))
+        if os.path.isfile(output):
+            os.utime(output)
+            return output, False
+
+        try:
+            with Image.open(texture) as image:
+                image.load()
+                image = image.convert("RGBA")
+        except Exception as e:
+            raise ValueError(f"'{texture}' does not decode: {e}")
+        size = fit_size(image.size, self.max_size)
+        if size != image.size:
+            image = image.resize(size, Image.LANCZOS)
+
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        temp_path = f"{output}.tmp-{os.getpid()}-{threading.get_ident()}"
+        if self.image_format == "dds":
+            write_dds(temp_path, image)
+        else:
+            image.save(temp_path, format="PNG", compress_level=1)
+        os.replace(temp_path, output)
+        return output, True
+
+    def preprocess(self, textures):
+        """
+        Return the cached copies of a list of textures, converting those that are not cached yet.
+
+        Decoding, resizing and encoding run on a thread pool; Pillow releases the GIL while doing so.
+
+        Args:
+            textures (list): Source texture paths.
+
+        Returns:
+            list: Paths to render from, in the same order. Formats Pillow cannot read are returned unchanged.
+
+        Raises:
+            RuntimeError: If Pillow is not available.
+            ValueError: If textures fail to decode; the message lists them.
+        """
+        if Image is None:
+            raise RuntimeError("Texture preprocessing requires the 'Pillow' module.")
+
+        outputs = self._from_index(textures)
+        if outputs is not None:
+            for output in set(outputs):
+                if output.startswith(self.cache_dir):
+                    os.utime(output)
+            self.reused += len(textures)
+            return outputs
+
+        outputs, errors = [], []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="proviz_texture_cache") as executor:
+            futures = [executor.submit(self._convert, texture) for texture in textures]
+            for future in futures:
+                try:
+                    output, converted = future.result()
+                except (ValueError, OSError) as e:
+                    errors.append(str(e))
+                    continue
+                outputs.append(output)
+                if converted:
+                    self.converted += 1
+                else:
+                    self.reused += 1
+
+        if errors:
+            shown = "; ".join(errors[:5])
+            more = f" and {len(errors) - 5} more" if len(errors) > 5 else ""
+            raise ValueError(f"{len(errors)} textures failed to preprocess: {shown}{more}")
+
+        self._write_index(textures, outputs)
+        self.evict(keep=outputs)
+        return outputs
+
+    def evict(self, keep=()):
+        """
+        Delete the least recently used entries until the cache is within max_bytes.
+
+        Entries in keep and files still being written (by this or another process) are never deleted, so the
+        cache can stay above max_bytes; that is reported.
+
+        Returns:
+            int: Bytes freed.
+        """
+        keep = set(keep)
+        entries = []
+        total = 0
+        kept = 0
+        for directory, dir_names, file_names in os.walk(self.cache_dir):
+            if os.path.basename(directory) == INDEX_DIR:
+                dir_names.clear()
+                continue
+            for name in file_names:
+                if ".tmp-" in name:
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                total += stat.st_size
+                if path in keep:
+                    kept += stat.st_size
+                else:
+                    entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                pass
+        if freed:
+            print(f"Evicted {freed / (1 << 20):.1f} MiB from the texture cache {self.cache_dir}")
+        if kept > self.max_bytes:
+            print(f"Warning: The textures in use take {kept / (1 << 20):.1f} MiB, more than the texture cache limit "
+                  f"of {self.max_bytes / (1 << 20):.1f} MiB; raise texture_cache_max_gb or lower preprocess_max_size.")
+        return freed
@@ -0,0 +1,56 @@
+# Kept free of Kit imports: render_farm.py and the stub render worker load this module outside Kit.
+import os
+import re
+
+# Texture formats the renderer can load from the animation folder.
+TEXTURE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".exr", ".tga", ".webp", ".dds")
+
+_DIGITS = re.compile(r"(\d+)")
+
+# (folder, extensions) -> (directory mtime, sorted listing)
+_listing_cache = {}
+
+
+def natural_sort_key(name):
+    """Sort key that orders embedded numbers numerically, so 'tex_2' comes before 'tex_10'."""
+    return [int(part) if part.isdigit() else part.lower() for part in _DIGITS.split(name)]
+
+
+def scan_textures(folder, extensions=TEXTURE_EXTENSIONS, use_cache=True):
+    """
+    List the texture files in a folder in natural order.
+
+    Uses os.scandir so file types come from the directory listing instead of a stat per file. The result
+    is cached against the folder's modification time, which changes whenever files are added, removed
+    or renamed.
+
+    Args:
+        folder (str): The animation folder.
+        extensions (tuple): Lower case file extensions to accept.
+        use_cache (bool): Reuse the previous listing if the folder has not changed.
+
+    Returns:
+        list: Full paths of the texture files.
+    """
+    folder = os.path.abspath(folder)
+    key = (folder, tuple(extensions))
+    mtime = os.stat(folder).st_mtime_ns
+
+    cached = _listing_cache.get(key)
+    if use_cache and cached and cached[0] == mtime:
+        return list(cached[1])
+
+    names = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith(key[1]) and entry.is_file():
+                names.append(entry.name)
+
+    names.sort(key=natural_sort_key)
+    files = [os.path.join(folder, name) for name in names]
+    _listing_cache[key] = (mtime, files)
+    return list(files)
+
+
+def clear_scan_cache():
+    _listing_cache.clear()
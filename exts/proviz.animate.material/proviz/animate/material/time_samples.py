@@ -0,0 +1,220 @@
+import os
+
+from pxr import Gf, Sdf, UsdShade
+
+
+def get_animation_layer(stage, sublayer_path=None):
+    """
+    Return the layer to author the animation into.
+
+    Args:
+        stage (Usd.Stage): The stage.
+        sublayer_path (str): Optional layer file. It is created if needed and inserted as the strongest
+            sublayer of the root layer. Without it the current edit target is used.
+    """
+    if not sublayer_path:
+        return stage.GetEditTarget().GetLayer()
+
+    root_layer = stage.GetRootLayer()
+    layer = Sdf.Layer.FindOrOpen(sublayer_path)
+    if layer is None:
+        layer = Sdf.Layer.CreateNew(sublayer_path)
+        print(f"Created animation layer: {sublayer_path}")
+
+    # Sublayer paths are stored relative to the root layer when possible
+    sublayer_paths = [root_layer.ComputeAbsolutePath(path) for path in root_layer.subLayerPaths]
+    if layer.identifier not in sublayer_paths and os.path.abspath(sublayer_path) not in sublayer_paths:
+        root_layer.subLayerPaths.insert(0, layer.identifier)
+    return layer
+
+
+def stronger_opinions(stage, attrs, sublayer_path):
+    """
+    Find values that would hide time samples authored into an animation sublayer.
+
+    The sublayer is inserted below the root layer, so a default or time samples authored on the same attribute
+    in the root layer (the usual case for a material made in the stage) or the session layer win over it.
+
+    Args:
+        stage (Usd.Stage): The stage.
+        attrs (list): Usd.Attribute objects about to be animated.
+        sublayer_path (str): The animation sublayer, which does not need to be part of the stage yet.
+
+    Returns:
+        list: "attribute path in layer" descriptions, empty if the time samples would take effect.
+    """
+    layer_stack = stage.GetLayerStack(includeSessionLayers=True)
+    sublayer = Sdf.Layer.Find(sublayer_path)
+    if sublayer is not None and sublayer in layer_stack:
+        stronger = layer_stack[:layer_stack.index(sublayer)]
+    else:
+        stronger = layer_stack[:layer_stack.index(stage.GetRootLayer()) + 1]
+    return [
+        f"{attr.GetPath()} in {spec.layer.identifier}"
+        for attr in attrs
+        for spec in attr.GetPropertyStack()
+        if spec.layer in stronger and (spec.HasInfo("default") or spec.HasInfo("timeSamples"))
+    ]
+
+
+def _check_sublayer(stage, attrs, sublayer_path):
+    """Print an error and return False if values in stronger layers would hide the sublayer's time samples."""
+    if not sublayer_path:
+        return True
+    opinions = stronger_opinions(stage, attrs, sublayer_path)
+    if opinions:
+        print(f"Error: Values authored in stronger layers would hide the time samples in '{sublayer_path}': "
+              f"{'; '.join(opinions)}. Clear them (Clear Animation clears the edit target), or leave the animation "
+              "sublayer empty to author into the edit target.")
+        return False
+    return True
+
+
+def author_texture_time_samples(stage, shader_path, texture_type, textures, start_time_code, frame_duration,
+                                sublayer_path=None):
+    """
+    Write a texture sequence onto a shader input as time-sampled asset paths.
+
+    Texture i is sampled at start_time_code + i * frame_duration. Asset values are held between samples,
+    so each texture stays on screen for frame_duration time codes. All samples are written through the
+    Sdf API inside a single Sdf.ChangeBlock, so the stage recomposes once no matter how long the sequence is.
+
+    Args:
+        stage (Usd.Stage): The stage.
+        shader_path (str): Path to the Shader prim.
+        texture_type (str): Name of the texture input, e.g. "diffuse_texture".
+        textures (list): Texture file paths in playback order.
+        start_time_code (float): Time code of the first texture.
+        frame_duration (int): Time codes per texture.
+        sublayer_path (str): Optional layer file to author into instead of the edit target.
+
+    Returns:
+        Sdf.Layer: The layer the samples were written to, or None on error.
+    """
+    shader_prim = stage.GetPrimAtPath(shader_path)
+    if not shader_prim.IsValid():
+        print(f"Error: Shader not found at path {shader_path}")
+        return None
+
+    texture_input = UsdShade.Shader(shader_prim).GetInput(texture_type)
+    if not texture_input:
+        print(f"Error: Specified texture input '{texture_type}' not found in Shader.")
+        return None
+
+    attr = texture_input.GetAttr()
+    attr_path = attr.GetPath()
+    type_name = attr.GetTypeName()
+    if not _check_sublayer(stage, [attr], sublayer_path):
+        return None
+    layer = get_animation_layer(stage, sublayer_path)
+
+    with Sdf.ChangeBlock():
+        prim_spec = Sdf.CreatePrimInLayer(layer, attr_path.GetPrimPath())
+        attr_spec = layer.GetAttributeAtPath(attr_path)
+        if not attr_spec:
+            attr_spec = Sdf.AttributeSpec(prim_spec, attr_path.name, type_name)
+        attr_spec.ClearInfo("timeSamples")
+
+        for texture_index, texture_path in enumerate(textures):
+            time_code = start_time_code + texture_index * frame_duration
+            layer.SetTimeSample(attr_path, time_code, Sdf.AssetPath(texture_path))
+
+    if sublayer_path:
+        layer.Save()
+
+    print(f"Authored {len(textures)} time samples on {attr_path} in {layer.identifier}")
+    return layer
+
+
+def author_atlas_time_samples(stage, shader_path, texture_type, atlas, start_time_code, frame_duration,
+                              translate_input, scale_input, sublayer_path=None):
+    """
+    Write an atlas-packed texture sequence as time samples on the shader's UV translation.
+
+    The texture input gets one sample per atlas sheet change, the UV scale a default showing one cell, and
+    the translate input one sample per cell at start_time_code + i * frame_duration. Float2 samples would
+    interpolate between cells, so every sample is followed by a held sample just before the next one.
+
+    Args:
+        stage (Usd.Stage): The stage.
+        shader_path (str): Path to the Shader prim.
+        texture_type (str): Name of the texture input.
+        atlas (Atlas): The packed sequence.
+        start_time_code (float): Time code of the first cell.
+        frame_duration (int): Time codes per cell.
+        translate_input (str): Float2 input offsetting the texture coordinates, e.g. "texture_translate".
+        scale_input (str): Float2 input scaling the texture coordinates, e.g. "texture_scale".
+        sublayer_path (str): Optional layer file to author into instead of the edit target.
+
+    Returns:
+        Sdf.Layer: The layer the samples were written to, or None on error.
+    """
+    shader_prim = stage.GetPrimAtPath(shader_path)
+    if not shader_prim.IsValid():
+        print(f"Error: Shader not found at path {shader_path}")
+        return None
+
+    shader = UsdShade.Shader(shader_prim)
+    texture_input = shader.GetInput(texture_type)
+    if not texture_input:
+        print(f"Error: Specified texture input '{texture_type}' not found in Shader.")
+        return None
+
+    existing_inputs = [shader.GetInput(name) for name in (texture_type, translate_input, scale_input)]
+    if not _check_sublayer(stage, [shader_input.GetAttr() for shader_input in existing_inputs if shader_input],
+                           sublayer_path):
+        return None
+    layer = get_animation_layer(stage, sublayer_path)
+    prim_path = Sdf.Path(shader_path)
+
+    with Sdf.ChangeBlock():
+        prim_spec = Sdf.CreatePrimInLayer(layer, prim_path)
+        specs = {}
+        for input_name, type_name in (
+            (texture_type, texture_input.GetTypeName()),
+            (translate_input, Sdf.ValueTypeNames.Float2),
+            (scale_input, Sdf.ValueTypeNames.Float2),
+        ):
+            attr_path = prim_path.AppendProperty(f"inputs:{input_name}")
+            attr_spec = layer.GetAttributeAtPath(attr_path)
+            if not attr_spec:
+                existing = shader.GetInput(input_name)
+                if existing:
+                    type_name = existing.GetTypeName()
+                attr_spec = Sdf.AttributeSpec(prim_spec, attr_path.name, type_name)
+            attr_spec.ClearInfo("timeSamples")
+            specs[input_name] = attr_path
+
+        layer.GetAttributeAtPath(specs[scale_input]).default = Gf.Vec2f(*atlas.uv_scale)
+        sheet = None
+        for cell_index in range(atlas.cell_count):
+            time_code = start_time_code + cell_index * frame_duration
+            cell_sheet, offset = atlas.cell(cell_index)
+            if cell_sheet != sheet:
+                layer.SetTimeSample(specs[texture_type], time_code, Sdf.AssetPath(cell_sheet))
+                sheet = cell_sheet
+            layer.SetTimeSample(specs[translate_input], time_code, Gf.Vec2f(*offset))
+            if frame_duration > 1 and cell_index + 1 < atlas.cell_count:
+                layer.SetTimeSample(specs[translate_input], time_code + frame_duration - 1, Gf.Vec2f(*offset))
+
+    if sublayer_path:
+        layer.Save()
+
+    print(f"Authored {atlas.cell_count} atlas cells on {prim_path} in {layer.identifier}")
+    return layer
+
+
+def clear_texture_time_samples(stage, shader_path, texture_type, sublayer_path):
+    """Remove the time samples authored into an animation sublayer."""
+    layer = Sdf.Layer.FindOrOpen(sublayer_path)
+    if layer is None:
+        return False
+
+    attr_path = Sdf.Path(shader_path).AppendProperty(f"inputs:{texture_type}")
+    attr_spec = layer.GetAttributeAtPath(attr_path)
+    if not attr_spec:
+        return False
+
+    attr_spec.ClearInfo("timeSamples")
+    layer.Save()
+    return True
@@ -1,9 +1,297 @@
 import argparse
 import ffmpeg
+import hashlib
+import importlib.util
+import json
 import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+EXTENSION_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "exts", "proviz.animate.material", "proviz", "animate", "material"
+)
 
-def images_to_video(image_dir, file_prefix, output_video, framerate):
+
+def load_extension_module(name):
+    """Load one of the extension's Kit-free modules by path; importing the package itself needs Kit."""
+    path = os.path.join(EXTENSION_DIR, f"{name}.py")
+    spec = importlib.util.spec_from_file_location(f"proviz_animate_material_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# H.264 settings for review and post-editing, shared with the extension's streaming output so both paths
+# produce matching videos
+ENCODER_SETTINGS = load_extension_module("encoding").ENCODER_SETTINGS
+
+# Image sequence extensions written by the extension
+IMAGE_EXTENSIONS = ("png", "exr", "jpg", "webp")
+
+# Frames named {prefix}_{frame index, at least four digits}.{extension}
+SEQUENCE_FILE_PATTERN = re.compile(r"^(?P<prefix>.+)_(?P<frame>\d{4,})\.(?P<ext>[A-Za-z]+)$")
+
+# Batch statuses, in report order
+BATCH_STATUSES = ("encoded", "up_to_date", "skipped", "failed")
+
+
+def concat_file_line(path):
+    """Concat demuxer line for a file; the path is single-quoted, so a quote is written as '\\''."""
+    escaped = os.path.abspath(path).replace("'", "'\\''")
+    return f"file '{escaped}'\n"
+
+
+def write_concat_list(concat_path, entries, framerate):
+    """
+    Write an ffconcat list where every image is shown for a number of frames.
+
+    Args:
+        concat_path (str): Destination of the concat list.
+        entries (list): (image_path, duration_frames) tuples in playback order.
+        framerate (int): Frame rate used to turn frame counts into seconds.
+
+    Returns:
+        int: Total number of output frames.
+    """
+    entries = list(entries)
+    total_frames = sum(duration_frames for _, duration_frames in entries)
+
+    # The concat demuxer ignores the duration of the last entry, so a held last image is listed again for its
+    # final frame; a variable frame rate output then still ends exactly on the last held frame.
+    if entries:
+        last_path, last_duration = entries[-1]
+        if last_duration > 1:
+            entries[-1:] = [(last_path, last_duration - 1), (last_path, 1)]
+
+    with open(concat_path, "w") as f:
+        f.write("ffconcat version 1.0\n")
+        for image_path, duration_frames in entries:
+            f.write(concat_file_line(image_path))
+            f.write(f"duration {duration_frames / framerate:.6f}\n")
+    return total_frames
+
+
+def read_duration_manifest(manifest_path):
+    """
+    Read a duration manifest written by the extension's hold mode.
+
+    Returns:
+        list: (image_path, duration_frames) tuples with paths resolved against the manifest directory.
+    """
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    frames = sorted(manifest["frames"], key=lambda frame: frame["frame_index"])
+    return [(os.path.join(base_dir, frame["file"]), frame["duration_frames"]) for frame in frames]
+
+
+def parse_rendition(value):
+    """
+    Parse a rendition argument of the form 'WIDTHxHEIGHT:path.mp4'.
+
+    Returns:
+        tuple: (output path, (width, height))
+    """
+    size, _, path = value.partition(":")
+    try:
+        width, height = (int(part) for part in size.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid rendition '{value}', expected WIDTHxHEIGHT:path.mp4")
+    if not path:
+        raise argparse.ArgumentTypeError(f"Rendition '{value}' has no output path")
+    return path, (width, height)
+
+
+def build_outputs(video_input, outputs, framerate, vfr=False, **extra_settings):
+    """
+    Encode one decoded input into several outputs.
+
+    The input is decoded once and split; every output is scaled to its own size if one is given.
+
+    Args:
+        video_input: ffmpeg-python input stream.
+        outputs (list): (output path, (width, height) or None) tuples.
+        framerate (int): Output frame rate.
+        vfr (bool): Keep the input timestamps instead of a constant frame rate, so held images are encoded
+            once instead of being duplicated up to the frame rate.
+        extra_settings: Additional ffmpeg output options applied to every output.
+    """
+    rate_settings = {"fps_mode": "vfr"} if vfr else {"r": framerate}
+    if len(outputs) == 1:
+        streams = [video_input]
+    else:
+        split = video_input.filter_multi_output("split", len(outputs))
+        streams = [split.stream(index) for index in range(len(outputs))]
+
+    encoded = []
+    for stream, (output_path, size) in zip(streams, outputs):
+        if size:
+            stream = stream.filter("scale", size[0], size[1], flags="lanczos")
+        encoded.append(stream.output(
+            output_path,
+            an=None,                 # Disable audio stream
+            **rate_settings,         # Constant or variable frame rate
+            **ENCODER_SETTINGS,
+            **extra_settings
+        ))
+    return ffmpeg.merge_outputs(*encoded)
+
+
+def hash_file(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def collapse_duplicate_frames(image_paths, workers=None):
+    """
+    Merge runs of identical consecutive images into (image_path, duration_frames) entries.
+
+    Frames are compared by file contents. Hardlinked frames (hold mode) are duplicates without being read,
+    frames of different sizes are never compared, and only the remaining candidates are hashed, in a
+    thread pool.
+
+    Args:
+        image_paths (list): Image files in playback order.
+        workers (int): Hashing threads, defaults to the CPU count.
+
+    Returns:
+        list: (image_path, duration_frames) tuples.
+    """
+    stats = [os.stat(path) for path in image_paths]
+
+    def same_file(a, b):
+        return (stats[a].st_dev, stats[a].st_ino) == (stats[b].st_dev, stats[b].st_ino)
+
+    def may_match(a, b):
+        return stats[a].st_size == stats[b].st_size and not same_file(a, b)
+
+    count = len(image_paths)
+    candidates = [
+        index for index in range(count)
+        if (index > 0 and may_match(index - 1, index)) or (index + 1 < count and may_match(index, index + 1))
+    ]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        hashes = dict(zip(candidates, executor.map(hash_file, (image_paths[index] for index in candidates))))
+
+    entries = []
+    for index, image_path in enumerate(image_paths):
+        if index > 0 and (same_file(index - 1, index) or (
+                may_match(index - 1, index) and hashes[index - 1] == hashes[index])):
+            entries[-1][1] += 1
+        else:
+            entries.append([image_path, 1])
+    return [tuple(entry) for entry in entries]
+
+
+def count_sequence_frames(image_dir, file_prefix, image_ext="png"):
+    """Count the consecutive frames {file_prefix}_0000.{image_ext}, {file_prefix}_0001.{image_ext}, ..."""
+    names = {entry.name for entry in os.scandir(image_dir)}
+    count = 0
+    while f"{file_prefix}_{count:04d}.{image_ext}" in names:
+        count += 1
+    return count
+
+
+def plan_segments(frame_count, segments, gop):
+    """
+    Split a frame range into GOP-aligned (start, count) segments.
+
+    Every segment except the last is a whole number of GOPs, so keyframes land where a single encode would put them.
+    """
+    gops = -(-frame_count // gop)
+    gops_per_segment = max(1, -(-gops // max(1, segments)))
+    segment_frames = gops_per_segment * gop
+    return [(start, min(segment_frames, frame_count - start)) for start in range(0, frame_count, segment_frames)]
+
+
+def encode_segment(input_pattern, framerate, start, count, gop, outputs):
+    """Encode one segment of an image sequence into every output; runs in a worker process."""
+    video_input = ffmpeg.input(input_pattern, framerate=framerate, start_number=start)
+    gop_settings = {
+        "frames:v": count,
+        "g": gop,
+        "x264-params": f"keyint={gop}:min-keyint={gop}:scenecut=0",
+    }
+    build_outputs(video_input, outputs, framerate, **gop_settings).run(overwrite_output=True, quiet=True)
+    return start
+
+
+def images_to_video_segmented(image_dir, file_prefix, output_video, framerate, segments, gop=None, workers=None,
+                              renditions=None, image_ext="png"):
+    """
+    Encode an image sequence as GOP-aligned segments in a process pool and join them losslessly.
+
+    Args:
+        image_dir (str): Directory containing the images.
+        file_prefix (str): Prefix of the image files.
+        output_video (str): Path for the full resolution output video.
+        framerate (int): Frame rate for the video.
+        segments (int): Number of segments to split the sequence into.
+        gop (int): Keyframe interval in frames, defaults to two seconds.
+        workers (int): Encoder processes running at once, defaults to the CPU count.
+        renditions (list): Extra (output path, (width, height)) outputs encoded from the same decode.
+        image_ext (str): Extension of the image files, matching the extension's image format.
+    """
+    if not os.path.exists(image_dir):
+        print(f"Error: Image directory '{image_dir}' does not exist.")
+        return
+
+    frame_count = count_sequence_frames(image_dir, file_prefix, image_ext)
+    if frame_count == 0:
+        print(f"Error: No frames named '{file_prefix}_0000.{image_ext}' onwards found in '{image_dir}'.")
+        return
+
+    gop = gop or framerate * 2
+    outputs = [(output_video, None)] + list(renditions or [])
+    plan = plan_segments(frame_count, segments, gop)
+    input_pattern = f"{image_dir}/{file_prefix}_%04d.{image_ext}"
+    work_dir = tempfile.mkdtemp(prefix=f"{file_prefix}_segments_", dir=os.path.dirname(os.path.abspath(output_video)))
+    print(f"Encoding {frame_count} frames as {len(plan)} segments of up to {plan[0][1]} frames")
+
+    try:
+        segment_outputs = []
+        for index in range(len(plan)):
+            segment_outputs.append([
+                (os.path.join(work_dir, f"{index:04d}_{output_index}.mp4"), size)
+                for output_index, (_, size) in enumerate(outputs)
+            ])
+
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            futures = [
+                executor.submit(encode_segment, input_pattern, framerate, start, count, gop, segment_outputs[index])
+                for index, (start, count) in enumerate(plan)
+            ]
+            for future in futures:
+                future.result()
+
+        # Join each output's segments without re-encoding
+        for output_index, (output_path, _) in enumerate(outputs):
+            list_path = os.path.join(work_dir, f"concat_{output_index}.txt")
+            with open(list_path, "w") as f:
+                for paths in segment_outputs:
+                    f.write(concat_file_line(paths[output_index][0]))
+            (
+                ffmpeg
+                .input(list_path, format="concat", safe=0)
+                .output(output_path, c="copy")
+                .run(overwrite_output=True, quiet=True)
+            )
+            print(f"Video saved to {output_path}")
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode("utf-8", errors="replace") if e.stderr else ""
+        print(f"Error during video generation: {str(e)} {stderr}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def images_to_video(image_dir, file_prefix, output_video, framerate, duration_manifest=None, renditions=None,
+                    image_ext="png", dedupe=False, vfr=None, hash_workers=None):
     """
     Convert images with a specific prefix to a video using ffmpeg, optimized for post-editing.
 
@@ -12,49 +300,393 @@ def images_to_video(image_dir, file_prefix, output_video, framerate):
         file_prefix (str): Prefix of the image files (e.g., 'frame').
         output_video (str): Path for the output video file (e.g., 'output.mp4').
         framerate (int): Frame rate for the video.
+        duration_manifest (str): Optional duration manifest; only the listed frames are decoded,
+            each held for its recorded number of frames.
+        renditions (list): Extra (output path, (width, height)) outputs encoded from the same decode.
+        image_ext (str): Extension of the image files, e.g. 'png', 'exr', 'jpg' or 'webp'. Frames listed in
+            a duration manifest keep their recorded file names.
+        dedupe (bool): Collapse runs of identical consecutive images and decode each run once.
+        vfr (bool): Encode with a variable frame rate so each held image is encoded once. Defaults to True
+            with dedupe and False otherwise.
+        hash_workers (int): Threads hashing frames for dedupe, defaults to the CPU count.
     """
-    input_pattern = f"{image_dir}/{file_prefix}_%04d.png"
+    input_pattern = f"{image_dir}/{file_prefix}_%04d.{image_ext}"
 
     if not os.path.exists(image_dir):
         print(f"Error: Image directory '{image_dir}' does not exist.")
         return
 
+    if vfr is None:
+        vfr = dedupe
+
+    entries = None
+    if duration_manifest:
+        if not os.path.isfile(duration_manifest):
+            print(f"Error: Duration manifest '{duration_manifest}' does not exist.")
+            return
+        entries = read_duration_manifest(duration_manifest)
+    elif dedupe:
+        frame_count = count_sequence_frames(image_dir, file_prefix, image_ext)
+        if frame_count == 0:
+            print(f"Error: No frames named '{file_prefix}_0000.{image_ext}' onwards found in '{image_dir}'.")
+            return
+        image_paths = [
+            os.path.join(image_dir, f"{file_prefix}_{index:04d}.{image_ext}") for index in range(frame_count)
+        ]
+        entries = collapse_duplicate_frames(image_paths, hash_workers)
+        print(f"Collapsed {frame_count} frames into {len(entries)} unique images "
+              f"({1 - len(entries) / frame_count:.0%} duplicates)")
+
+    concat_path = None
+    extra_settings = {}
+    if entries:
+        concat_path = os.path.join(image_dir, f"{file_prefix}_concat.txt")
+        total_frames = write_concat_list(concat_path, entries, framerate)
+        if not vfr:
+            # The repeated last entry would add a frame at a constant rate; trim to the exact length
+            extra_settings["frames:v"] = total_frames
+        video_input = ffmpeg.input(concat_path, format="concat", safe=0)
+    else:
+        video_input = ffmpeg.input(input_pattern, framerate=framerate)
+
+    outputs = [(output_video, None)] + list(renditions or [])
+
+    try:
+        build_outputs(video_input, outputs, framerate, vfr, **extra_settings).run(overwrite_output=True)
+        for output_path, _ in outputs:
+            print(f"Video saved to {output_path}")
+    except ffmpeg.Error as e:
+        print(f"Error during video generation: {str(e)}")
+    finally:
+        if concat_path and os.path.exists(concat_path):
+            os.remove(concat_path)
+
+
+def find_gaps(frames):
+    """
+    Find the missing frame numbers of a sorted list of frame numbers.
+
+    Returns:
+        list: [first missing, last missing] ranges.
+    """
+    gaps = []
+    for previous, current in zip(frames, frames[1:]):
+        if current - previous > 1:
+            gaps.append([previous + 1, current - 1])
+    return gaps
+
+
+def discover_sequences(root, image_exts=IMAGE_EXTENSIONS):
+    """
+    Find every image sequence under a directory tree.
+
+    A sequence is the set of files {prefix}_{frame}.{ext} sharing a directory, prefix and extension. Frames
+    may start anywhere (e.g. a render farm shard) and may have gaps.
+
+    Args:
+        root (str): Directory to search recursively.
+        image_exts (tuple): Lower case extensions to accept.
+
+    Returns:
+        list: Sequence dicts with "image_dir", "file_prefix", "image_ext", "frames" (sorted frame numbers),
+            "digits", "first", "last" and "gaps", ordered by directory and prefix.
+    """
+    groups = {}
+    for image_dir, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        for name in file_names:
+            match = SEQUENCE_FILE_PATTERN.match(name)
+            if not match or match["ext"].lower() not in image_exts:
+                continue
+            key = (image_dir, match["prefix"], match["ext"])
+            group = groups.setdefault(key, {"frames": [], "digits": len(match["frame"])})
+            group["frames"].append(int(match["frame"]))
+            group["digits"] = min(group["digits"], len(match["frame"]))
+
+    sequences = []
+    for (image_dir, file_prefix, image_ext), group in sorted(groups.items()):
+        frames = sorted(group["frames"])
+        sequences.append({
+            "image_dir": image_dir,
+            "file_prefix": file_prefix,
+            "image_ext": image_ext,
+            "frames": frames,
+            "digits": group["digits"],
+            "first": frames[0],
+            "last": frames[-1],
+            "gaps": find_gaps(frames),
+        })
+    return sequences
+
+
+def sequence_frame_path(sequence, frame):
+    return os.path.join(
+        sequence["image_dir"], f"{sequence['file_prefix']}_{frame:0{sequence['digits']}d}.{sequence['image_ext']}"
+    )
+
+
+def sequence_entries(sequence):
+    """
+    List a sequence as (image_path, duration_frames) entries, each frame held until the next existing one.
+
+    Missing frames therefore repeat the previous frame and the video keeps its full length.
+    """
+    frames = sequence["frames"]
+    return [
+        (sequence_frame_path(sequence, frame), next_frame - frame)
+        for frame, next_frame in zip(frames, frames[1:] + [frames[-1] + 1])
+    ]
+
+
+def is_up_to_date(output_video, image_paths):
+    """Check whether output_video exists and is newer than every image it was encoded from."""
+    try:
+        output_mtime = os.stat(output_video).st_mtime_ns
+    except OSError:
+        return False
+    return all(os.stat(path).st_mtime_ns <= output_mtime for path in image_paths)
+
+
+def encode_sequence(sequence, output_video, framerate, dedupe=False, vfr=None, threads=None):
+    """
+    Encode one discovered sequence; runs in a worker process of batch_encode().
+
+    The video is written under a temporary name and renamed into place once complete, so an interrupted
+    encode never looks up to date.
+
+    Returns:
+        dict: The sequence's report entry with "output", "status", "seconds" and, on failure, "error".
+    """
+    start = time.perf_counter()
+    result = {key: value for key, value in sequence.items() if key != "frames"}
+    result.update({"frame_count": len(sequence["frames"]), "output": output_video})
+    if vfr is None:
+        vfr = dedupe
+
+    entries = sequence_entries(sequence)
+    work_dir = tempfile.mkdtemp(prefix=f"{sequence['file_prefix']}_batch_", dir=os.path.dirname(output_video))
+    partial_video = os.path.join(work_dir, os.path.basename(output_video))
+    extra_settings = {"threads": threads} if threads else {}
     try:
-        (
-            ffmpeg
-            .input(input_pattern, framerate=framerate)
-            .output(
-                output_video,
-                vcodec="libx264",         # H.264 codec for compatibility
-                crf=18,                  # High-quality compression
-                preset="slow",           # Balanced encoding speed
-                pix_fmt="yuv420p",       # Ensure compatibility
-                r=framerate,             # Set frame rate
-                maxrate="15M",           # Max video bitrate
-                bufsize="30M",           # Buffer size for bitrate control
-                an=None                  # Disable audio stream
+        if dedupe:
+            collapsed = collapse_duplicate_frames([path for path, _ in entries], threads)
+            merged, index = [], 0
+            for image_path, count in collapsed:
+                merged.append((image_path, sum(duration for _, duration in entries[index:index + count])))
+                index += count
+            entries = merged
+
+        if not dedupe and not sequence["gaps"]:
+            input_pattern = os.path.join(
+                sequence["image_dir"], f"{sequence['file_prefix']}_%0{sequence['digits']}d.{sequence['image_ext']}"
             )
-            .run(overwrite_output=True)
+            video_input = ffmpeg.input(input_pattern, framerate=framerate, start_number=sequence["first"])
+        else:
+            concat_path = os.path.join(work_dir, "concat.txt")
+            total_frames = write_concat_list(concat_path, entries, framerate)
+            if not vfr:
+                extra_settings["frames:v"] = total_frames
+            video_input = ffmpeg.input(concat_path, format="concat", safe=0)
+
+        build_outputs(video_input, [(partial_video, None)], framerate, vfr, **extra_settings).run(
+            overwrite_output=True, quiet=True
         )
-        print(f"Video saved to {output_video}")
+        os.replace(partial_video, output_video)
+        result["status"] = "encoded"
+        result["unique_images"] = len(entries)
     except ffmpeg.Error as e:
-        print(f"Error during video generation: {str(e)}")
+        stderr = e.stderr.decode("utf-8", errors="replace") if e.stderr else ""
+        result["status"] = "failed"
+        result["error"] = stderr.strip().splitlines()[-1] if stderr.strip() else str(e)
+    except OSError as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def batch_output_path(root, output_dir, sequence):
+    """Output video of a sequence: {prefix}.mp4 in the same relative directory under output_dir."""
+    relative_dir = os.path.relpath(sequence["image_dir"], root)
+    return os.path.normpath(os.path.join(output_dir, relative_dir, f"{sequence['file_prefix']}.mp4"))
+
+
+def batch_encode(root, output_dir=None, framerate=24, workers=None, image_exts=IMAGE_EXTENSIONS, dedupe=False,
+                 vfr=None, force=False, skip_gaps=False, report_path=None):
+    """
+    Discover every image sequence under root and encode them concurrently.
+
+    Each sequence is encoded by one ffmpeg process; at most `workers` run at once and the cores are split
+    between them through x264's thread count. Sequences whose video is newer than all of their frames are
+    skipped. Gaps in a sequence are reported and, unless skip_gaps is set, filled by holding the previous frame.
+
+    Args:
+        root (str): Directory searched recursively for sequences.
+        output_dir (str): Where videos are written, mirroring the directories under root. Defaults to root,
+            i.e. each video is written next to its frames.
+        framerate (int): Frame rate of the videos.
+        workers (int): Sequences encoded at once, defaults to the CPU count.
+        image_exts (tuple): Image extensions to look for.
+        dedupe (bool): Collapse identical consecutive frames (see images_to_video()).
+        vfr (bool): Variable frame rate output, defaults to dedupe.
+        force (bool): Re-encode sequences whose video is up to date.
+        skip_gaps (bool): Do not encode sequences with missing frames.
+        report_path (str): Summary report, defaults to root/encode_report.json.
+
+    Returns:
+        dict: The report, also written to report_path.
+    """
+    start = time.perf_counter()
+    root = os.path.abspath(root)
+    output_dir = os.path.abspath(output_dir or root)
+    report_path = report_path or os.path.join(root, "encode_report.json")
+    sequences = discover_sequences(root, image_exts)
+    print(f"Found {len(sequences)} sequences under {root}")
+
+    results = []
+    pending = []
+    for sequence in sequences:
+        output_video = batch_output_path(root, output_dir, sequence)
+        result = {key: value for key, value in sequence.items() if key != "frames"}
+        result.update({"frame_count": len(sequence["frames"]), "output": output_video})
+        label = os.path.join(os.path.relpath(sequence["image_dir"], root), sequence["file_prefix"])
+        if sequence["gaps"]:
+            missing = sum(last - first + 1 for first, last in sequence["gaps"])
+            print(f"Warning: {label} is missing {missing} frames: "
+                  + ", ".join(f"{first}-{last}" if last > first else f"{first}" for first, last in sequence["gaps"]))
+        if sequence["gaps"] and skip_gaps:
+            result["status"] = "skipped"
+        elif not force and is_up_to_date(output_video, [path for path, _ in sequence_entries(sequence)]):
+            result["status"] = "up_to_date"
+        else:
+            os.makedirs(os.path.dirname(output_video), exist_ok=True)
+            pending.append((sequence, output_video))
+            continue
+        results.append(result)
+
+    if pending:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        print(f"Encoding {len(pending)} sequences, {workers} at a time with {threads} threads each")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(encode_sequence, sequence, output_video, framerate, dedupe, vfr, threads)
+                for sequence, output_video in pending
+            ]
+            for future in futures:
+                result = future.result()
+                print(f"  {result['status']}: {result['output']} ({result['frame_count']} frames, "
+                      f"{result['seconds']:.1f}s){' - ' + result['error'] if result.get('error') else ''}")
+                results.append(result)
+
+    results.sort(key=lambda result: (result["image_dir"], result["file_prefix"], result["image_ext"]))
+    counts = {status: sum(1 for result in results if result["status"] == status) for status in BATCH_STATUSES}
+    report = {
+        "root": root,
+        "output_dir": output_dir,
+        "elapsed": round(time.perf_counter() - start, 3),
+        "sequences": len(results),
+        "with_gaps": sum(1 for result in results if result["gaps"]),
+        **counts,
+        "results": results,
+    }
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(", ".join(f"{counts[status]} {status}" for status in BATCH_STATUSES)
+          + f", {report['with_gaps']} with gaps in {report['elapsed']:.1f}s. Report: {report_path}")
+    return report
 
 
 def main():
     parser = argparse.ArgumentParser(description="Convert a sequence of images to a video.")
-    parser.add_argument("--image_dir", type=str, required=True, help="Directory containing the image sequence.")
-    parser.add_argument("--file_prefix", type=str, required=True, help="Prefix of the image files (e.g., 'frame').")
-    parser.add_argument("--output_video", type=str, required=True, help="Path to the output video file (e.g., 'output.mp4').")
+    parser.add_argument("--image_dir", type=str, default=None, help="Directory containing the image sequence.")
+    parser.add_argument("--file_prefix", type=str, default=None, help="Prefix of the image files (e.g., 'frame').")
+    parser.add_argument("--output_video", type=str, default=None, help="Path to the output video file (e.g., 'output.mp4').")
     parser.add_argument("--framerate", type=int, default=24, help="Frame rate of the output video (default: 24).")
+    parser.add_argument("--duration_manifest", type=str, default=None,
+                        help="Duration manifest written by hold mode (e.g., 'frame_durations.json').")
+    parser.add_argument("--rendition", type=parse_rendition, action="append", default=[],
+                        help="Extra output from the same decode, as WIDTHxHEIGHT:path.mp4 (repeatable).")
+    parser.add_argument("--segments", type=int, default=1,
+                        help="Encode the sequence as this many GOP-aligned segments in parallel (default: 1).")
+    parser.add_argument("--gop", type=int, default=None,
+                        help="Keyframe interval for segmented encoding (default: two seconds).")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Encoder processes for segmented encoding (default: CPU count).")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Collapse identical consecutive frames and encode each held image once.")
+    parser.add_argument("--cfr", action="store_true",
+                        help="Keep a constant frame rate with --dedupe; held images are encoded once per frame.")
+    parser.add_argument("--hash_workers", type=int, default=None,
+                        help="Threads hashing frames for --dedupe (default: CPU count).")
+    parser.add_argument("--image_ext", type=str, default=None, choices=IMAGE_EXTENSIONS,
+                        help="Extension of the image files, matching the extension's image format "
+                             "(default: png, or every extension with --batch_root).")
+
+    parser.add_argument("--batch_root", type=str, default=None,
+                        help="Encode every image sequence found under this directory instead of one sequence.")
+    parser.add_argument("--batch_output_dir", type=str, default=None,
+                        help="Where batch videos are written, mirroring the batch root (default: next to the frames).")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-encode batch sequences whose video is newer than their frames.")
+    parser.add_argument("--skip_gaps", action="store_true",
+                        help="Do not encode batch sequences with missing frames (default: hold the previous frame).")
+    parser.add_argument("--report", type=str, default=None,
+                        help="Batch summary report (default: encode_report.json in the batch root).")
 
     args = parser.parse_args()
 
+    if args.batch_root:
+        if args.segments > 1 or args.duration_manifest or args.rendition:
+            parser.error("--batch_root cannot be combined with --segments, --duration_manifest or --rendition.")
+        batch_encode(
+            root=args.batch_root,
+            output_dir=args.batch_output_dir,
+            framerate=args.framerate,
+            workers=args.workers,
+            image_exts=(args.image_ext,) if args.image_ext else IMAGE_EXTENSIONS,
+            dedupe=args.dedupe,
+            vfr=args.dedupe and not args.cfr,
+            force=args.force,
+            skip_gaps=args.skip_gaps,
+            report_path=args.report,
+        )
+        return
+
+    if not (args.image_dir and args.file_prefix and args.output_video):
+        parser.error("--image_dir, --file_prefix and --output_video are required without --batch_root.")
+
+    if args.segments > 1:
+        if args.duration_manifest or args.dedupe:
+            parser.error("--segments cannot be combined with --duration_manifest or --dedupe.")
+        images_to_video_segmented(
+            image_dir=args.image_dir,
+            file_prefix=args.file_prefix,
+            output_video=args.output_video,
+            framerate=args.framerate,
+            segments=args.segments,
+            gop=args.gop,
+            workers=args.workers,
+            renditions=args.rendition,
+            image_ext=args.image_ext or "png",
+        )
+        return
+
     images_to_video(
         image_dir=args.image_dir,
         file_prefix=args.file_prefix,
         output_video=args.output_video,
         framerate=args.framerate,
+        duration_manifest=args.duration_manifest,
+        renditions=args.rendition,
+        image_ext=args.image_ext or "png",
+        dedupe=args.dedupe,
+        vfr=args.dedupe and not args.cfr,
+        hash_workers=args.hash_workers,
     )
 
 
@@ -0,0 +1,432 @@
+import argparse
+import importlib.util
+import json
+import os
+import re
+import shlex
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+EXTENSION_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "exts", "proviz.animate.material", "proviz", "animate", "material"
+)
+
+
+def load_extension_module(name):
+    """Load one of the extension's Kit-free modules by path; importing the package itself needs Kit."""
+    path = os.path.join(EXTENSION_DIR, f"{name}.py")
+    spec = importlib.util.spec_from_file_location(f"proviz_animate_material_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Job files, textures, frame ranges and render qualities are handled exactly as the workers handle them
+jobs = load_extension_module("jobs")
+texture_scanner = load_extension_module("texture_scanner")
+render_quality = load_extension_module("render_quality")
+
+# Output modes that stream to a video; each shard streams its own segment, joined once every shard is done
+STREAM_OUTPUT_MODES = ("stream", "png+stream")
+
+DEFAULT_WORKER_CMD = (
+    "{kit} --no-window --ext-folder {ext_folder} --enable proviz.animate.material "
+    "--/exts/proviz.animate.material/batch_file={job_file}"
+)
+
+
+def count_textures(animation_folder):
+    """Count the textures a worker will find in the animation folder."""
+    return len(texture_scanner.scan_textures(animation_folder, use_cache=False))
+
+
+def stream_output_for(job):
+    """Video a streaming job writes, placed the way the extension places it (in the draft tree for drafts)."""
+    path = job.get("stream_output") or os.path.join(job["output_dir"], f"{job.get('output_prefix', 'frame')}.mp4")
+    if job.get("render_quality") == "draft":
+        path = os.path.join(render_quality.draft_output_dir(job), os.path.basename(path))
+    return path
+
+
+def segment_path(job, shard_name):
+    """The video segment a shard of a streaming job writes, next to the job's video."""
+    stem, ext = os.path.splitext(job.get("stream_output") or os.path.join(
+        job["output_dir"], f"{job.get('output_prefix', 'frame')}.mp4"
+    ))
+    return f"{stem}_{shard_name}{ext}"
+
+
+def concat_segments(segments, output_video, ffmpeg_path="ffmpeg"):
+    """
+    Join the shards' video segments without re-encoding; they were all streamed with the same settings.
+
+    Returns:
+        bool: True if the video was written.
+    """
+    list_path = os.path.splitext(output_video)[0] + "_segments.txt"
+    with open(list_path, "w") as f:
+        for segment in segments:
+            # The concat demuxer reads single-quoted paths; a quote is written as '\''
+            escaped = os.path.abspath(segment).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    command = [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-y", "-f", "concat", "-safe", "0",
+               "-i", list_path, "-c", "copy", output_video]
+    try:
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except OSError as e:
+        print(f"Error: Could not start ffmpeg ('{ffmpeg_path}'): {e}")
+        return False
+    finally:
+        os.remove(list_path)
+    if result.returncode != 0:
+        print(f"Error: Joining the segments into {output_video} failed: "
+              f"{result.stderr.decode('utf-8', errors='replace').strip()}")
+        return False
+    return True
+
+
+def approved_frames_for(job):
+    """
+    Frames a job renders: its "approved_frames", or for a promote job the draft's approvals file.
+
+    Returns:
+        list: Sorted frame indices, or None when every frame is rendered.
+    """
+    approved = job.get("approved_frames")
+    if approved not in (None, "", []):
+        return render_quality.parse_frame_ranges(approved)
+    if job.get("render_quality") != "promote":
+        return None
+    path = render_quality.approvals_path(render_quality.draft_output_dir(job), job.get("output_prefix", "frame"))
+    return render_quality.load_approved_frames(path)
+
+
+def plan_shards(texture_count, shard_count):
+    """
+    Split a sequence into contiguous texture ranges of nearly equal size.
+
+    Returns:
+        list: (texture_start, texture_end) tuples, end exclusive. Empty ranges are dropped.
+    """
+    shard_count = max(1, min(shard_count, texture_count))
+    base, extra = divmod(texture_count, shard_count)
+    shards = []
+    start = 0
+    for index in range(shard_count):
+        end = start + base + (1 if index < extra else 0)
+        if end > start:
+            shards.append((start, end))
+        start = end
+    return shards
+
+
+def expected_frames(texture_start, texture_end, frame_duration):
+    return range(texture_start * frame_duration, texture_end * frame_duration)
+
+
+def missing_frames(manifest_path, texture_start, texture_end, frame_duration, approved_frames=None):
+    """Return the frames of a shard, or its approved frames, that its completion manifest does not report."""
+    expected = expected_frames(texture_start, texture_end, frame_duration)
+    if approved_frames is not None:
+        expected = [frame for frame in expected if frame in approved_frames]
+    try:
+        with open(manifest_path) as f:
+            completed = set(json.load(f)["completed_frames"])
+    except (OSError, ValueError, KeyError):
+        return list(expected)
+    return [frame for frame in expected if frame not in completed]
+
+
+def write_shard_job(settings, job, shard_dir, shard_name, texture_start, texture_end, stream_output=None):
+    """
+    Write the job file a single worker runs.
+
+    The job's inputs are written complete and with resolved paths, as jobs.load_job_file() returns them, so
+    the worker does not resolve anything against the shard directory.
+
+    A streaming shard writes the video segment stream_output instead of the job's video.
+
+    Returns:
+        tuple: (job file path, completion manifest path)
+    """
+    job_file = os.path.join(shard_dir, f"{shard_name}.json")
+    manifest_path = os.path.join(shard_dir, f"{shard_name}_completed.json")
+    shard_job = dict(job)
+    shard_job.update({
+        "name": shard_name,
+        "texture_start": texture_start,
+        "texture_end": texture_end,
+        "completion_manifest": manifest_path,
+        "metrics_file": os.path.join(shard_dir, f"{shard_name}_metrics.jsonl"),
+    })
+    if stream_output:
+        shard_job["stream_output"] = stream_output
+    shard_spec = {"quit_on_finish": True, "jobs": [shard_job]}
+    for key in ("stage", "warmup_frames"):
+        if settings.get(key):
+            shard_spec[key] = settings[key]
+    with open(job_file, "w") as f:
+        json.dump(shard_spec, f, indent=2)
+    return job_file, manifest_path
+
+
+def run_shard(shard, worker_cmd, retries, timeout):
+    """
+    Run one shard's worker, retrying until every frame of its range is reported as written.
+
+    Args:
+        shard (dict): Shard description; updated in place with attempts, status and missing_frames.
+        worker_cmd (str): Command template, "{job_file}" is replaced by the shard's job file.
+        retries (int): Extra attempts after the first failure.
+        timeout (float): Seconds before a worker is killed, or None.
+    """
+    command = shlex.split(worker_cmd.format(job_file=shard["job_file"]))
+    log_path = os.path.splitext(shard["job_file"])[0] + ".log"
+
+    for attempt in range(1, retries + 2):
+        shard["attempts"] = attempt
+        # Only trust a manifest written by this attempt
+        if os.path.exists(shard["manifest"]):
+            os.remove(shard["manifest"])
+        started = time.time()
+        with open(log_path, "a") as log:
+            log.write(f"--- attempt {attempt}: {' '.join(command)}\n")
+            log.flush()
+            try:
+                returncode = subprocess.run(command, stdout=log, stderr=subprocess.STDOUT, timeout=timeout).returncode
+            except subprocess.TimeoutExpired:
+                returncode = "timeout"
+            except OSError as e:
+                log.write(f"Failed to start worker: {e}\n")
+                returncode = "not started"
+
+        shard["missing_frames"] = missing_frames(
+            shard["manifest"], shard["texture_start"], shard["texture_end"], shard["frame_duration"],
+            shard["approved_frames"],
+        )
+        elapsed = time.time() - started
+        if returncode == 0 and not shard["missing_frames"]:
+            shard["status"] = "completed"
+            print(f"{shard['name']}: completed in {elapsed:.1f}s (attempt {attempt})")
+            return shard
+
+        print(
+            f"{shard['name']}: attempt {attempt} failed (exit {returncode}, "
+            f"{len(shard['missing_frames'])} frames missing), see {log_path}"
+        )
+
+    shard["status"] = "failed"
+    return shard
+
+
+def run_farm(job_file, shard_count, workers, retries=1, worker_cmd=None, shard_dir=None, timeout=None,
+             kit="app/kit/kit", ext_folder="exts", quality=None):
+    """
+    Render every job of a job file as contiguous texture shards in separate worker processes.
+
+    Args:
+        job_file (str): JSON or TOML job file for the extension's batch runner.
+        shard_count (int): Number of shards per job.
+        workers (int): Number of worker processes running at once.
+        retries (int): Extra attempts per failed shard.
+        worker_cmd (str): Worker command template with a "{job_file}" placeholder. Defaults to a headless Kit.
+        shard_dir (str): Where shard job files, logs and manifests are written.
+        timeout (float): Seconds before a worker is killed.
+        kit (str): Kit executable used by the default worker command.
+        ext_folder (str): Extension search folder used by the default worker command.
+        quality (str): Overrides every job's render_quality, so the same job file renders drafts for review
+            and then promotes the approved frames.
+
+    Returns:
+        list: One merged farm manifest dict per job.
+
+    Raises:
+        JobSpecError: If the job file is invalid (see jobs.load_job_file).
+    """
+    settings, job_inputs = jobs.load_job_file(job_file)
+    base_dir = os.path.dirname(os.path.abspath(job_file))
+    if worker_cmd is None:
+        worker_cmd = DEFAULT_WORKER_CMD.format(
+            kit=os.path.abspath(kit), ext_folder=os.path.abspath(ext_folder), job_file="{job_file}"
+        )
+    shard_dir = os.path.abspath(shard_dir or os.path.join(base_dir, "shards"))
+    os.makedirs(shard_dir, exist_ok=True)
+
+    reports = []
+    for job in job_inputs:
+        if quality:
+            job["render_quality"] = quality
+        frame_duration = job["frame_duration"]
+        job_name = job["name"]
+        # Unnamed jobs are named "folder:texture_type"; shard files are named after the job
+        file_stem = re.sub(r"[^\w.-]+", "_", job_name)
+        streaming = job.get("output_mode", "png") in STREAM_OUTPUT_MODES
+
+        # All bindings advance in lockstep, so the sequence is as long as the longest folder
+        folders = [job["animation_folder"]] if job.get("animation_folder") else []
+        folders += [binding["animation_folder"] for binding in job["bindings"]]
+        texture_count = max((count_textures(folder) for folder in folders), default=0)
+        if texture_count == 0:
+            print(f"Error: No valid texture files found for '{job_name}'.")
+            continue
+
+        texture_ranges = plan_shards(texture_count, shard_count)
+        try:
+            approved_frames = approved_frames_for(job)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not read the approved frames of '{job_name}': {e}")
+            continue
+        if approved_frames is not None and streaming:
+            print(f"Error: '{job_name}' renders approved frames only, which cannot be streamed to a video. "
+                  "Use the png output mode.")
+            continue
+        if approved_frames is not None:
+            # Shard the textures holding approved frames; workers render only those frames
+            approved_frames = [frame for frame in approved_frames if frame < texture_count * frame_duration]
+            textures = sorted({frame // frame_duration for frame in approved_frames})
+            if not textures:
+                print(f"Error: No approved frames of '{job_name}' are within its {texture_count} textures.")
+                continue
+            job["approved_frames"] = approved_frames
+            texture_ranges = [
+                (textures[start], textures[end - 1] + 1) for start, end in plan_shards(len(textures), shard_count)
+            ]
+
+        shards = []
+        for shard_index, (texture_start, texture_end) in enumerate(texture_ranges):
+            shard_name = f"{file_stem}_shard{shard_index:03d}"
+            segment = segment_path(job, shard_name) if streaming else None
+            shard_job_file, manifest_path = write_shard_job(
+                settings, job, shard_dir, shard_name, texture_start, texture_end, segment
+            )
+            shards.append({
+                "name": shard_name,
+                "job_file": shard_job_file,
+                "manifest": manifest_path,
+                "metrics": os.path.join(shard_dir, f"{shard_name}_metrics.jsonl"),
+                "texture_start": texture_start,
+                "texture_end": texture_end,
+                "frame_duration": frame_duration,
+                "approved_frames": None if approved_frames is None else set(approved_frames),
+                "segment": stream_output_for(dict(job, stream_output=segment)) if streaming else None,
+                "attempts": 0,
+                "status": "pending",
+                "missing_frames": [],
+            })
+
+        print(f"{job_name}: {texture_count} textures in {len(shards)} shards on {workers} workers")
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            list(executor.map(lambda shard: run_shard(shard, worker_cmd, retries, timeout), shards))
+
+        report = merge_manifests(job, job_name, texture_count, frame_duration, shards, approved_frames)
+        reports.append(report)
+
+    return reports
+
+
+def read_metrics_summary(path):
+    """Return the summary event a worker writes at the end of its metrics file, or None."""
+    if not os.path.isfile(path):
+        return None
+    summary = None
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("event") == "summary":
+                summary = entry
+    return summary
+
+
+def merge_manifests(job, job_name, texture_count, frame_duration, shards, approved_frames=None):
+    """
+    Write the job's farm manifest into its output directory (the draft tree for drafts) and return it.
+
+    The video segments of a streaming job are joined into its video once every shard has completed.
+    """
+    missing = sorted(frame for shard in shards for frame in shard["missing_frames"])
+    shard_reports = []
+    for shard in shards:
+        shard_report = {key: shard[key] for key in ("name", "texture_start", "texture_end", "attempts", "status")}
+        summary = read_metrics_summary(shard["metrics"])
+        if summary:
+            shard_report["metrics"] = {
+                key: summary[key] for key in ("elapsed", "frames_written", "frames_per_second", "bytes_written")
+            }
+        shard_reports.append(shard_report)
+    report = {
+        "name": job_name,
+        "render_quality": job.get("render_quality", "final"),
+        "texture_count": texture_count,
+        "frame_duration": frame_duration,
+        "frame_count": texture_count * frame_duration if approved_frames is None else len(approved_frames),
+        "missing_frames": missing,
+        "shards": shard_reports,
+    }
+    failed = [shard["name"] for shard in shards if shard["status"] != "completed"]
+    segments = [shard["segment"] for shard in shards if shard["segment"]]
+    if segments:
+        output_video = stream_output_for(job)
+        joined = not failed and concat_segments(segments, output_video, job.get("ffmpeg_path", "ffmpeg"))
+        if joined:
+            for segment in segments:
+                os.remove(segment)
+        report["stream_output"] = output_video if joined else None
+        report["stream_segments"] = [] if joined else segments
+    output_dir = render_quality.draft_output_dir(job) if report["render_quality"] == "draft" else job["output_dir"]
+    report_path = os.path.join(output_dir, f"{job.get('output_prefix', 'frame')}_farm_manifest.json")
+    os.makedirs(output_dir, exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if failed:
+        print(f"{job_name}: {len(failed)} shard(s) failed, {len(missing)} frames missing. Report: {report_path}")
+    else:
+        print(f"{job_name}: all {report['frame_count']} frames rendered. Report: {report_path}")
+    if report.get("stream_output"):
+        print(f"{job_name}: video joined from {len(segments)} segments: {report['stream_output']}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a job file as texture shards across worker processes.")
+    parser.add_argument("--job_file", type=str, required=True, help="JSON/TOML job file for the batch runner.")
+    parser.add_argument("--shards", type=int, default=None, help="Shards per job (default: --workers).")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes running at once (default: 1).")
+    parser.add_argument("--retries", type=int, default=1, help="Extra attempts per failed shard (default: 1).")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds before a worker is killed.")
+    parser.add_argument("--shard_dir", type=str, default=None, help="Directory for shard job files and logs.")
+    parser.add_argument("--kit", type=str, default="app/kit/kit", help="Kit executable for the default worker.")
+    parser.add_argument("--ext_folder", type=str, default="exts", help="Extension folder for the default worker.")
+    parser.add_argument("--worker_cmd", type=str, default=None,
+                        help="Worker command template with a {job_file} placeholder, e.g. to run over ssh.")
+    parser.add_argument("--quality", type=str, choices=render_quality.RENDER_QUALITIES, default=None,
+                        help="Override every job's render_quality: draft for review, promote for approved frames.")
+
+    args = parser.parse_args()
+
+    try:
+        reports = run_farm(
+            job_file=args.job_file,
+            shard_count=args.shards or args.workers,
+            workers=args.workers,
+            retries=args.retries,
+            worker_cmd=args.worker_cmd,
+            shard_dir=args.shard_dir,
+            timeout=args.timeout,
+            kit=args.kit,
+            ext_folder=args.ext_folder,
+            quality=args.quality,
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    if any(report["missing_frames"] or report.get("stream_segments") for report in reports):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Stand-ins for the Kit modules the extension imports, so ShaderAnimationLogic can run on a plain Linux box
+without Kit or a GPU.
+
+The viewport renders with a configurable latency per frame and captures take a configurable write latency
+before a placeholder file of frame_bytes bytes is written. The stage is a real in-memory USD stage
+(pip install usd-core) holding one shader with the inputs the extension animates.
+"""
+import asyncio
+import ctypes
+import os
+import sys
+import types
+
+EXTENSION_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "exts", "proviz.animate.material")
+
+SHADER_PATH = "/World/Looks/Bench/Shader"
+TEXTURE_INPUTS = ("diffuse_texture", "opacity_texture", "normalmap_texture")
+
+
+class FakeCapture:
+    """Completes after the next rendered frame plus the write latency, like a scheduled viewport capture."""
+
+    def __init__(self, viewport_api, delegate):
+        self.viewport_api = viewport_api
+        self.delegate = delegate
+
+    async def wait_for_result(self):
+        api = self.viewport_api
+        await asyncio.sleep(api.render_latency + api.write_latency)
+        if isinstance(self.delegate, FakeFileCapture):
+            with open(self.delegate.filepath, "wb") as f:
+                f.write(b"\0" * api.frame_bytes)
+        elif isinstance(self.delegate, FakeByteCapture):
+            width, height = api.resolution
+            data = ctypes.create_string_buffer(width * height * 4)
+            capsule = _make_capsule(data)
+            self.delegate.on_capture_completed_fn(capsule, len(data), width, height, "rgba")
+        api.captures_completed += 1
+        return ["LdrColor"]
+
+
+class FakeFileCapture:
+    def __init__(self, filepath, *args, **kwargs):
+        self.filepath = filepath
+
+
+class FakeByteCapture:
+    def __init__(self, on_capture_completed_fn=None, *args, **kwargs):
+        self.on_capture_completed_fn = on_capture_completed_fn
+
+
+def _make_capsule(buffer):
+    ctypes.pythonapi.PyCapsule_New.restype = ctypes.py_object
+    ctypes.pythonapi.PyCapsule_New.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_void_p]
+    return ctypes.pythonapi.PyCapsule_New(ctypes.addressof(buffer), None, None)
+
+
+class FakeViewportAPI:
+    def __init__(self):
+        self.resolution = (0, 0)
+        self.fill_frame = True
+        self.render_latency = 0.0
+        self.write_latency = 0.0
+        self.frame_bytes = 0
+        self.captures_scheduled = 0
+        self.captures_completed = 0
+        self.frames_rendered = 0
+
+    async def wait_for_render_settings_change(self):
+        await asyncio.sleep(0)
+        return True
+
+    async def wait_for_rendered_frames(self, additional_frames=1):
+        await asyncio.sleep(self.render_latency * additional_frames)
+        self.frames_rendered += additional_frames
+        return True
+
+    def schedule_capture(self, delegate):
+        self.captures_scheduled += 1
+        return FakeCapture(self, delegate)
+
+
+class FakeTimeline:
+    def __init__(self):
+        self.current_time = 0.0
+        self.start_time = 0.0
+        self.end_time = 0.0
+
+    def set_current_time(self, time):
+        self.current_time = time
+
+    def get_current_time(self):
+        return self.current_time
+
+    def set_start_time(self, time):
+        self.start_time = time
+
+    def set_end_time(self, time):
+        self.end_time = time
+
+    def get_time_codes_per_seconds(self):
+        return 24.0
+
+    def stop(self):
+        pass
+
+
+class _Anything:
+    """Accepts any attribute access or call; used for the UI modules the benchmark never drives."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return _Anything()
+
+    def __call__(self, *args, **kwargs):
+        return _Anything()
+
+
+class KitFakes:
+    """Installs the fake modules and holds the fake viewport, timeline and stage."""
+
+    def __init__(self):
+        self.viewport_api = FakeViewportAPI()
+        self.timeline = FakeTimeline()
+        self.stage = None
+
+    def configure(self, render_latency=0.0, write_latency=0.0, frame_bytes=0):
+        api = self.viewport_api
+        api.render_latency = render_latency
+        api.write_latency = write_latency
+        api.frame_bytes = frame_bytes
+        api.captures_scheduled = api.captures_completed = api.frames_rendered = 0
+
+    def new_stage(self):
+        from pxr import Sdf, Usd, UsdShade
+
+        self.stage = Usd.Stage.CreateInMemory()
+        shader = UsdShade.Shader.Define(self.stage, SHADER_PATH)
+        for name in TEXTURE_INPUTS:
+            shader.CreateInput(name, Sdf.ValueTypeNames.Asset)
+        return self.stage
+
+    def install(self):
+        try:
+            import pxr  # noqa: F401
+        except ImportError:
+            raise SystemExit("The benchmarks need the USD Python bindings: pip install usd-core")
+
+        viewport_window = types.SimpleNamespace(viewport_api=self.viewport_api)
+        settings = types.SimpleNamespace(get=lambda path: None)
+
+        _module("carb")
+        _module("carb.settings", get_settings=lambda: settings)
+        _module("omni")
+        _module("omni.ext", IExt=object)
+        _module("omni.kit")
+        _module("omni.kit.app", get_app=_Anything)
+        ui = _module("omni.ui")
+        ui.__getattr__ = lambda name: _Anything
+        _module("omni.usd", get_context=lambda: types.SimpleNamespace(get_stage=lambda: self.stage))
+        _module("omni.timeline", get_timeline_interface=lambda: self.timeline)
+        _module("omni.kit.viewport")
+        _module("omni.kit.viewport.utility", get_active_viewport_window=lambda *args, **kwargs: viewport_window)
+        _module("omni.kit.widget")
+        _module("omni.kit.widget.viewport")
+        _module("omni.kit.widget.viewport.capture", FileCapture=FakeFileCapture, ByteCapture=FakeByteCapture)
+
+        sys.path.insert(0, os.path.abspath(EXTENSION_ROOT))
+        self.new_stage()
+        return self
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
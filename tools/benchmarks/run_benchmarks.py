@@ -0,0 +1,313 @@
+"""
+Benchmark and regression harness for the render loop and images_to_video.py, runnable without Kit or a GPU.
+
+run_animation is driven against the fakes in kit_fakes.py:
+  - overhead: zero render and write latency over synthetic folders of 100 to 50k textures, so the time per
+    frame is the extension's own orchestration cost (stage edits, manifests, metrics, scheduling).
+  - throughput: a fixed number of textures with simulated render and write latencies; the efficiency is the
+    achieved frames/s relative to one frame per render interval.
+  - resume: a second run over the same output, where every texture is skipped.
+images_to_video.py encodes generated test frames (needs ffmpeg on PATH) single-pass and segmented, and a
+sequence of held images with and without --dedupe.
+
+The run fails when a result is worse than the limits in thresholds.json.
+
+    python tools/benchmarks/run_benchmarks.py
+    python tools/benchmarks/run_benchmarks.py --sizes 100,1000,10000,50000 --json results.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import struct
+import sys
+import tempfile
+import time
+import zlib
+
+from kit_fakes import SHADER_PATH, KitFakes
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+
+
+@contextlib.contextmanager
+def silenced():
+    """Send stdout and stderr to /dev/null at the file descriptor level, child processes included."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    try:
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        for fd in saved + [devnull]:
+            os.close(fd)
+
+
+def _png_chunk(chunk_type, data):
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+# A 1x1 PNG: run_animation only assigns texture paths, but the preflight reads every header
+TINY_PNG = b"\x89PNG\r\n\x1a\n" + b"".join((
+    _png_chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)),
+    _png_chunk(b"IDAT", zlib.compress(b"\x00\x00\x00\x00")),
+    _png_chunk(b"IEND", b""),
+))
+
+
+def make_texture_folder(folder, count):
+    """Create count tiny texture files."""
+    os.makedirs(folder, exist_ok=True)
+    for index in range(count):
+        with open(os.path.join(folder, f"tex_{index}.png"), "wb") as f:
+            f.write(TINY_PNG)
+    return folder
+
+
+def bench_inputs(animation_folder, output_dir, **overrides):
+    inputs = {
+        "resolution_width": 320,
+        "resolution_height": 180,
+        "shader_path": SHADER_PATH,
+        "animation_folder": animation_folder,
+        "start_time_code": 0,
+        "frame_duration": 1,
+        "wait_time": 0.0,
+        "max_in_flight": 2,
+        "output_dir": output_dir,
+        "output_prefix": "frame",
+        "texture_type": "diffuse_texture",
+    }
+    inputs.update(overrides)
+    return inputs
+
+
+def run_animation(fakes, inputs):
+    """Run one render, silencing its per-frame console output. Returns (seconds, metrics summary)."""
+    from proviz.animate.material.extension import ShaderAnimationLogic
+
+    fakes.new_stage()
+    with silenced():
+        start = time.perf_counter()
+        asyncio.run(ShaderAnimationLogic.run_animation(inputs))
+        seconds = time.perf_counter() - start
+
+    metrics_file = os.path.join(inputs["output_dir"], f"{inputs['output_prefix']}_metrics.jsonl")
+    with open(metrics_file) as f:
+        summary = json.loads(f.readlines()[-1])
+    return seconds, summary
+
+
+def bench_overhead(fakes, work_dir, sizes):
+    results = []
+    for size in sizes:
+        folder = make_texture_folder(os.path.join(work_dir, f"textures_{size}"), size)
+        output_dir = os.path.join(work_dir, f"overhead_{size}")
+        fakes.configure()
+        seconds, summary = run_animation(fakes, bench_inputs(folder, output_dir))
+        resume_seconds, _ = run_animation(fakes, bench_inputs(folder, output_dir))
+        scan_seconds = summary["phases"]["scan"]["total"]
+        results.append({
+            "textures": size,
+            "frames": summary["frames_written"],
+            "seconds": round(seconds, 3),
+            "overhead_ms_per_frame": round(seconds / size * 1000, 3),
+            "scan_ms_per_1k_textures": round(scan_seconds / size * 1e6, 3),
+            "resume_ms_per_texture": round(resume_seconds / size * 1000, 3),
+        })
+        shutil.rmtree(output_dir, ignore_errors=True)
+        print(
+            f"  {size:>6} textures: {results[-1]['overhead_ms_per_frame']:.3f} ms/frame overhead, "
+            f"scan {results[-1]['scan_ms_per_1k_textures']:.2f} ms/1k, "
+            f"resume {results[-1]['resume_ms_per_texture']:.3f} ms/texture"
+        )
+    return results
+
+
+def bench_throughput(fakes, work_dir, textures, render_latency, write_latency, max_in_flight, hold_frames,
+                     image_format="png", threaded_writes=False):
+    folder = make_texture_folder(os.path.join(work_dir, f"textures_{textures}"), textures)
+    results = []
+    for hold_mode in (False, True):
+        output_dir = os.path.join(work_dir, f"throughput_{'hold' if hold_mode else 'frames'}")
+        fakes.configure(render_latency, write_latency, frame_bytes=4096)
+        inputs = bench_inputs(
+            folder, output_dir, max_in_flight=max_in_flight, frame_duration=hold_frames if hold_mode else 1,
+            hold_mode=hold_mode, link_mode="copy", image_format=image_format, threaded_writes=threaded_writes,
+        )
+        seconds, summary = run_animation(fakes, inputs)
+        captures = fakes.viewport_api.captures_completed
+        # Ideal: one capture per render interval, with writes fully overlapped
+        efficiency = captures * render_latency / seconds if render_latency else None
+        results.append({
+            "mode": "hold" if hold_mode else "frames",
+            "textures": textures,
+            "frames": summary["frames_written"],
+            "captures": captures,
+            "seconds": round(seconds, 3),
+            "frames_per_second": round(summary["frames_written"] / seconds, 2),
+            "capture_efficiency": round(efficiency, 3) if efficiency is not None else None,
+            "phases_p95_ms": {phase: round(stats["p95"] * 1000, 2) for phase, stats in summary["phases"].items()},
+        })
+        shutil.rmtree(output_dir, ignore_errors=True)
+        print(
+            f"  {results[-1]['mode']:>6}: {results[-1]['frames_per_second']:.1f} frames/s, "
+            f"{captures} captures, capture efficiency {results[-1]['capture_efficiency']}"
+        )
+    return results
+
+
+def count_video_frames(video_path, framerate=24):
+    """Count the frames of a video at a constant frame rate by decoding it to the null muxer."""
+    result = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-nostdin", "-i", video_path, "-map", "0:v:0", "-vf", f"fps={framerate}",
+         "-f", "null", "-"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    counts = re.findall(r"frame=\s*(\d+)", result.stderr)
+    return int(counts[-1]) if counts else 0
+
+
+def bench_images_to_video(work_dir, frames, size, segments, hold_frames):
+    if shutil.which("ffmpeg") is None:
+        print("  skipped: ffmpeg is not on PATH")
+        return []
+
+    sys.path.insert(0, REPO_ROOT)
+    import images_to_video
+
+    image_dir = os.path.join(work_dir, "frames")
+    os.makedirs(image_dir, exist_ok=True)
+    # "frame" changes every frame, "held" holds every image for hold_frames frames like a rendered sequence
+    for prefix, rate in (("frame", 24), ("held", 24 / hold_frames)):
+        subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-f", "lavfi",
+             "-i", f"testsrc2=size={size}:rate={rate}", "-vf", "fps=24", "-frames:v", str(frames),
+             "-start_number", "0", os.path.join(image_dir, f"{prefix}_%04d.png")],
+            check=True,
+        )
+
+    runs = [
+        ("single", lambda output: images_to_video.images_to_video(image_dir, "frame", output, 24)),
+        ("segmented", lambda output: images_to_video.images_to_video_segmented(
+            image_dir, "frame", output, 24, segments
+        )),
+        ("held", lambda output: images_to_video.images_to_video(image_dir, "held", output, 24)),
+        ("held_dedupe", lambda output: images_to_video.images_to_video(image_dir, "held", output, 24, dedupe=True)),
+    ]
+    results = []
+    for name, encode in runs:
+        output = os.path.join(work_dir, f"{name}.mp4")
+        with silenced():
+            start = time.perf_counter()
+            encode(output)
+            seconds = time.perf_counter() - start
+        encoded = count_video_frames(output) if os.path.isfile(output) else 0
+        results.append({
+            "mode": name,
+            "frames": frames,
+            "encoded_frames": encoded,
+            "seconds": round(seconds, 3),
+            "encode_fps": round(frames / seconds, 2),
+        })
+        print(f"  {name:>11}: {results[-1]['encode_fps']:.1f} frames/s, {encoded}/{frames} frames in the video")
+    return results
+
+
+def check_thresholds(results, thresholds):
+    """Return a message for every result that is worse than its limit."""
+    failures = []
+    limits = thresholds.get("run_animation", {})
+    for result in results["overhead"]:
+        for key in ("overhead_ms_per_frame", "scan_ms_per_1k_textures", "resume_ms_per_texture"):
+            limit = limits.get(f"max_{key}")
+            if limit is not None and result[key] > limit:
+                failures.append(f"{result['textures']} textures: {key} {result[key]} > {limit}")
+    for result in results["throughput"]:
+        limit = limits.get(f"min_capture_efficiency_{result['mode']}")
+        if limit is not None and result["capture_efficiency"] is not None and result["capture_efficiency"] < limit:
+            failures.append(f"throughput {result['mode']}: capture_efficiency {result['capture_efficiency']} < {limit}")
+
+    limits = thresholds.get("images_to_video", {})
+    for result in results["images_to_video"]:
+        if result["encoded_frames"] != result["frames"]:
+            failures.append(f"images_to_video {result['mode']}: {result['encoded_frames']}/{result['frames']} frames")
+        limit = limits.get("min_encode_fps")
+        if limit is not None and result["encode_fps"] < limit:
+            failures.append(f"images_to_video {result['mode']}: encode_fps {result['encode_fps']} < {limit}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the render loop and encoder without Kit or a GPU.")
+    parser.add_argument("--sizes", type=str, default="100,1000,10000",
+                        help="Comma separated texture counts for the overhead benchmark (default: 100,1000,10000).")
+    parser.add_argument("--throughput_textures", type=int, default=100, help="Textures in the throughput run.")
+    parser.add_argument("--render_latency", type=float, default=0.01, help="Simulated seconds per rendered frame.")
+    parser.add_argument("--write_latency", type=float, default=0.02, help="Simulated seconds to write a capture.")
+    parser.add_argument("--max_in_flight", type=int, default=2, help="Captures in flight for the throughput run.")
+    parser.add_argument("--hold_frames", type=int, default=6, help="Frame duration of the hold mode run.")
+    parser.add_argument("--image_format", type=str, default="png", help="Image format of the throughput run.")
+    parser.add_argument("--threaded_writes", action="store_true",
+                        help="Encode captured buffers on the off-thread image writer in the throughput run.")
+    parser.add_argument("--video_frames", type=int, default=240, help="Generated frames for images_to_video.")
+    parser.add_argument("--video_size", type=str, default="640x360", help="Size of the generated frames.")
+    parser.add_argument("--segments", type=int, default=4, help="Segments for the segmented encode.")
+    parser.add_argument("--skip_video", action="store_true", help="Skip the images_to_video benchmark.")
+    parser.add_argument("--thresholds", type=str, default=DEFAULT_THRESHOLDS, help="Regression limits (JSON).")
+    parser.add_argument("--json", type=str, default=None, help="Write the results to this file.")
+    args = parser.parse_args()
+
+    fakes = KitFakes().install()
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix="proviz_bench_")
+    try:
+        print("run_animation overhead (no render or write latency):")
+        sizes = [int(size) for size in args.sizes.split(",") if size]
+        results["overhead"] = bench_overhead(fakes, work_dir, sizes)
+
+        print(f"run_animation throughput ({args.render_latency * 1000:.0f} ms render, "
+              f"{args.write_latency * 1000:.0f} ms write, {args.max_in_flight} in flight):")
+        results["throughput"] = bench_throughput(
+            fakes, work_dir, args.throughput_textures, args.render_latency, args.write_latency,
+            args.max_in_flight, args.hold_frames, args.image_format, args.threaded_writes,
+        )
+
+        results["images_to_video"] = []
+        if not args.skip_video:
+            print(f"images_to_video ({args.video_frames} frames at {args.video_size}):")
+            results["images_to_video"] = bench_images_to_video(
+                work_dir, args.video_frames, args.video_size, args.segments, args.hold_frames
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    with open(args.thresholds) as f:
+        thresholds = json.load(f)
+    failures = check_thresholds(results, thresholds)
+    if failures:
+        print("Regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("All benchmarks within thresholds.")
+
+
+if __name__ == "__main__":
+    main()
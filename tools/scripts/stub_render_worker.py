@@ -0,0 +1,116 @@
+"""
+Stand-in for a headless Kit render worker, for exercising render_farm.py without a GPU.
+
+It reads a shard job file, writes placeholder frames for the shard's texture range (only the approved frames
+of a promote pass, into the draft tree for a draft) and the completion manifest a real worker would write. In
+the stream output modes it encodes a solid colour video segment with ffmpeg, one frame per rendered frame.
+
+    python render_farm.py --job_file jobs.json --shards 4 --workers 4 \
+        --worker_cmd "python tools/scripts/stub_render_worker.py {job_file}"
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from render_farm import jobs, render_quality, texture_scanner  # noqa: E402
+
+
+def scan(folder):
+    return [os.path.basename(path) for path in texture_scanner.scan_textures(folder)]
+
+
+def run_job(job, delay):
+    folders = [job["animation_folder"]] if job.get("animation_folder") else []
+    folders += [binding["animation_folder"] for binding in job.get("bindings") or []]
+    sequences = [scan(folder) for folder in folders]
+    textures = [
+        "|".join(sequence[min(index, len(sequence) - 1)] for sequence in sequences)
+        for index in range(max(len(sequence) for sequence in sequences))
+    ]
+    frame_duration = job["frame_duration"]
+    prefix = job["output_prefix"]
+    texture_start = job.get("texture_start") or 0
+    texture_end = job.get("texture_end")
+    texture_end = len(textures) if texture_end is None else min(texture_end, len(textures))
+    # render_farm.py passes a promote pass's approved frames as a list of frame indices
+    approved = set(render_quality.parse_frame_ranges(job["approved_frames"])) if job.get("approved_frames") else None
+    output_dir = job["output_dir"]
+    if job.get("render_quality") == "draft":
+        output_dir = render_quality.draft_output_dir(job)
+    os.makedirs(output_dir, exist_ok=True)
+    output_mode = job.get("output_mode", "png")
+
+    started = time.perf_counter()
+    completed = []
+    for texture_index in range(texture_start, texture_end):
+        time.sleep(delay)
+        for frame_index in range(texture_index * frame_duration, (texture_index + 1) * frame_duration):
+            if approved is not None and frame_index not in approved:
+                continue
+            if output_mode in ("png", "png+stream"):
+                file_name = f"{prefix}_{frame_index:04d}.{job.get('image_format', 'png')}"
+                with open(os.path.join(output_dir, file_name), "w") as f:
+                    f.write(textures[texture_index])
+            completed.append(frame_index)
+
+    if output_mode in ("stream", "png+stream") and completed:
+        stream_output = job.get("stream_output") or os.path.join(output_dir, f"{prefix}.mp4")
+        if job.get("render_quality") == "draft":
+            stream_output = os.path.join(output_dir, os.path.basename(stream_output))
+        os.makedirs(os.path.dirname(os.path.abspath(stream_output)), exist_ok=True)
+        framerate = job.get("framerate", 24)
+        subprocess.run([
+            job.get("ffmpeg_path", "ffmpeg"), "-hide_banner", "-loglevel", "error", "-y", "-f", "lavfi",
+            "-i", f"color=gray:size=64x64:rate={framerate}", "-frames:v", str(len(completed)),
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", stream_output,
+        ], check=True)
+
+    if job.get("metrics_file"):
+        elapsed = time.perf_counter() - started
+        with open(job["metrics_file"], "w") as f:
+            f.write(json.dumps({
+                "event": "summary",
+                "elapsed": elapsed,
+                "frames_written": len(completed),
+                "frames_per_second": len(completed) / elapsed if elapsed > 0 else None,
+                "bytes_written": 0,
+            }) + "\n")
+
+    if job.get("completion_manifest"):
+        with open(job["completion_manifest"], "w") as f:
+            json.dump({
+                "name": job.get("name"),
+                "texture_start": texture_start,
+                "texture_end": texture_end,
+                "texture_count": len(textures),
+                "frame_duration": frame_duration,
+                "completed_frames": completed,
+                "terminated": False,
+            }, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Placeholder render worker for render_farm.py.")
+    parser.add_argument("job_file", type=str, help="Shard job file written by render_farm.py.")
+    parser.add_argument("--delay", type=float, default=0.0, help="Simulated seconds per texture.")
+    parser.add_argument("--fail_once", action="store_true", help="Exit with an error on the first attempt.")
+    args = parser.parse_args()
+
+    marker = args.job_file + ".attempted"
+    if args.fail_once and not os.path.exists(marker):
+        open(marker, "w").close()
+        print("Simulated worker failure.")
+        sys.exit(1)
+
+    # Read the shard job file the way the extension's batch runner does
+    _, job_inputs = jobs.load_job_file(args.job_file)
+    for job in job_inputs:
+        run_job(job, args.delay)
+
+
+if __name__ == "__main__":
+    main()